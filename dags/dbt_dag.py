@@ -7,12 +7,25 @@ This DAG orchestrates the end-to-end ETL process for financial trading data:
    - Performs preflight checks (database connections, file system, env vars)
 2. Extract-Load:
    - Runs the main EL pipeline script for data ingestion
+   - Backfills: triggered with backfill_start/backfill_end params, the [start, end)
+     range is fanned out into per-day or per-hour mapped tasks that run in parallel
+     in the fin_trade_el pool, each replacing its own window idempotently
 3. Transform:
-   - Executes dbt transformations and tests
+   - Executes dbt transformations and tests in-process: deps, parse, build and
+     docs generate share one parsed manifest, deps is skipped while the package
+     lock is unchanged and docs while the manifest is unchanged
+   - Builds only what the EL partitions touched (their XCom manifests), for the
+     touched date range, and skips dbt when no rows were loaded
+   - With EL_ROLLUPS, the reports are built from the daily rollups the EL step
+     maintains; days a backfill window or change capture invalidated are
+     recomputed first (settle_rollups)
+   - Records each dbt step's duration as a Prometheus metric
 
 Requirements:
     - Airflow Variables must be configured for database credentials
+      (they are read when tasks run, not when the DAG file is parsed)
     - DBT project and profiles directories must be accessible
+    - An Airflow pool named fin_trade_el; its slots cap concurrent EL partitions
     - SQL Server and required Python packages must be installed
     - Proper permissions for database access and file operations
 
@@ -25,16 +38,55 @@ from airflow.operators.empty import EmptyOperator
 from airflow.operators.bash import BashOperator
 from airflow.operators.python import PythonOperator
 from airflow.utils.dates import days_ago
-from airflow.models import Variable
 from airflow.utils.task_group import TaskGroup
-import sys
 
-# Import the separated functions
-from utils.logging_setup import setup_logging
-from utils.preflight_checks import preflight_check
-
-# Add project root to Python path for imports
-sys.path.append(Variable.get('DBT_PROJECT_DIR', '../fin_trade'))
+# Nothing in this file may query the metadata database or import the pipeline
+# packages (pandas, sqlalchemy, the log file handlers) at parse time: the
+# scheduler re-parses it every few seconds. Airflow Variables are rendered
+# through Jinja when a task runs, and pipeline imports happen inside callables.
+
+def _var(name, default=''):
+    """Template resolving an Airflow Variable when the task runs."""
+    return f"{{{{ var.value.get('{name}', '{default}') }}}}"
+
+def _use_project_path():
+    """Make the dbt project's `scripts` package importable in the task process."""
+    import sys
+    from airflow.models import Variable
+
+    project_dir = Variable.get('DBT_PROJECT_DIR', '../fin_trade')
+    if project_dir not in sys.path:
+        sys.path.append(project_dir)
+
+def run_setup_logging(**context):
+    _use_project_path()
+    from utils.logging_setup import setup_logging
+    return setup_logging(**context)
+
+def run_plan_el_partitions(**context):
+    _use_project_path()
+    from utils.el_partitions import plan_el_partitions
+    return plan_el_partitions(**context)
+
+def run_dbt_transform(**context):
+    _use_project_path()
+    from utils.dbt_runner import run_dbt
+    return run_dbt(**context)
+
+def run_preflight_check(**context):
+    _use_project_path()
+    from utils.preflight_checks import preflight_check
+    return preflight_check(**context)
+
+def record_task_success(context):
+    _use_project_path()
+    from utils.task_metrics import record_task_success as record
+    record(context)
+
+def record_task_failure(context):
+    _use_project_path()
+    from utils.task_metrics import record_task_failure as record
+    record(context)
 
 # Default arguments for the DAG
 default_args = {
@@ -46,31 +98,73 @@ default_args = {
     'retries': 1,
 }
 
-# Environment Variables Configuration
+# Environment Variables Configuration (Jinja templates, rendered from Airflow Variables at run time)
 env_vars = {
     # Project Directories
-    'DBT_PROJECT_DIR': Variable.get('DBT_PROJECT_DIR', '../fin_trade'),
-    'DBT_PROFILES_DIR': Variable.get('DBT_PROFILES_DIR', '../fin_trade'),
+    'DBT_PROJECT_DIR': _var('DBT_PROJECT_DIR', '../fin_trade'),
+    'DBT_PROFILES_DIR': _var('DBT_PROFILES_DIR', '../fin_trade'),
     
     # SQL Server Configuration
-    'SQL_SERVER_DRIVER': Variable.get('SQL_SERVER_DRIVER', 'ODBC Driver 17 for SQL Server'),
-    'SQL_SERVER_IP': Variable.get('SQL_SERVER_IP'),
-    'SQL_SERVER_PORT': Variable.get('SQL_SERVER_PORT'),
-    'SQL_SERVER_ENCRYPT': Variable.get('SQL_SERVER_ENCRYPT', 'false'),
-    'SQL_SERVER_TRUST_CERT': Variable.get('SQL_SERVER_TRUST_CERT', 'true'),
-    'SQL_COMMAND_TIMEOUT': Variable.get('SQL_COMMAND_TIMEOUT', '300'),
-    'SQL_RETRIES': Variable.get('SQL_RETRIES', '3'),
+    'SQL_SERVER_DRIVER': _var('SQL_SERVER_DRIVER', 'ODBC Driver 17 for SQL Server'),
+    'SQL_SERVER_IP': _var('SQL_SERVER_IP'),
+    'SQL_SERVER_PORT': _var('SQL_SERVER_PORT'),
+    'SQL_SERVER_ENCRYPT': _var('SQL_SERVER_ENCRYPT', 'false'),
+    'SQL_SERVER_TRUST_CERT': _var('SQL_SERVER_TRUST_CERT', 'true'),
+    'SQL_COMMAND_TIMEOUT': _var('SQL_COMMAND_TIMEOUT', '300'),
+    'SQL_RETRIES': _var('SQL_RETRIES', '3'),
     
     # DBT Configuration
-    'DBT_USER': Variable.get('DBT_USER'),
-    'DBT_PASSWORD': Variable.get('DBT_PASSWORD'),
-    'TARGET_SCHEMA': Variable.get('TARGET_SCHEMA'),
-    'TARGET_DB_SCHEMA': Variable.get('TARGET_DB_SCHEMA'),
-    'DBT_TARGET': Variable.get('DBT_TARGET', 'dev'),
+    'DBT_USER': _var('DBT_USER'),
+    'DBT_PASSWORD': _var('DBT_PASSWORD'),
+    'TARGET_SCHEMA': _var('TARGET_SCHEMA'),
+    'TARGET_DB_SCHEMA': _var('TARGET_DB_SCHEMA'),
+    'DBT_TARGET': _var('DBT_TARGET', 'dev'),
+    'DBT_THREADS': _var('DBT_THREADS', '4'),
+    
+    # Stamped on every staged row, so the mapped EL partitions of a run share one slice key
+    'EL_RUN_KEY': '{{ run_id }}',
+    
+    # Change data capture of modified and soft-deleted events after each incremental load
+    'EL_CDC_ENABLED': _var('EL_CDC_ENABLED', 'false'),
+    
+    # Rows failing the pre-load validation rules are quarantined instead of staged
+    'EL_VALIDATE': _var('EL_VALIDATE', 'true'),
+    
+    # Batch sizes and loader count tuned from measured throughput, learned values kept for the next run
+    'EL_AUTOTUNE': _var('EL_AUTOTUNE', 'false'),
+    'EL_AUTOTUNE_STATE_FILE': _var('EL_AUTOTUNE_STATE_FILE'),
+    
+    # Daily rollups maintained during the load, read by the report models instead of rescanning orders
+    'EL_ROLLUPS': _var('EL_ROLLUPS', 'false'),
+    
+    # Profile the EL partitions (cProfile, stack samples, tracemalloc, statement timings) into EL_PROFILE_DIR
+    'EL_PROFILE': _var('EL_PROFILE', 'false'),
+    'EL_PROFILE_DIR': _var('EL_PROFILE_DIR'),
+    
+    # Extract only the columns the models read (the audit profile adds provider_response)
+    'MYSQL_EXTRACT_PROJECTION': _var('MYSQL_EXTRACT_PROJECTION', 'fact'),
+    'MYSQL_COMPRESS': _var('MYSQL_COMPRESS', 'false'),
+    
+    # Metrics Export (textfile collector directory and/or Pushgateway URL)
+    'METRICS_TEXTFILE_DIR': _var('METRICS_TEXTFILE_DIR'),
+    'METRICS_PUSHGATEWAY_URL': _var('METRICS_PUSHGATEWAY_URL'),
 }
 
-# Path to Python scripts
-SCRIPT_EL = f"python {env_vars['DBT_PROJECT_DIR']}/scripts/elt/el_pipeline.py"
+# Record the task's duration and outcome as a pipeline stage metric
+metrics_callbacks = {
+    'on_success_callback': record_task_success,
+    'on_failure_callback': record_task_failure,
+}
+
+# Pool shared by the mapped EL partitions; size it to what the source and target can take
+EL_POOL = 'fin_trade_el'
+
+# Backfill parameters, e.g. trigger with {"backfill_start": "2024-03-01", "backfill_end": "2024-04-01"}
+DAG_PARAMS = {
+    'backfill_start': '',  # Inclusive ISO date/datetime; empty runs the incremental load
+    'backfill_end': '',  # Exclusive ISO date/datetime
+    'partition_grain': 'day',  # day or hour
+}
 
 with DAG(
     dag_id='fin_trade_pipeline',
@@ -78,6 +172,7 @@ with DAG(
     description='Financial trading data pipeline with Extract-Load and dbt transformations',
     schedule_interval='0 1 * * *',
     catchup=False,
+    params=DAG_PARAMS,
     tags=['dbt', 'financial-data', 'trading', 'el'],
 ) as dag:
 
@@ -87,14 +182,14 @@ with DAG(
     with TaskGroup(group_id='setup_and_validation') as setup_group:
         setup_logging_task = PythonOperator(
             task_id='setup_logging',
-            python_callable=setup_logging,
+            python_callable=run_setup_logging,
             provide_context=True,
             op_kwargs={'env_vars': env_vars}
         )
         
         preflight_check_task = PythonOperator(
             task_id='preflight_check',
-            python_callable=preflight_check,
+            python_callable=run_preflight_check,
             provide_context=True,
             op_kwargs={'env_vars': env_vars}
         )
@@ -102,32 +197,38 @@ with DAG(
         # Set dependencies within the group
         setup_logging_task >> preflight_check_task
 
-    run_el = BashOperator(
-        task_id='run_el_pipeline',
-        bash_command=SCRIPT_EL,
-        cwd=env_vars['DBT_PROJECT_DIR'],
-        env=env_vars,
+    # One command per partition: the incremental load, or one per backfill window
+    plan_el = PythonOperator(
+        task_id='plan_el_partitions',
+        python_callable=run_plan_el_partitions,
+        provide_context=True,
+        op_kwargs={'env_vars': env_vars}
     )
 
-    dbt_deps = BashOperator(
-    task_id='dbt_deps',
-    bash_command=f"dbt deps --project-dir {env_vars['DBT_PROJECT_DIR']} --profiles-dir {env_vars['DBT_PROFILES_DIR']}",
-    env=env_vars,
-    )
+    run_el = BashOperator.partial(
+        task_id='run_el_pipeline',
+        env=env_vars,
+        pool=EL_POOL,
+    ).expand(bash_command=plan_el.output)
 
-    dbt_build = BashOperator(
-        task_id='dbt_build',
-        bash_command=f"dbt build --project-dir {env_vars['DBT_PROJECT_DIR']} --profiles-dir {env_vars['DBT_PROFILES_DIR']}",
+    # Recompute the rollup days the EL partitions marked dirty; a no-op with EL_ROLLUPS off
+    settle_rollups = BashOperator(
+        task_id='settle_rollups',
         env=env_vars,
+        bash_command='cd "$DBT_PROJECT_DIR" && python -m scripts.elt.rollups --settle',
     )
 
-    dbt_docs_generate = BashOperator(
-    task_id='dbt_docs_generate',
-        bash_command=f"dbt docs generate --project-dir {env_vars['DBT_PROJECT_DIR']} --profiles-dir {env_vars['DBT_PROFILES_DIR']}",
-        env=env_vars,
+    # deps, parse, build and docs generate in one process; returns per-command timings
+    dbt_transform = PythonOperator(
+        task_id='dbt_transform',
+        python_callable=run_dbt_transform,
+        provide_context=True,
+        # Touched-keys manifests printed by each EL partition (last stdout line, pushed as XCom)
+        op_kwargs={'env_vars': env_vars, 'el_manifests': run_el.output},
+        **metrics_callbacks,
     )
 
     end = EmptyOperator(task_id='end_pipeline')
 
     # Define task dependencies
-    start >> setup_group >> run_el >> dbt_deps >> dbt_build >> dbt_docs_generate >> end
+    start >> setup_group >> plan_el >> run_el >> settle_rollups >> dbt_transform >> end
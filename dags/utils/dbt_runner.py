@@ -0,0 +1,219 @@
+"""
+In-process dbt runner for the Financial Trading pipeline
+"""
+import hashlib
+import json
+import os
+import time
+from airflow.exceptions import AirflowException
+from scripts.elt.touched import is_fully_validated, merge_manifests
+from scripts.utils.logger import LOGGER
+from scripts.utils.metrics import observe_stage
+
+# Hashes of the last successful deps and docs runs, kept next to partial_parse.msgpack
+STATE_FILE = 'fin_trade_dbt_state.json'
+
+# Built whenever the EL step loaded rows: the staging view, the fact table and everything
+# downstream of it (reports, snapshots and their tests). Dimensions are added only when
+# the EL step met codes they do not have yet.
+CHANGED_DATA_SELECTION = ['stg_orders', 'orders+']
+
+# Tests of fct.orders that the EL step's pre-load validation already enforces on every row it
+# loads (scripts/elt/validation.py); skipped when the whole run was validated
+PRELOAD_VALIDATED_TESTS = 'tag:preload_validated'
+
+def _hash_files(*paths):
+    """Hash the contents of files that exist; None if none of them do."""
+    digest = hashlib.sha256()
+    found = False
+    for path in paths:
+        if os.path.exists(path):
+            found = True
+            with open(path, 'rb') as handle:
+                digest.update(handle.read())
+    return digest.hexdigest() if found else None
+
+def _manifest_hash(target_dir):
+    """
+    Hash manifest.json without the fields that change on every parse: the
+    metadata block (invocation id, generation time) and each resource's created_at.
+    """
+    path = os.path.join(target_dir, 'manifest.json')
+    if not os.path.exists(path):
+        return None
+    with open(path) as handle:
+        manifest = json.load(handle)
+    manifest.pop('metadata', None)
+    for resources in manifest.values():
+        if isinstance(resources, dict):
+            for resource in resources.values():
+                if isinstance(resource, dict):
+                    resource.pop('created_at', None)
+    return hashlib.sha256(json.dumps(manifest, sort_keys=True).encode()).hexdigest()
+
+def _load_state(path):
+    try:
+        with open(path) as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return {}
+
+def _save_state(path, state):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as handle:
+        json.dump(state, handle, indent=2, sort_keys=True)
+
+def plan_build(manifest, from_rollups=False):
+    """
+    Turn the EL step's touched-keys manifest into dbt build arguments.
+
+    Args:
+        manifest (dict): Merged manifest (see scripts/elt/touched.py)
+        from_rollups (bool): The EL step maintains the daily rollups, so the reports are
+                             built from them (var reports_from_rollups)
+
+    Returns:
+        list: build arguments selecting what the loaded rows affect and passing the
+              touched date range as vars, or None when the EL step changed nothing.
+              purge_staging is always set, so the on-run-end hook deletes the staged
+              slices once the build has succeeded. The tests the pre-load validation
+              covers are excluded when every loaded row was validated
+    """
+    if not manifest['rows'] and not manifest['dates']:
+        return None
+    dimensions = manifest['dimensions']
+    selection = CHANGED_DATA_SELECTION + (['tag:dimension'] if dimensions is None else dimensions)
+    dbt_vars = {'purge_staging': True}
+    if from_rollups:
+        dbt_vars['reports_from_rollups'] = True
+    if manifest['dates']:
+        dbt_vars.update(el_start_date=manifest['dates'][0], el_end_date=manifest['dates'][-1])
+    exclude = ['--exclude', PRELOAD_VALIDATED_TESTS] if is_fully_validated(manifest) else []
+    return ['--select'] + selection + exclude + ['--vars', json.dumps(dbt_vars)]
+
+class DbtSession:
+    """
+    Runs dbt commands in this process, sharing one parsed manifest between them.
+
+    Each command is timed and recorded as a pipeline stage metric named after
+    the task it replaces (dbt_deps, dbt_parse, dbt_build, dbt_docs_generate).
+    """
+
+    def __init__(self, project_dir, profiles_dir, target_path=None, threads=None):
+        from dbt.cli.main import dbtRunner
+
+        self._runner_class = dbtRunner
+        self.project_dir = project_dir
+        self.profiles_dir = profiles_dir
+        # Lets independent nodes, e.g. the dimensions, build concurrently
+        self.threads = ['--threads', str(threads)] if threads else []
+        # Kept across runs, so dbt's partial-parse cache (partial_parse.msgpack) is reused
+        self.target_dir = target_path or os.path.join(project_dir, 'target')
+        self.state_path = os.path.join(self.target_dir, STATE_FILE)
+        self.state = _load_state(self.state_path)
+        self.manifest = None
+        self.manifest_hash = None
+        self.timings = {}
+
+    def _invoke(self, stage, args):
+        runner = self._runner_class(manifest=self.manifest)
+        command = args + ['--project-dir', self.project_dir, '--profiles-dir', self.profiles_dir,
+                          '--target-path', self.target_dir]
+        LOGGER.info("Running dbt %s", ' '.join(args))
+        started = time.perf_counter()
+        result = runner.invoke(command)
+        seconds = time.perf_counter() - started
+        self.timings[stage] = round(seconds, 3)
+        observe_stage(stage, seconds, failed=not result.success)
+        if not result.success:
+            raise AirflowException(f"dbt {args[0]} failed: {result.exception or 'see the dbt log'}")
+        LOGGER.info("dbt %s finished in %.1fs", args[0], seconds)
+        return result
+
+    def deps(self, force=False):
+        """Install packages, unless packages.yml and package-lock.yml are unchanged since the last install."""
+        deps_hash = _hash_files(os.path.join(self.project_dir, 'packages.yml'),
+                                os.path.join(self.project_dir, 'package-lock.yml'))
+        installed = os.path.isdir(os.path.join(self.project_dir, 'dbt_packages'))
+        if not force and installed and deps_hash and deps_hash == self.state.get('deps_hash'):
+            LOGGER.info("dbt deps skipped: package lock unchanged")
+            self.timings['dbt_deps'] = 'skipped'
+            return False
+        self._invoke('dbt_deps', ['deps'])
+        # Hash again: deps writes package-lock.yml when it did not exist yet
+        self.state['deps_hash'] = _hash_files(os.path.join(self.project_dir, 'packages.yml'),
+                                              os.path.join(self.project_dir, 'package-lock.yml'))
+        _save_state(self.state_path, self.state)
+        return True
+
+    def parse(self):
+        """Parse the project once, with partial parsing, and keep the manifest for later commands."""
+        self.manifest = self._invoke('dbt_parse', ['parse', '--partial-parse']).result
+        # Hashed before build adds compiled SQL, so it only changes with the project itself
+        self.manifest_hash = _manifest_hash(self.target_dir)
+        return self.manifest
+
+    def build(self, args=None):
+        """Run dbt build against the parsed manifest."""
+        return self._invoke('dbt_build', ['build'] + self.threads + list(args or []))
+
+    def docs_generate(self, force=False):
+        """Generate docs, unless the manifest is unchanged since the last generation and the catalog exists."""
+        manifest_hash = self.manifest_hash or _manifest_hash(self.target_dir)
+        catalog_exists = os.path.exists(os.path.join(self.target_dir, 'catalog.json'))
+        if not force and catalog_exists and manifest_hash and manifest_hash == self.state.get('manifest_hash'):
+            LOGGER.info("dbt docs generate skipped: manifest unchanged")
+            self.timings['dbt_docs_generate'] = 'skipped'
+            return False
+        # build has already compiled every node of the shared manifest
+        self._invoke('dbt_docs_generate', ['docs', 'generate', '--no-compile'] + self.threads)
+        self.state['manifest_hash'] = manifest_hash
+        _save_state(self.state_path, self.state)
+        return True
+
+def run_dbt(**context):
+    """
+    Run deps, parse, build and docs generate in one process.
+
+    The project is parsed once and the manifest object is handed to build and
+    docs generate, instead of three dbt processes each importing the adapter
+    and parsing the project. Given the EL partitions' touched-keys manifests
+    (el_manifests), only what the loaded rows affect is built, and nothing at
+    all when no rows were loaded; without them the whole project is built.
+
+    Returns:
+        dict: Seconds per command, or 'skipped'
+    """
+    env_vars = context['env_vars']
+    # Kept current by the EL step and settled by the settle_rollups task before this one
+    from_rollups = str(env_vars.get('EL_ROLLUPS', '')).lower() == 'true'
+    build_args = ['--vars', json.dumps({'reports_from_rollups': True})] if from_rollups else []
+    el_manifests = context.get('el_manifests')
+    if el_manifests is not None:
+        manifest = merge_manifests(el_manifests)
+        build_args = plan_build(manifest, from_rollups)
+        if build_args is None:
+            LOGGER.info("The EL step loaded no rows; skipping dbt")
+            return {'dbt': 'skipped'}
+        LOGGER.info("EL loaded %d rows on %d date(s); dbt build %s",
+                    manifest['rows'], len(manifest['dates']), ' '.join(build_args))
+        validation = manifest['validation']
+        if validation['rows']:
+            LOGGER.info("EL validation: %d rows checked, %d passed, %d quarantined, %d warned; failures %s",
+                        validation['rows'], validation['passed'], validation['quarantined'],
+                        validation['warned'], validation['failures'])
+
+    # profiles.yml reads its credentials with env_var()
+    os.environ.update({key: value for key, value in env_vars.items() if value is not None})
+
+    session = DbtSession(env_vars['DBT_PROJECT_DIR'], env_vars['DBT_PROFILES_DIR'],
+                         threads=env_vars.get('DBT_THREADS'))
+    try:
+        session.deps()
+        session.parse()
+        session.build(build_args)
+        session.docs_generate()
+        return session.timings
+    finally:
+        # The per-command stage metrics are exported by the task's metrics callbacks
+        LOGGER.info("dbt command timings: %s", session.timings)
@@ -0,0 +1,40 @@
+"""
+EL partition planning for the Financial Trading pipeline
+"""
+import shlex
+from scripts.elt.windows import plan_windows
+from scripts.utils.logger import LOGGER
+
+# Airflow's default [core] max_map_length; a mapped task cannot fan out further
+MAX_PARTITIONS = 1024
+
+def plan_el_partitions(**context):
+    """
+    Return one EL command per partition, for the mapped run_el_pipeline task.
+
+    Without backfill_start/backfill_end params the run is a single incremental
+    (watermark) partition. With them, the [start, end) range is split into day
+    or hour windows (partition_grain), each reloaded by its own mapped task.
+    """
+    env_vars = context['env_vars']
+    params = context['params']
+    command = f"cd {shlex.quote(env_vars['DBT_PROJECT_DIR'])} && python -m scripts.elt.el_pipeline"
+
+    start, end = params.get('backfill_start'), params.get('backfill_end')
+    if not start and not end:
+        LOGGER.info("No backfill range given; running one incremental EL partition")
+        return [command]
+    if not (start and end):
+        raise ValueError("backfill_start and backfill_end must be given together")
+
+    grain = params.get('partition_grain') or 'day'
+    windows = plan_windows(start, end, grain)
+    if len(windows) > MAX_PARTITIONS:
+        raise ValueError(f"{len(windows)} {grain} partitions exceed the limit of {MAX_PARTITIONS}; "
+                         f"use a coarser grain or a shorter range")
+
+    LOGGER.info("Backfilling [%s, %s) as %d %s partition(s)", start, end, len(windows), grain)
+    return [
+        f"{command} --start {window_start.isoformat()} --end {window_end.isoformat()}"
+        for window_start, window_end in windows
+    ]
@@ -12,16 +12,16 @@ def setup_logging(**context):
         task_id = context['task'].task_id
         execution_date = context['execution_date']
         
-        LOGGER.info(f"Starting DAG: {dag_id}")
-        LOGGER.info(f"Run ID: {run_id}")
-        LOGGER.info(f"Task ID: {task_id}")
-        LOGGER.info(f"Execution Date: {execution_date}")
+        LOGGER.info("Starting DAG: %s", dag_id)
+        LOGGER.info("Run ID: %s", run_id)
+        LOGGER.info("Task ID: %s", task_id)
+        LOGGER.info("Execution Date: %s", execution_date)
         LOGGER.info("Environment configuration:")
         for key, value in context['env_vars'].items():
-            LOGGER.info(f"  {key}: {value}")
+            LOGGER.info("  %s: %s", key, value)
                 
         return True
         
     except Exception as e:
-        LOGGER.error(f"Failed to setup logging: {str(e)}")
+        LOGGER.error("Failed to setup logging: %s", e)
         raise AirflowException(f"Logging setup failed: {str(e)}") 
\ No newline at end of file
@@ -3,6 +3,7 @@ Preflight check utilities for the Financial Trading pipeline
 """
 from airflow.exceptions import AirflowException
 from scripts.utils.logger import LOGGER
+from scripts.utils.engine_registry import get_engine, get_pool_stats
 import os
 import sqlalchemy
 
@@ -27,7 +28,7 @@ def preflight_check(**context):
     for name, path in required_paths.items():
         if not os.path.exists(path):
             raise FileNotFoundError(f"{name} not found at {path}")
-        LOGGER.info(f"✓ {name} exists: {path}")
+        LOGGER.info("✓ %s exists: %s", name, path)
     
     # 2. Database Connectivity Check
     LOGGER.info("Checking SQL Server connectivity...")
@@ -40,12 +41,20 @@ def preflight_check(**context):
             f"&encrypt={env_vars['SQL_SERVER_ENCRYPT']}"
             f"&TrustServerCertificate={env_vars['SQL_SERVER_TRUST_CERT']}"
         )
-        engine = sqlalchemy.create_engine(sqlserver_url)
+        engine = get_engine(
+            'preflight',
+            sqlserver_url,
+            pool_size=1,
+            max_overflow=0,
+            warmup=0,
+            retries=int(env_vars.get('SQL_RETRIES', '3')),
+            command_timeout=int(env_vars.get('SQL_COMMAND_TIMEOUT', '300'))
+        )
         with engine.connect() as conn:
             conn.execute(sqlalchemy.text("SELECT 1"))
-        LOGGER.info("✓ SQL Server connection successful")
+        LOGGER.info("✓ SQL Server connection successful (pool stats: %s)", get_pool_stats('preflight'))
     except Exception as e:
-        LOGGER.error(f"SQL Server connection failed: {str(e)}")
+        LOGGER.error("SQL Server connection failed: %s", e)
         raise AirflowException(f"SQL Server connectivity check failed: {str(e)}")
     
     # 3. Environment Variable Check
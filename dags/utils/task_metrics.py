@@ -0,0 +1,35 @@
+"""
+Task metrics callbacks for the Financial Trading pipeline
+"""
+from datetime import datetime, timezone
+from scripts.utils.logger import LOGGER
+from scripts.utils.metrics import METRICS_CONFIG, observe_stage, export_metrics
+
+def _task_seconds(task_instance):
+    """Return the task's run time; duration is not always set yet when callbacks fire."""
+    if task_instance.duration is not None:
+        return task_instance.duration
+    if task_instance.start_date is None:
+        return 0.0
+    return (datetime.now(timezone.utc) - task_instance.start_date).total_seconds()
+
+def _record(context, failed):
+    try:
+        task_instance = context['task_instance']
+        observe_stage(task_instance.task_id, _task_seconds(task_instance), failed=failed)
+        # Each task runs in its own process, so each one exports under its own job name
+        export_metrics(
+            job=f"{METRICS_CONFIG['JOB']}_{task_instance.task_id}",
+            grouping_key={'dag': task_instance.dag_id}
+        )
+    except Exception as e:
+        # Metrics must never change the outcome of a task
+        LOGGER.warning("Could not record task metrics: %s", e)
+
+def record_task_success(context):
+    """on_success_callback recording the task's duration as a pipeline stage."""
+    _record(context, failed=False)
+
+def record_task_failure(context):
+    """on_failure_callback recording the task's duration and failure as a pipeline stage."""
+    _record(context, failed=True)
\ No newline at end of file
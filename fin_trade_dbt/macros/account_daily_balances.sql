@@ -0,0 +1,46 @@
+{% macro account_daily_balances(from_date=none) %}
+{#-
+    Completed orders aggregated per account and day, the input of the running totals in
+    daily_account_positions. from_date (a SQL date expression) limits the days aggregated.
+    With reports_from_rollups, the days are summed from the EL step's daily account rollup.
+-#}
+{%- if var('reports_from_rollups', false) %}
+    select 
+        account_key,
+        activity_date as balance_date,
+        sum(case when direction_code = 'BUY' then base_amount_sum else 0 end) as daily_inbound,
+        sum(case when direction_code = 'SELL' then base_amount_sum else 0 end) as daily_outbound,
+        sum(fee_amount_sum) as daily_fees,
+        sum(order_count) as daily_transactions
+    from ({{ account_rollup_rows() }}) r
+    where status_code = 1
+    {%- if from_date is not none %}
+        and activity_date >= {{ from_date }}
+    {%- endif %}
+    group by 
+        account_key,
+        activity_date
+{%- else %}
+    select 
+        cp.account_key,
+        cast(o.create_date as date) as balance_date,
+        sum(case when os.direction_code = 'BUY' then o.base_amount else 0 end) as daily_inbound,
+        sum(case when os.direction_code = 'SELL' then o.base_amount else 0 end) as daily_outbound,
+        sum(o.fee_amount) as daily_fees,
+        count(distinct o.natural_key) as daily_transactions
+    from {{ ref('orders') }} o
+    inner join {{ ref('cust_profile') }} cp 
+        on o.account_key = cp.account_key
+    inner join {{ ref('ord_side') }} os
+        on o.direction_key = os.direction_key
+    inner join {{ ref('ord_auth') }} oa
+        on o.approval_key = oa.approval_key
+    where oa.status_code = 1
+    {%- if from_date is not none %}
+        and o.create_date >= {{ from_date }}
+    {%- endif %}
+    group by 
+        cp.account_key,
+        cast(o.create_date as date)
+{%- endif %}
+{% endmacro %}
@@ -0,0 +1,25 @@
+{% macro account_rollup_rows() %}
+{#-
+    Rows of the EL step's daily account rollup (scripts/elt/rollups.py) with the account key and
+    order status of the dimensions, the input of the report models when reports_from_rollups is
+    set. Each row sums the orders of one account, day, base currency, direction and status.
+-#}
+    select 
+        cp.account_key,
+        r.activity_date,
+        r.base_currency as product_type,
+        r.order_direction as direction_code,
+        oa.status_code,
+        oa.status_description,
+        r.order_count,
+        r.base_amount_sum,
+        r.amount_count,
+        r.fee_amount_sum,
+        r.first_created_at,
+        r.last_created_at
+    from {{ source('financial_data', 'rollup_account_daily') }} r
+    inner join {{ ref('cust_profile') }} cp 
+        on cp.user_identifier = r.user_identifier
+    inner join {{ ref('ord_auth') }} oa
+        on isnull(oa.status_description, '0') = isnull(r.status_code, '0')
+{% endmacro %}
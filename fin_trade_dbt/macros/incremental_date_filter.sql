@@ -0,0 +1,16 @@
+{% macro incremental_date_filter(date_column) %}
+{#-
+    Incremental predicate of the daily report models.
+    When the orchestration passes the date range the EL step touched (vars el_start_date and
+    el_end_date), exactly those dates are recomputed and merged on the model's unique key,
+    including older dates a backfill reloaded. Otherwise only dates after the latest one in
+    the model are added.
+-#}
+{%- set start_date = var('el_start_date', none) -%}
+{%- set end_date = var('el_end_date', none) -%}
+{%- if start_date -%}
+{{ date_column }} between cast('{{ start_date }}' as date) and cast('{{ end_date or start_date }}' as date)
+{%- else -%}
+{{ date_column }} > (select max({{ date_column }}) from {{ this }})
+{%- endif -%}
+{% endmacro %}
@@ -0,0 +1,214 @@
+{#-
+    Declarative index and storage-layout management for SQL Server tables.
+
+    Models declare their layout in config and the project runs manage_indexes() as a post-hook:
+
+        indexes=[
+            {'type': 'columnstore'},
+            {'type': 'nonclustered', 'columns': ['natural_key'], 'unique': true},
+            {'type': 'nonclustered', 'columns': ['account_key'], 'include': ['create_date']}
+        ],
+        data_compression='page'
+
+    type is clustered, nonclustered or columnstore (clustered columnstore); at most one of
+    clustered and columnstore. data_compression (none, row, page) applies to the heap or
+    clustered index and to the nonclustered indexes, unless an index sets its own; a
+    columnstore index takes columnstore or columnstore_archive.
+
+    Each build compares the declaration with sys.indexes and only creates, rebuilds or drops
+    what differs, so repeated builds are idempotent and cheap. Only indexes named by
+    index_name() are considered managed and dropped when no longer declared; a foreign
+    clustered index is only replaced when the model declares its own. Every statement's
+    duration is logged.
+-#}
+
+{% macro index_name(relation, index) %}
+{%- set prefixes = {'clustered': 'cx', 'nonclustered': 'ix', 'columnstore': 'cci'} -%}
+{%- set name = prefixes[index['type']] ~ '_' ~ relation.identifier -%}
+{%- if index.get('columns') -%}
+{%- set name = name ~ '__' ~ index['columns'] | join('_') -%}
+{%- endif -%}
+{{ return(name[:128]) }}
+{% endmacro %}
+
+
+{% macro is_managed_index(relation, name) %}
+{%- for prefix in ['cx_', 'ix_', 'cci_'] -%}
+{%- if name and name.lower().startswith((prefix ~ relation.identifier).lower()) -%}
+{{ return(true) }}
+{%- endif -%}
+{%- endfor -%}
+{{ return(false) }}
+{% endmacro %}
+
+
+{% macro desired_indexes(relation) %}
+{#- The model's index declarations, normalised to the shape existing_indexes() returns -#}
+{%- set types = {'clustered': 'CLUSTERED', 'nonclustered': 'NONCLUSTERED', 'columnstore': 'CLUSTERED COLUMNSTORE'} -%}
+{%- set table_compression = (config.get('data_compression') or 'none') | upper -%}
+{%- set desired = [] -%}
+{%- for index in config.get('indexes') or [] -%}
+    {%- if index.get('type') not in types -%}
+        {% do exceptions.raise_compiler_error("Invalid index type `" ~ index.get('type') ~ "` on " ~ relation ~ ". Use 'clustered', 'nonclustered' or 'columnstore'.") %}
+    {%- endif -%}
+    {%- if index['type'] != 'columnstore' and not index.get('columns') -%}
+        {% do exceptions.raise_compiler_error("A " ~ index['type'] ~ " index on " ~ relation ~ " needs `columns`.") %}
+    {%- endif -%}
+    {%- if index['type'] == 'columnstore' -%}
+        {%- set compression = (index.get('data_compression') or 'columnstore') | upper -%}
+    {%- else -%}
+        {%- set compression = (index.get('data_compression') or table_compression) | upper -%}
+    {%- endif -%}
+    {%- do desired.append({
+        'name': index_name(relation, index),
+        'type_desc': types[index['type']],
+        'is_unique': index.get('unique', false) and index['type'] != 'columnstore',
+        'columns': [] if index['type'] == 'columnstore' else index['columns'] | map('lower') | list,
+        'include': index.get('include', []) | map('lower') | sort | list,
+        'compression': compression
+    }) -%}
+{%- endfor -%}
+{%- if desired | selectattr('type_desc', 'in', ['CLUSTERED', 'CLUSTERED COLUMNSTORE']) | list | length > 1 -%}
+    {% do exceptions.raise_compiler_error("At most one clustered or columnstore index can be declared on " ~ relation ~ ".") %}
+{%- endif -%}
+{{ return(desired) }}
+{% endmacro %}
+
+
+{% macro existing_indexes(relation) %}
+{#- The table's heap or indexes from the catalog, keyed by index name (the heap is keyed '') -#}
+{%- set query -%}
+    select
+        i.name as index_name,
+        i.index_id,
+        i.type_desc,
+        i.is_unique,
+        p.data_compression_desc,
+        c.name as column_name,
+        ic.key_ordinal,
+        ic.is_included_column
+    from sys.tables t
+    inner join sys.schemas s on s.schema_id = t.schema_id
+    inner join sys.indexes i on i.object_id = t.object_id
+    inner join sys.partitions p on p.object_id = i.object_id and p.index_id = i.index_id and p.partition_number = 1
+    left join sys.index_columns ic on ic.object_id = i.object_id and ic.index_id = i.index_id
+    left join sys.columns c on c.object_id = ic.object_id and c.column_id = ic.column_id
+    where s.name = '{{ relation.schema }}'
+        and t.name = '{{ relation.identifier }}'
+    order by i.index_id, ic.key_ordinal
+{%- endset -%}
+{%- set existing = {} -%}
+{%- for row in run_query(query).rows -%}
+    {%- set name = row['index_name'] or '' -%}
+    {%- if name not in existing -%}
+        {%- do existing.update({name: {
+            'name': name,
+            'index_id': row['index_id'],
+            'type_desc': row['type_desc'],
+            'is_unique': row['is_unique'] == 1,
+            'columns': [],
+            'include': [],
+            'compression': row['data_compression_desc']
+        }}) -%}
+    {%- endif -%}
+    {%- if row['column_name'] and row['is_included_column'] == 1 -%}
+        {%- do existing[name]['include'].append(row['column_name'] | lower) -%}
+    {%- elif row['column_name'] and row['key_ordinal'] > 0 and row['type_desc'] != 'CLUSTERED COLUMNSTORE' -%}
+        {%- do existing[name]['columns'].append(row['column_name'] | lower) -%}
+    {%- endif -%}
+{%- endfor -%}
+{%- for index in existing.values() -%}
+    {%- do index.update({'include': index['include'] | sort | list}) -%}
+{%- endfor -%}
+{{ return(existing) }}
+{% endmacro %}
+
+
+{% macro index_matches(existing, index) %}
+{{ return(existing['type_desc'] == index['type_desc'] and existing['is_unique'] == index['is_unique']
+    and existing['columns'] == index['columns'] and existing['include'] == index['include']
+    and existing['compression'] == index['compression']) }}
+{% endmacro %}
+
+
+{% macro create_index_sql(relation, index) %}
+{%- if index['type_desc'] == 'CLUSTERED COLUMNSTORE' -%}
+create clustered columnstore index [{{ index['name'] }}] on {{ relation }}
+    with (data_compression = {{ index['compression'] }})
+{%- else -%}
+create {{ 'unique ' if index['is_unique'] }}{{ index['type_desc'] | lower }} index [{{ index['name'] }}] on {{ relation }}
+    ({% for column in index['columns'] %}[{{ column }}]{{ ', ' if not loop.last }}{% endfor %})
+    {%- if index['include'] %}
+    include ({% for column in index['include'] %}[{{ column }}]{{ ', ' if not loop.last }}{% endfor %})
+    {%- endif %}
+    with (data_compression = {{ index['compression'] }})
+{%- endif -%}
+{% endmacro %}
+
+
+{% macro run_timed(statement, description) %}
+{%- set started = modules.datetime.datetime.now() -%}
+{%- do run_query(statement) -%}
+{%- set seconds = (modules.datetime.datetime.now() - started).total_seconds() -%}
+{{ log(description ~ " in " ~ '%.2f' | format(seconds) ~ "s", info=True) }}
+{{ return(seconds) }}
+{% endmacro %}
+
+
+{% macro manage_indexes(relation=this) %}
+{#- Post-hook: bring the table's indexes and compression in line with its config; returns no SQL -#}
+{%- if not execute or not (config.get('indexes') or config.get('data_compression')) -%}
+{{ return('') }}
+{%- endif -%}
+{%- set desired = desired_indexes(relation) -%}
+{%- set existing = existing_indexes(relation) -%}
+{%- set started = modules.datetime.datetime.now() -%}
+{%- set changes = [] -%}
+
+{#- The clustered (rowstore or columnstore) index first: replacing it rebuilds every other index -#}
+{%- set clustered = (desired | selectattr('type_desc', 'in', ['CLUSTERED', 'CLUSTERED COLUMNSTORE']) | list + [none])[0] -%}
+{%- set current = (existing.values() | selectattr('index_id', 'equalto', 1) | list + [none])[0] -%}
+{%- if current is not none and (clustered is none or not index_matches(current, clustered) or current['name'] != clustered['name']) -%}
+    {%- if clustered is not none or is_managed_index(relation, current['name']) -%}
+        {%- do run_timed("drop index [" ~ current['name'] ~ "] on " ~ relation, "Dropped index " ~ current['name'] ~ " on " ~ relation) -%}
+        {%- do changes.append(current['name']) -%}
+        {%- set current = none -%}
+    {%- endif -%}
+{%- endif -%}
+{%- if clustered is not none and current is none -%}
+    {%- do run_timed(create_index_sql(relation, clustered), "Built index " ~ clustered['name'] ~ " on " ~ relation) -%}
+    {%- do changes.append(clustered['name']) -%}
+{%- endif -%}
+
+{#- Nonclustered indexes: drop managed ones that are no longer declared or have changed, build missing ones -#}
+{%- set nonclustered = desired | selectattr('type_desc', 'equalto', 'NONCLUSTERED') | list -%}
+{%- for index in existing.values() | list if index['index_id'] > 1 and is_managed_index(relation, index['name']) -%}
+    {%- set declared = (nonclustered | selectattr('name', 'equalto', index['name']) | list + [none])[0] -%}
+    {%- if declared is none or not index_matches(index, declared) -%}
+        {%- do run_timed("drop index [" ~ index['name'] ~ "] on " ~ relation, "Dropped index " ~ index['name'] ~ " on " ~ relation) -%}
+        {%- do existing.pop(index['name']) -%}
+        {%- do changes.append(index['name']) -%}
+    {%- endif -%}
+{%- endfor -%}
+{%- for index in nonclustered if index['name'] not in existing -%}
+    {%- do run_timed(create_index_sql(relation, index), "Built index " ~ index['name'] ~ " on " ~ relation) -%}
+    {%- do changes.append(index['name']) -%}
+{%- endfor -%}
+
+{#- A heap keeps its own compression setting -#}
+{%- set heap = existing.get('') -%}
+{%- set table_compression = (config.get('data_compression') or 'none') | upper -%}
+{%- if clustered is none and heap is not none and heap['compression'] != table_compression -%}
+    {%- do run_timed("alter table " ~ relation ~ " rebuild with (data_compression = " ~ table_compression ~ ")",
+                     "Rebuilt heap " ~ relation ~ " with " ~ table_compression ~ " compression") -%}
+    {%- do changes.append('heap') -%}
+{%- endif -%}
+
+{%- set seconds = (modules.datetime.datetime.now() - started).total_seconds() -%}
+{%- if changes -%}
+{{ log("Storage layout of " ~ relation ~ ": " ~ changes | length ~ " change(s) in " ~ '%.2f' | format(seconds) ~ "s", info=True) }}
+{%- else -%}
+{{ log("Storage layout of " ~ relation ~ " is up to date", info=False) }}
+{%- endif -%}
+{{ return('') }}
+{% endmacro %}
@@ -0,0 +1,42 @@
+{#-
+    The loader stamps every staged row with run_key_ref and _dbt_loaded_at (see
+    scripts/elt/load.py), and the slices a successful build has processed are purged, so
+    staging_financial_orders only holds what is still waiting for dbt: the current run's
+    slice, plus the slices of any earlier run whose build failed.
+-#}
+
+{% macro staging_cutoff() %}
+{#- Rows loaded up to this run's start belong to it; later loads wait for the next build -#}
+{{ return("cast('" ~ run_started_at.strftime('%Y-%m-%d %H:%M:%S') ~ "' as datetime2)") }}
+{% endmacro %}
+
+
+{% macro purge_staging_slices() %}
+{#-
+    on-run-end: delete the staged rows this build read, once fct.orders was built and nothing
+    failed. Only runs with the purge_staging var, which the orchestration sets
+    (dags/utils/dbt_runner.py), so ad hoc builds leave staging alone.
+-#}
+{%- if not execute or not var('purge_staging', false) -%}
+{{ return('') }}
+{%- endif -%}
+{%- set orders = results | selectattr('node.name', 'equalto', 'orders') | list -%}
+{%- set problems = results | selectattr('status', 'in', ['error', 'fail', 'skipped', 'runtime error']) | list -%}
+{%- if not orders or orders[0].status != 'success' or problems -%}
+{{ log("Keeping the staged slices: fct.orders was not built or the build had failures", info=True) }}
+{{ return('') }}
+{%- endif -%}
+
+{%- set staging = api.Relation.create(
+    database=env_var('TARGET_DB_SCHEMA'),
+    schema=env_var('TARGET_SCHEMA'),
+    identifier='staging_financial_orders'
+) -%}
+{%- set started = modules.datetime.datetime.now() -%}
+{#- Always bounded by the cutoff: a load that commits mid-purge must survive for the next build -#}
+{%- do run_query("delete from " ~ staging ~ " where _dbt_loaded_at is null or _dbt_loaded_at <= " ~ staging_cutoff()) -%}
+{%- set seconds = (modules.datetime.datetime.now() - started).total_seconds() -%}
+{%- set later = run_query("select count(*) from " ~ staging).columns[0].values()[0] -%}
+{{ log("Purged the processed slices of " ~ staging ~ " in " ~ '%.2f' | format(seconds) ~ "s; " ~ later ~ " later row(s) kept", info=True) }}
+{{ return('') }}
+{% endmacro %}
@@ -5,6 +5,11 @@
     unique_key=['user_identifier'],
     on_schema_change='ignore',
     wrap_in_transaction=False,
+    indexes=[
+        {'type': 'clustered', 'columns': ['account_key'], 'unique': true},
+        {'type': 'nonclustered', 'columns': ['user_identifier']}
+    ],
+    data_compression='page',
     pre_hook= "{{ set_identity_insert(dim.cust_profile, 'ON') }}" -- DBT will automatically turn OFF identity insert after the model runs
 ) }}
 
@@ -5,6 +5,11 @@
     unique_key=['status_description'],
     on_schema_change='ignore',
     wrap_in_transaction=False,
+    indexes=[
+        {'type': 'clustered', 'columns': ['approval_key'], 'unique': true},
+        {'type': 'nonclustered', 'columns': ['status_description']}
+    ],
+    data_compression='page',
     pre_hook= "{{ set_identity_insert(dim.ord_auth, 'ON') }}" -- DBT will automatically turn OFF identity insert after the model runs
 ) }}
 
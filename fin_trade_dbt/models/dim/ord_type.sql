@@ -5,6 +5,11 @@
     unique_key=['operation_code'],
     on_schema_change='ignore',
     wrap_in_transaction=False,
+    indexes=[
+        {'type': 'clustered', 'columns': ['operation_key'], 'unique': true},
+        {'type': 'nonclustered', 'columns': ['operation_code']}
+    ],
+    data_compression='page',
     pre_hook= "{{ set_identity_insert(dim.ord_type, 'ON') }}" -- DBT will automatically turn OFF identity insert after the model runs
 ) }}
 
@@ -5,6 +5,11 @@
     unique_key=['product_type', 'category_level_3', 'category_level_4'],
     on_schema_change='ignore',
     wrap_in_transaction=False,
+    indexes=[
+        {'type': 'clustered', 'columns': ['category_key'], 'unique': true},
+        {'type': 'nonclustered', 'columns': ['product_type', 'category_level_3']}
+    ],
+    data_compression='page',
     pre_hook= "{{ set_identity_insert(dim.prd_category, 'ON') }}" -- DBT will automatically turn OFF identity insert after the model runs
 ) }}
 
@@ -5,6 +5,11 @@
     unique_key=['provider_code'],
     on_schema_change='ignore',
     wrap_in_transaction=False,
+    indexes=[
+        {'type': 'clustered', 'columns': ['provider_key'], 'unique': true},
+        {'type': 'nonclustered', 'columns': ['provider_code']}
+    ],
+    data_compression='page',
     pre_hook= "{{ set_identity_insert(dim.prd_provider, 'ON') }}" -- DBT will automatically turn OFF identity insert after the model runs
 ) }}
 
@@ -1,55 +1,92 @@
 {{ config(
     schema='fct',
     materialized= 'incremental',
-    incremental_strategy= 'append',
+    incremental_strategy= 'merge',
     unique_key=['natural_key'],
-    on_schema_change='ignore',
+    merge_exclude_columns=['id'],
+    on_schema_change='append_new_columns',
     wrap_in_transaction=False,
+    indexes=[
+        {'type': 'columnstore'},
+        {'type': 'nonclustered', 'columns': ['natural_key'], 'unique': true},
+        {'type': 'nonclustered', 'columns': ['id']}
+    ],
     pre_hook= "{{ set_identity_insert(fct.orders, 'ON') }}" -- DBT will automatically turn OFF identity insert after the model runs
 ) }}
 
+{#- deleted_at is added to an existing fact by on_schema_change; until then there is nothing to compare with -#}
+{%- set fact_deleted_at = 't.deleted_at' if is_incremental()
+    and 'deleted_at' in adapter.get_columns_in_relation(this) | map(attribute='name') | map('lower') | list
+    else 'cast(null as datetime2)' %}
+
 with src_ord as (
     SELECT  
         f.[record_id] as natural_key,
         f.[creation_timestamp] as create_date,
         f.[modification_timestamp] as update_date,
-        cp.[account_key],
-        oa.[approval_key],
-        pc.category_key,
+        f.[deletion_timestamp] as deleted_at,
+        coalesce(f.[account_key], cp.[account_key]) as account_key,
+        coalesce(f.[approval_key], oa.[approval_key]) as approval_key,
+        coalesce(f.[category_key], pc.[category_key]) as category_key,
         f.[quote_amount],
         f.[base_amount],
         f.[execution_price],
-        os.direction_key,
-        ot.operation_key,
+        coalesce(f.[direction_key], os.[direction_key]) as direction_key,
+        coalesce(f.[operation_key], ot.[operation_key]) as operation_key,
         f.[executed_amount],
         f.[total_quote_executed] as gross_amount,
         f.[fee_amount],
-        pp.provider_key,
+        coalesce(f.[provider_key], pp.[provider_key]) as provider_key,
         f.[provider_quoted_price],
         f.[provider_fee],
-        case when category_key=19 and [direction_key]=1 then  f.[base_amount] - (f.[fee_amount]/f.[execution_price])
-            when category_key=19 and [direction_key]=2 then -f.[base_amount]
-            when category_key=18 and [direction_key]=1 then  f.[base_amount]
-            when category_key=18 and [direction_key]=2 then -f.[base_amount]
+        case when coalesce(f.[category_key], pc.[category_key])=19 and coalesce(f.[direction_key], os.[direction_key])=1 then  f.[base_amount] - (f.[fee_amount]/f.[execution_price])
+            when coalesce(f.[category_key], pc.[category_key])=19 and coalesce(f.[direction_key], os.[direction_key])=2 then -f.[base_amount]
+            when coalesce(f.[category_key], pc.[category_key])=18 and coalesce(f.[direction_key], os.[direction_key])=1 then  f.[base_amount]
+            when coalesce(f.[category_key], pc.[category_key])=18 and coalesce(f.[direction_key], os.[direction_key])=2 then -f.[base_amount]
         end as net_position_change,
-        f.[run_key_ref]
+        f.[run_key_ref],
+        t.[id] as existing_id
     FROM {{ ref('stg_orders') }} f
-    inner join {{ ref('ord_auth')}} as oa on isnull(oa.[status_description],'0') = isnull(f.status_code,'0')
-    inner join {{ ref('prd_category')}} as pc on isnull(pc.category_level_3,'0') = isnull(f.market_symbol,'0') 
+    -- Keys are resolved in the EL step; the dimension joins only run for rows whose code had no key yet
+    left join {{ ref('ord_auth')}} as oa on f.[approval_key] is null
+        and isnull(oa.[status_description],'0') = isnull(f.status_code,'0')
+    left join {{ ref('prd_category')}} as pc on f.[category_key] is null
+        and isnull(pc.category_level_3,'0') = isnull(f.market_symbol,'0')
         and isnull(pc.product_type,'0') = isnull(f.base_currency,'0')
-    inner join {{ ref('ord_side')}} as os on isnull(os.direction_code,'0') = isnull(f.order_direction,'0')
-    inner join {{ ref('ord_type')}} as ot on isnull(ot.operation_code,'0') = isnull(f.order_type,'0')
-    inner join {{ ref('cust_profile')}} as cp on isnull(cp.[user_identifier],'0') = isnull(f.user_identifier,'0')
-    inner join {{ ref('prd_provider')}} as pp on isnull(pp.provider_code,'0') = isnull(f.liquidity_provider,'0')
+    left join {{ ref('ord_side')}} as os on f.[direction_key] is null
+        and isnull(os.direction_code,'0') = isnull(f.order_direction,'0')
+    left join {{ ref('ord_type')}} as ot on f.[operation_key] is null
+        and isnull(ot.operation_code,'0') = isnull(f.order_type,'0')
+    left join {{ ref('cust_profile')}} as cp on f.[account_key] is null
+        and isnull(cp.[user_identifier],'0') = isnull(f.user_identifier,'0')
+    left join {{ ref('prd_provider')}} as pp on f.[provider_key] is null
+        and isnull(pp.provider_code,'0') = isnull(f.liquidity_provider,'0')
     left join {{ this }} t on t.natural_key = f.record_id
-    where t.natural_key is null
+    -- New rows, whatever their create_date (backfills and late arrivals included), and rows the EL
+    -- step's change capture merged into staging with a later modification or a changed soft deletion
+    where (t.natural_key is null
+            or f.[modification_timestamp] > coalesce(t.update_date, t.create_date)
+            or isnull(f.[deletion_timestamp], '1900-01-01') <> isnull({{ fact_deleted_at }}, '1900-01-01'))
+        -- Same rows as the former inner joins: every key must resolve one way or the other
+        and coalesce(f.[approval_key], oa.[approval_key]) is not null
+        and coalesce(f.[category_key], pc.[category_key]) is not null
+        and coalesce(f.[direction_key], os.[direction_key]) is not null
+        and coalesce(f.[operation_key], ot.[operation_key]) is not null
+        and coalesce(f.[account_key], cp.[account_key]) is not null
+        and coalesce(f.[provider_key], pp.[provider_key]) is not null
 ),
 numbered_records as (
     select 
-        ROW_NUMBER() OVER (ORDER BY create_date) + COALESCE((select max(id) from {{ this }}), 0) as id,
+        -- Changed rows keep their id; new rows are numbered after the current maximum
+        case when existing_id is not null then existing_id
+            else ROW_NUMBER() OVER (ORDER BY case when existing_id is null then 0 else 1 end, create_date)
+                + COALESCE((select max(id) from {{ this }}), 0)
+        end as id,
+        existing_id,
         natural_key,
         create_date,
         update_date,
+        deleted_at,
         account_key,
         approval_key,
         category_key,
@@ -73,6 +110,7 @@ select
     natural_key,
     create_date,
     update_date,
+    deleted_at,
     account_key,
     approval_key,
     category_key,
@@ -90,7 +128,4 @@ select
     provider_fee,
     net_position_change,
     run_key_ref
-from numbered_records
-{% if is_incremental() %}
-  where create_date > (select coalesce(max(create_date), '1900-01-01') from {{ this }})
-{% endif %} 
\ No newline at end of file
+from numbered_records 
\ No newline at end of file
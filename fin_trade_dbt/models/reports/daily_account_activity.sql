@@ -3,11 +3,30 @@
     materialized= 'incremental',
     incremental_strategy= 'merge',
     unique_key= ['account_key', 'activity_date'],
-    on_schema_change='sync_all_columns'
+    on_schema_change='sync_all_columns',
+    indexes=[{'type': 'clustered', 'columns': ['account_key', 'activity_date'], 'unique': true}],
+    data_compression='page'
 ) }}
 
 -- Calculate daily metrics for each account
 with daily_new_accounts as (
+{%- if var('reports_from_rollups', false) %}
+    -- Summed from the EL step's daily account rollup instead of rescanning orders
+    select 
+        account_key,
+        activity_date,
+        min(first_created_at) as first_activity_date,
+        max(last_created_at) as last_activity_date,
+        sum(order_count) as total_events,
+        sum(case when direction_code = 'BUY' then base_amount_sum else 0 end) as total_inbound,
+        sum(case when direction_code = 'SELL' then base_amount_sum else 0 end) as total_outbound,
+        sum(fee_amount_sum) as total_fees
+    from ({{ account_rollup_rows() }}) r
+    where status_code = 1
+    group by 
+        account_key,
+        activity_date
+{%- else %}
     select 
         cp.account_key,
         cast(o.create_date as date) as activity_date,
@@ -28,6 +47,7 @@ with daily_new_accounts as (
     group by 
         cp.account_key,
         cast(o.create_date as date)
+{%- endif %}
 ),
 
 -- Calculate account lifecycle metrics including activity day numbering
@@ -67,5 +87,5 @@ select
 from account_metrics
 
 {% if is_incremental() %}
-where activity_date > (select max(activity_date) from {{ this }})
+where {{ incremental_date_filter('activity_date') }}
 {% endif %} 
\ No newline at end of file
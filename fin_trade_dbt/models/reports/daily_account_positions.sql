@@ -3,43 +3,81 @@
     materialized= 'incremental',
     incremental_strategy= 'merge',
     unique_key= ['account_key', 'balance_date'],
-    on_schema_change='sync_all_columns'
+    on_schema_change='sync_all_columns',
+    indexes=[{'type': 'clustered', 'columns': ['account_key', 'balance_date'], 'unique': true}],
+    data_compression='page'
 ) }}
 
+{#-
+    Incremental runs only aggregate the days from recompute_from onwards and add them to each
+    account's totals as of its last persisted day before that, instead of re-running the window
+    sums over the whole order history. recompute_from is the day after the latest persisted day,
+    or an earlier date to repair late-arriving orders: positions_repair_from, or the first date
+    the EL step touched (el_start_date). Every day from there on is recomputed, since a late
+    order changes the running totals of all later days.
+-#}
+{%- set repair_from = var('positions_repair_from', none) or var('el_start_date', none) -%}
+{%- if repair_from -%}
+    {%- set recompute_from = "cast('" ~ repair_from ~ "' as date)" -%}
+{%- else -%}
+    {%- set recompute_from = "coalesce((select dateadd(day, 1, max(balance_date)) from " ~ this ~ "), cast('1900-01-01' as date))" -%}
+{%- endif %}
+
 with daily_balances as (
+{%- if is_incremental() %}
+    {{ account_daily_balances(recompute_from) }}
+{%- else %}
+    {{ account_daily_balances() }}
+{%- endif %}
+),
+
+{% if is_incremental() -%}
+-- Each account's totals as of its last persisted day before the recomputed range
+opening_totals as (
     select 
-        cp.account_key,
-        cast(o.create_date as date) as balance_date,
-        sum(case when os.direction_code = 'BUY' then o.base_amount else 0 end) as daily_inbound,
-        sum(case when os.direction_code = 'SELL' then o.base_amount else 0 end) as daily_outbound,
-        sum(o.fee_amount) as daily_fees,
-        count(distinct o.natural_key) as daily_transactions
-    from {{ ref('orders') }} o
-    inner join {{ ref('cust_profile') }} cp 
-        on o.account_key = cp.account_key
-    inner join {{ ref('ord_side') }} os
-        on o.direction_key = os.direction_key
-    inner join {{ ref('ord_auth') }} oa
-        on o.approval_key = oa.approval_key
-    where oa.status_code = 1
-    group by 
-        cp.account_key,
-        cast(o.create_date as date)
+        account_key,
+        total_inbound,
+        total_outbound,
+        total_fees,
+        total_transactions
+    from (
+        select 
+            account_key,
+            total_inbound,
+            total_outbound,
+            total_fees,
+            total_transactions,
+            row_number() over (partition by account_key order by balance_date desc) as day_rank
+        from {{ this }}
+        where balance_date < {{ recompute_from }}
+    ) persisted
+    where day_rank = 1
 ),
 
+{% endif -%}
 running_totals as (
     select 
-        account_key,
-        balance_date,
-        daily_inbound,
-        daily_outbound,
-        daily_fees,
-        daily_transactions,
-        sum(daily_inbound) over (partition by account_key order by balance_date) as total_inbound,
-        sum(daily_outbound) over (partition by account_key order by balance_date) as total_outbound,
-        sum(daily_fees) over (partition by account_key order by balance_date) as total_fees,
-        sum(daily_transactions) over (partition by account_key order by balance_date) as total_transactions
-    from daily_balances
+        d.account_key,
+        d.balance_date,
+        d.daily_inbound,
+        d.daily_outbound,
+        d.daily_fees,
+        d.daily_transactions,
+{%- if is_incremental() %}
+        coalesce(ot.total_inbound, 0) + sum(d.daily_inbound) over (partition by d.account_key order by d.balance_date) as total_inbound,
+        coalesce(ot.total_outbound, 0) + sum(d.daily_outbound) over (partition by d.account_key order by d.balance_date) as total_outbound,
+        coalesce(ot.total_fees, 0) + sum(d.daily_fees) over (partition by d.account_key order by d.balance_date) as total_fees,
+        coalesce(ot.total_transactions, 0) + sum(d.daily_transactions) over (partition by d.account_key order by d.balance_date) as total_transactions
+    from daily_balances d
+    left join opening_totals ot
+        on ot.account_key = d.account_key
+{%- else %}
+        sum(d.daily_inbound) over (partition by d.account_key order by d.balance_date) as total_inbound,
+        sum(d.daily_outbound) over (partition by d.account_key order by d.balance_date) as total_outbound,
+        sum(d.daily_fees) over (partition by d.account_key order by d.balance_date) as total_fees,
+        sum(d.daily_transactions) over (partition by d.account_key order by d.balance_date) as total_transactions
+    from daily_balances d
+{%- endif %}
 )
 
 select 
@@ -60,7 +98,3 @@ select
         else 'Zero'
     end as balance_status
 from running_totals
-
-{% if is_incremental() %}
-where balance_date > (select max(balance_date) from {{ this }})
-{% endif %} 
\ No newline at end of file
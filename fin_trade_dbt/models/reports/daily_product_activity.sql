@@ -3,10 +3,31 @@
     materialized= 'incremental',
     incremental_strategy= 'merge',
     unique_key= ['account_key', 'detail_date'],
-    on_schema_change='sync_all_columns'
+    on_schema_change='sync_all_columns',
+    indexes=[{'type': 'clustered', 'columns': ['account_key', 'detail_date'], 'unique': true}],
+    data_compression='page'
 ) }}
 
 with daily_details as (
+{%- if var('reports_from_rollups', false) %}
+    -- Summed from the EL step's daily account rollup instead of rescanning orders
+    select 
+        account_key,
+        activity_date as detail_date,
+        product_type,
+        direction_code,
+        sum(order_count) as transaction_count,
+        sum(base_amount_sum) as total_amount,
+        sum(fee_amount_sum) as total_fees,
+        sum(base_amount_sum) / nullif(sum(amount_count), 0) as avg_transaction_size
+    from ({{ account_rollup_rows() }}) r
+    where status_code = 1
+    group by 
+        account_key,
+        activity_date,
+        product_type,
+        direction_code
+{%- else %}
     select 
         cp.account_key,
         cast(o.create_date as date) as detail_date,
@@ -31,6 +52,7 @@ with daily_details as (
         cast(o.create_date as date),
         pc.product_type,
         os.direction_code
+{%- endif %}
 ),
 
 account_metrics as (
@@ -67,5 +89,5 @@ select
 from account_metrics
 
 {% if is_incremental() %}
-where detail_date > (select max(detail_date) from {{ this }})
+where {{ incremental_date_filter('detail_date') }}
 {% endif %} 
\ No newline at end of file
@@ -3,10 +3,29 @@
     materialized= 'incremental',
     incremental_strategy= 'merge',
     unique_key= ['account_key', 'status_date'],
-    on_schema_change='sync_all_columns'
+    on_schema_change='sync_all_columns',
+    indexes=[{'type': 'clustered', 'columns': ['account_key', 'status_date'], 'unique': true}],
+    data_compression='page'
 ) }}
 
 with daily_status as (
+{%- if var('reports_from_rollups', false) %}
+    -- Summed from the EL step's daily account rollup instead of rescanning orders
+    select 
+        account_key,
+        activity_date as status_date,
+        sum(order_count) as total_transactions,
+        sum(case when status_code = 1 then order_count else 0 end) as completed_transactions,
+        sum(case when status_code = 2 then order_count else 0 end) as pending_transactions,
+        sum(case when status_code = 0 then order_count else 0 end) as rejected_transactions,
+        sum(case when status_code = 1 then base_amount_sum else 0 end) as completed_volume,
+        sum(case when status_code = 2 then base_amount_sum else 0 end) as pending_volume,
+        sum(case when status_code = 0 then base_amount_sum else 0 end) as rejected_volume
+    from ({{ account_rollup_rows() }}) r
+    group by 
+        account_key,
+        activity_date
+{%- else %}
     select 
         cp.account_key,
         cast(o.create_date as date) as status_date,
@@ -25,6 +44,7 @@ with daily_status as (
     group by 
         cp.account_key,
         cast(o.create_date as date)
+{%- endif %}
 )
 
 select 
@@ -48,5 +68,5 @@ select
 from daily_status
 
 {% if is_incremental() %}
-where status_date > (select max(status_date) from {{ this }})
+where {{ incremental_date_filter('status_date') }}
 {% endif %} 
\ No newline at end of file
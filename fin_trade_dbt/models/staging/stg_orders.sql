@@ -1,5 +1,8 @@
 with source as (
     select * from {{ source('financial_data', 'staging_financial_orders') }}
+    -- The staged slices this run processes; rows loaded after it started wait for the next build.
+    -- Rows staged before the loader stamped _dbt_loaded_at are included.
+    where _dbt_loaded_at is null or _dbt_loaded_at <= {{ staging_cutoff() }}
 ),
 
 orders as (
@@ -45,7 +48,16 @@ orders as (
         liquidity_provider,
         provider_response,
         
+        -- Dimension keys resolved during EL (null when the code had no dimension row yet)
+        account_key,
+        approval_key,
+        category_key,
+        direction_key,
+        operation_key,
+        provider_key,
+        
         -- Metadata
+        run_key_ref,
         _dbt_loaded_at as dbt_loaded_at,
         _dbt_source_relation as dbt_source_relation
 
@@ -0,0 +1,19 @@
+"""
+Benchmark package for fin_trade pipeline.
+Contains an offline benchmark suite for the EL path and the DAG parse.
+
+Modules:
+- synthetic.py: Deterministic synthetic financial_events generator
+- standins.py: Local SQLite stand-ins for the MySQL source and SQL Server target
+- run_benchmarks.py: Runs each benchmark in its own process and checks results against a JSON baseline
+- dag_parse.py: Measures Airflow parse time, Variable lookups and heavy imports of the DAG file
+
+Usage:
+    $ python -m scripts.bench.run_benchmarks --sizes 100000
+    $ python -m scripts.bench.dag_parse --baseline-ref HEAD~1
+"""
+
+from .synthetic import generate_financial_events
+from .standins import create_source, create_target, standin_environment
+
+__all__ = ['generate_financial_events', 'create_source', 'create_target', 'standin_environment']
\ No newline at end of file
@@ -0,0 +1,129 @@
+"""
+DAG parse benchmark for fin_trade pipeline.
+Measures how long the scheduler takes to parse dags/dbt_dag.py and what parsing drags in.
+
+Each run parses the DAG file with a DagBag in a fresh Python process (after
+Airflow itself is imported, so only the DAG file is timed) and reports the
+parse time, the number of Variable.get calls made while parsing and which
+heavy pipeline modules got imported. --baseline-ref parses the DAG file from
+an earlier git revision the same way, for a before/after comparison.
+
+Usage:
+    $ python -m scripts.bench.dag_parse --runs 10
+    $ python -m scripts.bench.dag_parse --runs 10 --baseline-ref HEAD~1
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+REPO_DIR = Path(__file__).resolve().parent.parent.parent.parent
+DAGS_DIR = os.path.join(REPO_DIR, 'dags')
+
+# Modules that should never be imported while the scheduler parses the DAG file
+HEAVY_MODULES = [
+    'pandas', 'pyarrow', 'prometheus_client', 'pythonjsonlogger',
+    'scripts.utils.logger', 'scripts.utils.engine_registry', 'scripts.elt'
+]
+
+_PARSE_SCRIPT = """
+import json, sys, time
+from airflow.models import Variable
+from airflow.models.dagbag import DagBag
+
+calls = []
+original_get = Variable.get
+
+def counting_get(key, *args, **kwargs):
+    calls.append(key)
+    try:
+        return original_get(key, *args, **kwargs)
+    except KeyError:
+        return 'unset'
+
+Variable.get = counting_get
+before = set(sys.modules)
+started = time.perf_counter()
+bag = DagBag(dag_folder=sys.argv[1], include_examples=False, safe_mode=False)
+seconds = time.perf_counter() - started
+print(json.dumps({
+    'seconds': seconds,
+    'variable_gets': len(calls),
+    'dags': len(bag.dags),
+    'import_errors': {path: str(error)[:500] for path, error in bag.import_errors.items()},
+    'heavy_modules': sorted(m for m in json.loads(sys.argv[2]) if m in sys.modules and m not in before)
+}))
+"""
+
+def parse_once(dag_file):
+    """Parse a DAG file in a fresh interpreter and return its measurements."""
+    completed = subprocess.run(
+        [sys.executable, '-c', _PARSE_SCRIPT, dag_file, json.dumps(HEAVY_MODULES)],
+        cwd=os.path.dirname(dag_file), capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Parsing {dag_file} failed:\n{completed.stderr[-4000:]}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def measure(dag_file, runs):
+    """
+    Parse a DAG file `runs` times.
+
+    Returns:
+        dict: median/min parse seconds, Variable.get calls and heavy imports of the last run
+    """
+    results = [parse_once(dag_file) for _ in range(runs)]
+    times = [result['seconds'] for result in results]
+    return {
+        'dag_file': dag_file,
+        'runs': runs,
+        'median_seconds': round(statistics.median(times), 4),
+        'min_seconds': round(min(times), 4),
+        'variable_gets': results[-1]['variable_gets'],
+        'heavy_modules': results[-1]['heavy_modules'],
+        'import_errors': results[-1]['import_errors']
+    }
+
+def _checkout_dags(ref, workdir):
+    """Copy dags/ as of a git revision into workdir and return the DAG file path."""
+    target = os.path.join(workdir, 'dags')
+    archive = subprocess.run(['git', 'archive', ref, 'dags'], cwd=REPO_DIR, capture_output=True, check=True)
+    subprocess.run(['tar', '-x', '-C', workdir], input=archive.stdout, check=True)
+    return os.path.join(target, 'dbt_dag.py')
+
+def _report(label, result):
+    print(f"{label:<10} median {result['median_seconds']:>8}s  min {result['min_seconds']:>8}s  "
+          f"Variable.get x{result['variable_gets']:<3} heavy imports: {', '.join(result['heavy_modules']) or 'none'}")
+    for path, error in result['import_errors'].items():
+        print(f"{'':<10} import error in {path}: {error}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark parsing of the fin_trade Airflow DAG.")
+    parser.add_argument('--dag-file', default=os.path.join(DAGS_DIR, 'dbt_dag.py'))
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--baseline-ref', help="Also parse the DAG file from this git revision")
+    args = parser.parse_args(argv)
+
+    results = {'current': measure(args.dag_file, args.runs)}
+    if args.baseline_ref:
+        workdir = tempfile.mkdtemp(prefix='dag_parse_')
+        try:
+            results['baseline'] = measure(_checkout_dags(args.baseline_ref, workdir), args.runs)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    for label in ('baseline', 'current'):
+        if label in results:
+            _report(label, results[label])
+    if 'baseline' in results and results['current']['median_seconds'] > 0:
+        print(f"Speed-up: {results['baseline']['median_seconds'] / results['current']['median_seconds']:.1f}x")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,195 @@
+"""
+Benchmark runner for fin_trade pipeline.
+Measures rows/sec and peak RSS of the EL entry points against local stand-in databases.
+
+Every (benchmark, rows) case runs in a fresh Python process, so peak RSS is the
+case's own high-water mark and no engine, cache or pool is shared between cases.
+Results are compared with a JSON baseline and regressions beyond the threshold
+make the run exit non-zero.
+
+Usage:
+    $ python -m scripts.bench.run_benchmarks --sizes 100000 1000000 10000000
+    $ python -m scripts.bench.run_benchmarks --sizes 100000 --update-baseline
+"""
+
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+BENCH_CONFIG = {
+    'SIZES': [100000, 1000000, 10000000],
+    'SEED': 42,
+    'PAYLOAD_BYTES': 1024,
+    'THRESHOLD': 0.15,  # Allowed fractional drop in rows/sec or growth in peak RSS
+    'WORKDIR': os.path.join(BASE_DIR, 'bench_data'),
+    'BASELINE': os.path.join(BASE_DIR, 'scripts', 'bench', 'baselines.json')
+}
+
+def _peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+def bench_extract_data(rows, seed, payload_bytes):
+    """Time a full extract_data() of the stand-in source."""
+    from ..elt.extract import extract_data
+
+    started = time.perf_counter()
+    df = extract_data()
+    return len(df), time.perf_counter() - started
+
+def bench_load_to_sql_server(rows, seed, payload_bytes):
+    """Time load_to_sql_server() over the generated data set, one call per chunk."""
+    from ..elt.load import get_last_processed_data, load_to_sql_server
+    from ..elt.schema import apply_schema, EXTRACT_DTYPES
+    from .synthetic import generate_financial_events
+
+    # Creates the watermark table, as run_pipeline does before its first load
+    get_last_processed_data()
+    loaded, seconds = 0, 0.0
+    for chunk in generate_financial_events(rows, seed, payload_bytes=payload_bytes):
+        df = apply_schema(chunk[list(EXTRACT_DTYPES)])
+        started = time.perf_counter()
+        load_to_sql_server(df)
+        seconds += time.perf_counter() - started
+        loaded += len(df)
+    return loaded, seconds
+
+def bench_get_last_processed_data(rows, seed, payload_bytes):
+    """Time the watermark lookup, bootstrapping from a fact table of `rows` keys."""
+    from ..elt.load import get_last_processed_data
+
+    started = time.perf_counter()
+    get_last_processed_data()
+    return rows, time.perf_counter() - started
+
+def bench_run_pipeline(rows, seed, payload_bytes):
+    """Time a complete run_pipeline() from the stand-in source into an empty target."""
+    from ..elt.el_pipeline import run_pipeline
+
+    started = time.perf_counter()
+    run_pipeline()
+    return rows, time.perf_counter() - started
+
+BENCHMARKS = {
+    'extract_data': bench_extract_data,
+    'load_to_sql_server': bench_load_to_sql_server,
+    'get_last_processed_data': bench_get_last_processed_data,
+    'run_pipeline': bench_run_pipeline
+}
+
+def _prepare(benchmark, rows, seed, payload_bytes, workdir):
+    """Build the stand-ins a case needs and return its environment."""
+    from .standins import create_source, create_target, add_fact_keys, standin_environment
+
+    source_url = 'sqlite://'
+    if benchmark in ('extract_data', 'run_pipeline'):
+        source_url = create_source(os.path.join(workdir, f"source_{rows}_{seed}.db"), rows, seed, payload_bytes)
+    target_path = os.path.join(workdir, f"target_{benchmark}.db")
+    target_url = create_target(target_path, rows)
+    if benchmark == 'get_last_processed_data':
+        add_fact_keys(target_path, rows)
+    shutil.rmtree(os.path.join(workdir, 'spool'), ignore_errors=True)
+    return standin_environment(source_url, target_url, workdir)
+
+def run_case(benchmark, rows, seed, payload_bytes, workdir):
+    """
+    Run one benchmark case in a child process.
+
+    Returns:
+        dict: benchmark, rows, seconds, rows_per_sec, peak_rss_mb
+    """
+    env = dict(os.environ, **_prepare(benchmark, rows, seed, payload_bytes, workdir))
+    command = [
+        sys.executable, '-m', 'scripts.bench.run_benchmarks', '--worker', benchmark,
+        '--sizes', str(rows), '--seed', str(seed), '--payload-bytes', str(payload_bytes)
+    ]
+    completed = subprocess.run(command, cwd=BASE_DIR, env=env, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"{benchmark} at {rows} rows failed:\n{completed.stderr[-4000:]}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def compare(results, baseline, threshold):
+    """
+    Compare results with a baseline.
+
+    Returns:
+        list: Human-readable regression descriptions, empty if none
+    """
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if not base:
+            continue
+        if result['rows_per_sec'] < base['rows_per_sec'] * (1 - threshold):
+            regressions.append(f"{key}: {result['rows_per_sec']} rows/sec vs baseline {base['rows_per_sec']}")
+        if result['peak_rss_mb'] > base['peak_rss_mb'] * (1 + threshold):
+            regressions.append(f"{key}: peak RSS {result['peak_rss_mb']} MB vs baseline {base['peak_rss_mb']} MB")
+    return regressions
+
+def _worker(benchmark, rows, seed, payload_bytes):
+    # Registers CURDATE() and Decimal binding for SQLite before any engine connects
+    from . import standins  # noqa: F401
+
+    loaded, seconds = BENCHMARKS[benchmark](rows, seed, payload_bytes)
+    print(json.dumps({
+        'benchmark': benchmark,
+        'rows': loaded,
+        'seconds': round(seconds, 3),
+        'rows_per_sec': round(loaded / seconds, 1) if seconds > 0 else float(loaded),
+        'peak_rss_mb': _peak_rss_mb()
+    }))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the fin_trade EL path against local stand-ins.")
+    parser.add_argument('--benchmarks', nargs='+', choices=list(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument('--sizes', nargs='+', type=int, default=BENCH_CONFIG['SIZES'])
+    parser.add_argument('--seed', type=int, default=BENCH_CONFIG['SEED'])
+    parser.add_argument('--payload-bytes', type=int, default=BENCH_CONFIG['PAYLOAD_BYTES'])
+    parser.add_argument('--threshold', type=float, default=BENCH_CONFIG['THRESHOLD'])
+    parser.add_argument('--workdir', default=BENCH_CONFIG['WORKDIR'])
+    parser.add_argument('--baseline', default=BENCH_CONFIG['BASELINE'])
+    parser.add_argument('--update-baseline', action='store_true', help="Store these results as the new baseline")
+    parser.add_argument('--worker', choices=list(BENCHMARKS), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        _worker(args.worker, args.sizes[0], args.seed, args.payload_bytes)
+        return 0
+
+    os.makedirs(args.workdir, exist_ok=True)
+    results = {}
+    for rows in args.sizes:
+        for benchmark in args.benchmarks:
+            result = run_case(benchmark, rows, args.seed, args.payload_bytes, args.workdir)
+            results[f"{benchmark}@{rows}"] = result
+            print(f"{benchmark:<24} {rows:>10} rows  {result['seconds']:>9}s  "
+                  f"{result['rows_per_sec']:>12} rows/sec  {result['peak_rss_mb']:>9} MB peak RSS")
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as handle:
+            baseline = json.load(handle)
+
+    if args.update_baseline:
+        baseline.update(results)
+        with open(args.baseline, 'w') as handle:
+            json.dump(baseline, handle, indent=2, sort_keys=True)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    regressions = compare(results, baseline, args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
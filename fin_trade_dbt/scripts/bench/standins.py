@@ -0,0 +1,189 @@
+"""
+Stand-in databases for fin_trade benchmarks.
+Builds local SQLite files that replace the MySQL source and the SQL Server target.
+
+get_mysql_engine and get_sql_server_engine use MYSQL_URL / SQL_SERVER_URL when
+they are set, so pointing those variables at the files built here runs the real
+extract and load code paths without touching either production database.
+Importing this module adds what those paths need from SQLite: the MySQL
+functions of the extract queries and Decimal parameter binding.
+"""
+
+import os
+import sqlite3
+from datetime import date
+from decimal import Decimal
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from ..elt.bulk_loader import _decimal_text
+from .synthetic import (
+    CHUNK_ROWS, SOURCE_COLUMNS, BASE_CURRENCIES, QUOTE_CURRENCIES, LIQUIDITY_PROVIDERS,
+    ORDER_DIRECTIONS, ORDER_TYPES, STATUS_CODES, generate_financial_events
+)
+
+SOURCE_DDL = """
+CREATE TABLE financial_events (
+    id INTEGER NOT NULL,
+    created_at TEXT NOT NULL,
+    record_id INTEGER NOT NULL,
+    creation_timestamp TEXT,
+    modification_timestamp TEXT,
+    deletion_timestamp TEXT,
+    user_identifier TEXT,
+    user_email TEXT,
+    status_code INTEGER,
+    quote_currency TEXT,
+    base_currency TEXT,
+    quote_amount NUMERIC,
+    base_amount NUMERIC,
+    execution_price NUMERIC,
+    order_direction TEXT,
+    market_symbol TEXT,
+    order_type TEXT,
+    executed_amount NUMERIC,
+    total_quote_executed NUMERIC,
+    time_validity TEXT,
+    fee_amount NUMERIC,
+    provider_quoted_price NUMERIC,
+    provider_fee NUMERIC,
+    liquidity_provider TEXT,
+    provider_response TEXT
+)
+"""
+
+_TIMESTAMP_COLUMNS = ['created_at', 'creation_timestamp', 'modification_timestamp', 'deletion_timestamp']
+
+@event.listens_for(Engine, 'connect')
+def _add_mysql_functions(dbapi_connection, connection_record):
+    """Provide the MySQL functions the extract queries use on SQLite stand-ins."""
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        dbapi_connection.create_function('CURDATE', 0, lambda: date.today().isoformat())
+
+# sqlite3 cannot bind Decimal; the stand-ins store exact amounts as their fixed-point text
+sqlite3.register_adapter(Decimal, _decimal_text)
+
+def _to_records(df):
+    """Render a generated chunk as sqlite3 rows, with timestamps in MySQL's text form."""
+    df = df.copy()
+    for column in _TIMESTAMP_COLUMNS:
+        df[column] = df[column].dt.strftime('%Y-%m-%d %H:%M:%S').astype(object)
+        df.loc[df[column].isna(), column] = None
+    return list(df.astype(object).itertuples(index=False, name=None))
+
+def create_source(path, rows, seed=42, payload_bytes=1024):
+    """
+    Build a SQLite stand-in for the MySQL financial_events table.
+
+    The file is reused if it already holds the same data set, since generating
+    millions of rows takes far longer than any benchmark.
+
+    Returns:
+        str: SQLAlchemy URL of the stand-in
+    """
+    signature = f"{rows}:{seed}:{payload_bytes}"
+    if os.path.exists(path):
+        with sqlite3.connect(path) as connection:
+            try:
+                existing = connection.execute("SELECT signature FROM bench_meta").fetchone()
+            except sqlite3.OperationalError:
+                existing = None
+        if existing and existing[0] == signature:
+            return f"sqlite:///{path}"
+        os.remove(path)
+
+    connection = sqlite3.connect(path)
+    try:
+        connection.execute("PRAGMA journal_mode = OFF")
+        connection.execute("PRAGMA synchronous = OFF")
+        connection.execute(SOURCE_DDL)
+        insert = f"INSERT INTO financial_events VALUES ({', '.join('?' * len(SOURCE_COLUMNS))})"
+        for chunk in generate_financial_events(rows, seed, payload_bytes=payload_bytes):
+            connection.executemany(insert, _to_records(chunk))
+            connection.commit()
+        connection.execute("CREATE INDEX ix_financial_events_created_at_id ON financial_events (created_at, id)")
+        connection.execute("CREATE TABLE bench_meta (signature TEXT)")
+        connection.execute("INSERT INTO bench_meta VALUES (?)", (signature,))
+        connection.commit()
+    finally:
+        connection.close()
+    return f"sqlite:///{path}"
+
+def _create_dimensions(connection, users):
+    """Create the dimension tables the EL step resolves keys against."""
+    dimensions = {
+        'ord_auth': ('approval_key', 'status_description', [str(code) for code in STATUS_CODES]),
+        'ord_side': ('direction_key', 'direction_code', ORDER_DIRECTIONS),
+        'ord_type': ('operation_key', 'operation_code', ORDER_TYPES),
+        'prd_provider': ('provider_key', 'provider_code', LIQUIDITY_PROVIDERS),
+        'cust_profile': ('account_key', 'user_identifier', [f"user_{n}" for n in range(users)])
+    }
+    for table, (key_column, code_column, codes) in dimensions.items():
+        connection.execute(f"CREATE TABLE {table} ({key_column} INTEGER, {code_column} TEXT)")
+        connection.executemany(f"INSERT INTO {table} VALUES (?, ?)", list(enumerate(codes, start=1)))
+
+    markets = [
+        (base + (quote if quote != base else 'USDC'), base)
+        for base in BASE_CURRENCIES for quote in QUOTE_CURRENCIES
+    ]
+    connection.execute("CREATE TABLE prd_category (category_key INTEGER, category_level_3 TEXT, product_type TEXT)")
+    connection.executemany(
+        "INSERT INTO prd_category VALUES (?, ?, ?)",
+        [(key, market, base) for key, (market, base) in enumerate(sorted(set(markets)), start=1)]
+    )
+
+def create_target(path, rows=0, dimensions=True):
+    """
+    Build an empty SQLite stand-in for the SQL Server target.
+
+    Args:
+        path (str): Database file, replaced if it exists
+        rows (int): Rows of the data set; sizes cust_profile and, for the watermark
+                    benchmark, the fact_financial_events keys
+        dimensions (bool): Create the dimension tables used for key resolution
+
+    Returns:
+        str: SQLAlchemy URL of the stand-in
+    """
+    if os.path.exists(path):
+        os.remove(path)
+    connection = sqlite3.connect(path)
+    try:
+        if dimensions:
+            _create_dimensions(connection, max(1000, rows // 50))
+        connection.commit()
+    finally:
+        connection.close()
+    return f"sqlite:///{path}"
+
+def add_fact_keys(path, rows):
+    """Fill fact_financial_events with the keyset columns of `rows` records."""
+    connection = sqlite3.connect(path)
+    try:
+        connection.execute("CREATE TABLE fact_financial_events (creation_timestamp TEXT, record_id INTEGER)")
+        for offset in range(0, rows, CHUNK_ROWS):
+            ids = range(offset + 1, min(offset + CHUNK_ROWS, rows) + 1)
+            connection.executemany(
+                "INSERT INTO fact_financial_events VALUES (datetime('2024-01-01', '+' || (? / 2) || ' seconds'), ?)",
+                ((record_id, record_id) for record_id in ids)
+            )
+        connection.commit()
+    finally:
+        connection.close()
+
+def standin_environment(source_url, target_url, workdir):
+    """
+    Return the environment variables that point the pipeline at the stand-ins.
+
+    Returns:
+        dict: Variables to merge into the environment of a benchmark process
+    """
+    return {
+        'MYSQL_URL': source_url,
+        'MYSQL_DATABASE': 'financial_events_standin',
+        'SQL_SERVER_URL': target_url,
+        'TARGET_SCHEMA': 'main',
+        'EL_DIM_SCHEMA': 'main',
+        'EL_SPOOL_DIR': os.path.join(workdir, 'spool'),
+        'METRICS_TEXTFILE_DIR': '',
+        'METRICS_PUSHGATEWAY_URL': ''
+    }
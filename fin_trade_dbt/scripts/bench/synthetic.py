@@ -0,0 +1,142 @@
+"""
+Synthetic data module for fin_trade benchmarks.
+Generates deterministic financial_events rows with production-like cardinalities.
+
+Rows are produced in fixed-size chunks, each from its own seeded generator, so
+the same (rows, seed) pair always yields the same data regardless of how the
+caller consumes it. Popular markets, users and providers are drawn with a
+Zipf-like skew, as on a real exchange.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Rows per generated chunk; part of the seeding, so changing it changes the data
+CHUNK_ROWS = 50000
+
+BASE_CURRENCIES = [
+    'BTC', 'ETH', 'USDT', 'BNB', 'SOL', 'XRP', 'ADA', 'DOGE', 'TRX', 'TON', 'DOT', 'MATIC', 'LTC', 'SHIB',
+    'AVAX', 'LINK', 'XLM', 'ATOM', 'UNI', 'ETC', 'XMR', 'BCH', 'FIL', 'APT', 'ARB', 'OP', 'NEAR', 'ICP',
+    'AAVE', 'MKR', 'ALGO', 'SAND', 'MANA', 'AXS', 'EOS', 'XTZ', 'THETA', 'FTM', 'GRT', 'CRV', 'SNX',
+    'COMP', 'ZEC', 'DASH', 'CHZ', 'ENJ', 'BAT', '1INCH', 'KSM', 'RUNE', 'EGLD', 'HBAR', 'VET', 'QNT',
+    'FLOW', 'GALA', 'IMX', 'LDO', 'PEPE', 'SUI'
+]
+QUOTE_CURRENCIES = ['USDT', 'IRT', 'BTC', 'USDC', 'EUR']
+LIQUIDITY_PROVIDERS = ['binance', 'kucoin', 'okx', 'bybit', 'kraken', 'coinbase', 'internal', 'otc_desk']
+ORDER_DIRECTIONS = ['BUY', 'SELL']
+ORDER_TYPES = ['MARKET', 'LIMIT']
+TIME_VALIDITIES = ['GTC', 'IOC', 'FOK', 'DAY']
+# Cancelled, Completed, Pending
+STATUS_CODES = [0, 1, 2]
+STATUS_WEIGHTS = [0.15, 0.8, 0.05]
+
+# Source table layout: keyset columns first, then the extracted columns
+SOURCE_COLUMNS = [
+    'id', 'created_at', 'record_id', 'creation_timestamp', 'modification_timestamp', 'deletion_timestamp',
+    'user_identifier', 'user_email', 'status_code', 'quote_currency', 'base_currency', 'quote_amount',
+    'base_amount', 'execution_price', 'order_direction', 'market_symbol', 'order_type', 'executed_amount',
+    'total_quote_executed', 'time_validity', 'fee_amount', 'provider_quoted_price', 'provider_fee',
+    'liquidity_provider', 'provider_response'
+]
+
+def _zipf_choice(rng, size, n, exponent=1.1):
+    """Draw indexes in [0, n) where index 0 is the most popular."""
+    weights = 1.0 / np.arange(1, n + 1) ** exponent
+    return rng.choice(n, size=size, p=weights / weights.sum())
+
+def _amounts(values, places=8):
+    """Round amounts to a fixed number of decimal places, as stored in the source DECIMAL columns."""
+    return np.round(values, places)
+
+def _payloads(rng, size, payload_bytes):
+    """Build JSON-like provider responses averaging payload_bytes characters."""
+    lengths = np.clip(rng.normal(payload_bytes, payload_bytes / 4, size), 16, None).astype(int)
+    filler = 'abcdefghijklmnopqrstuvwxyz0123456789' * (int(lengths.max()) // 36 + 1)
+    offsets = rng.integers(0, 36, size)
+    return [
+        '{"status":"ok","trace":"' + filler[offset:offset + length] + '"}'
+        for offset, length in zip(offsets, lengths)
+    ]
+
+def generate_chunk(chunk_no, rows, seed=42, start='2024-01-01', users=None, payload_bytes=1024):
+    """
+    Generate one chunk of financial_events rows.
+
+    Args:
+        chunk_no (int): Chunk position; record ids start at chunk_no * CHUNK_ROWS + 1
+        rows (int): Rows in this chunk (at most CHUNK_ROWS)
+        seed (int): Base seed shared by every chunk of a data set
+        start (str): Creation time of the first record
+        users (int): Number of distinct users
+        payload_bytes (int): Average provider_response length
+
+    Returns:
+        pandas.DataFrame: Rows with SOURCE_COLUMNS, in (created_at, id) order
+    """
+    rng = np.random.default_rng([seed, chunk_no])
+    users = users or 10000
+    ids = np.arange(chunk_no * CHUNK_ROWS + 1, chunk_no * CHUNK_ROWS + rows + 1)
+
+    # About two records per second, a few sharing a timestamp so the (created_at, id) tie-break matters
+    created = pd.Timestamp(start) + pd.to_timedelta(ids // 2, unit='s')
+    modified = created + pd.to_timedelta(rng.integers(0, 3600, rows), unit='s')
+    deleted = pd.Series(created + pd.to_timedelta(86400, unit='s')).where(rng.random(rows) < 0.01)
+
+    base = np.array(BASE_CURRENCIES)[_zipf_choice(rng, rows, len(BASE_CURRENCIES))]
+    quote = np.array(QUOTE_CURRENCIES)[_zipf_choice(rng, rows, len(QUOTE_CURRENCIES), exponent=1.5)]
+    # A market never quotes an asset in itself
+    quote = np.where(base == quote, 'USDC', quote)
+    user_no = _zipf_choice(rng, rows, users, exponent=0.9)
+    user_ids = np.char.add('user_', user_no.astype(str))
+
+    price = np.exp(rng.normal(3, 2.5, rows))
+    base_amount = np.exp(rng.normal(0, 1.5, rows))
+    executed = base_amount * rng.choice([0.0, 0.5, 1.0], size=rows, p=[0.1, 0.1, 0.8])
+    fee = base_amount * price * 0.001
+
+    df = pd.DataFrame({
+        'id': ids,
+        'created_at': created,
+        'record_id': ids,
+        'creation_timestamp': created,
+        'modification_timestamp': modified,
+        'deletion_timestamp': deleted,
+        'user_identifier': user_ids,
+        'user_email': np.char.add(user_ids, '@example.com'),
+        'status_code': rng.choice(STATUS_CODES, size=rows, p=STATUS_WEIGHTS),
+        'quote_currency': quote,
+        'base_currency': base,
+        'quote_amount': _amounts(base_amount * price),
+        'base_amount': _amounts(base_amount),
+        'execution_price': _amounts(price),
+        'order_direction': rng.choice(ORDER_DIRECTIONS, size=rows),
+        'market_symbol': np.char.add(base, quote),
+        'order_type': rng.choice(ORDER_TYPES, size=rows, p=[0.35, 0.65]),
+        'executed_amount': _amounts(executed),
+        'total_quote_executed': _amounts(executed * price),
+        'time_validity': rng.choice(TIME_VALIDITIES, size=rows, p=[0.7, 0.15, 0.1, 0.05]),
+        'fee_amount': _amounts(fee),
+        'provider_quoted_price': _amounts(price * (1 + rng.normal(0, 0.001, rows))),
+        'provider_fee': _amounts(fee * 0.5),
+        'liquidity_provider': np.array(LIQUIDITY_PROVIDERS)[_zipf_choice(rng, rows, len(LIQUIDITY_PROVIDERS))],
+        'provider_response': _payloads(rng, rows, payload_bytes)
+    })
+    return df[SOURCE_COLUMNS]
+
+def generate_financial_events(rows, seed=42, start='2024-01-01', users=None, payload_bytes=1024):
+    """
+    Yield a deterministic data set of `rows` financial_events rows in chunks.
+
+    Args:
+        rows (int): Total rows to generate
+        seed (int): Base seed
+        start (str): Creation time of the first record
+        users (int): Number of distinct users, defaults to one per 50 rows (at least 1000)
+        payload_bytes (int): Average provider_response length
+
+    Yields:
+        pandas.DataFrame: Chunks of at most CHUNK_ROWS rows, in (created_at, id) order
+    """
+    users = users or max(1000, rows // 50)
+    for chunk_no, offset in enumerate(range(0, rows, CHUNK_ROWS)):
+        yield generate_chunk(chunk_no, min(CHUNK_ROWS, rows - offset), seed, start, users, payload_bytes)
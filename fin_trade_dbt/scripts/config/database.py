@@ -5,6 +5,10 @@ as well as dbt-specific configurations for data transformations.
 """
 
 import os
+from pathlib import Path
+
+# Base directory of the dbt project
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
 DB_CONFIG = {
     # dbt Configuration
@@ -21,7 +25,7 @@ DB_CONFIG = {
     # Configuration for the source MySQL database containing raw financial data
     'MYSQL_CONFIG': {
         'server': os.environ.get('MYSQL_SERVER'),
-        'port': int(os.environ.get('MYSQL_PORT')),
+        'port': int(os.environ.get('MYSQL_PORT', '3306')),
         'username': os.environ.get('MYSQL_USER'),
         'password': os.environ.get('MYSQL_PASSWORD'),
         'database': os.environ.get('MYSQL_DATABASE'),
@@ -39,7 +43,23 @@ DB_CONFIG = {
         'raise_on_warnings': os.environ.get('MYSQL_RAISE_WARNINGS', 'true').lower() == 'true',
         'get_warnings': True,
         'pool_size': int(os.environ.get('MYSQL_POOL_SIZE', '5')),
-        'pool_name': os.environ.get('MYSQL_POOL_NAME', 'fin_trade_pool')
+        'pool_name': os.environ.get('MYSQL_POOL_NAME', 'fin_trade_pool'),
+        'max_overflow': int(os.environ.get('MYSQL_MAX_OVERFLOW', '5')),
+        'pool_timeout': int(os.environ.get('MYSQL_POOL_TIMEOUT', '30')),
+        'pool_recycle': int(os.environ.get('MYSQL_POOL_RECYCLE', '1800')),
+        'pool_warmup': int(os.environ.get('MYSQL_POOL_WARMUP', '1')),
+        'retries': int(os.environ.get('MYSQL_RETRIES', '3')),
+        # Parallel extraction settings (partitions > 1 enables range-partitioned extraction)
+        'extract_partitions': int(os.environ.get('MYSQL_EXTRACT_PARTITIONS', '1')),
+        'extract_workers': int(os.environ.get('MYSQL_EXTRACT_WORKERS', '4')),
+        # Streaming extraction settings
+        'extract_batch_size': int(os.environ.get('MYSQL_EXTRACT_BATCH_SIZE', '50000')),
+        # Column projection of the extract: fact (what the dbt models read) or audit (every column)
+        'extract_projection': os.environ.get('MYSQL_EXTRACT_PROJECTION', 'audit'),
+        # MySQL protocol compression (requires the mysqlclient driver)
+        'compress': os.environ.get('MYSQL_COMPRESS', 'false').lower() == 'true',
+        # Full SQLAlchemy URL overriding the settings above, e.g. a local stand-in for benchmarks
+        'url': os.environ.get('MYSQL_URL')
     },
     
     # Target Database (SQL Server)
@@ -58,10 +78,72 @@ DB_CONFIG = {
         'command_timeout': int(os.environ.get('SQL_COMMAND_TIMEOUT', '300')),
         'retries': int(os.environ.get('SQL_RETRIES', '3')),
         'pool_size': int(os.environ.get('SQL_POOL_SIZE', '5')),
+        'max_overflow': int(os.environ.get('SQL_MAX_OVERFLOW', '5')),
+        'pool_timeout': int(os.environ.get('SQL_POOL_TIMEOUT', '30')),
+        'pool_recycle': int(os.environ.get('SQL_POOL_RECYCLE', '1800')),
+        'pool_warmup': int(os.environ.get('SQL_POOL_WARMUP', '1')),
+        # Bulk load settings (strategy: fast_executemany, multirow_insert or bcp)
+        'load_strategy': os.environ.get('SQL_LOAD_STRATEGY', 'fast_executemany'),
+        'load_batch_size': int(os.environ.get('SQL_LOAD_BATCH_SIZE', '10000')),
+        'bcp_path': os.environ.get('SQL_BCP_PATH', 'bcp'),
+        # bcp login: trusted (Kerberos/integrated, -T), aad (Azure AD integrated, -G) or password.
+        # bcp only takes a password as -P on its command line, visible to ps and process accounting,
+        # so the password login also needs SQL_BCP_ALLOW_PASSWORD=true
+        'bcp_auth': os.environ.get('SQL_BCP_AUTH', 'trusted'),
+        'bcp_allow_password': os.environ.get('SQL_BCP_ALLOW_PASSWORD', 'false').lower() == 'true',
         # Additional SQL Server specific settings
         'application_name': os.environ.get('SQL_APPLICATION_NAME', 'fin_trade_etl'),
         'schema': os.environ.get('SQL_DEFAULT_SCHEMA', 'dbo'),
-        'timeout': int(os.environ.get('SQL_TIMEOUT', '300'))
+        'timeout': int(os.environ.get('SQL_TIMEOUT', '300')),
+        # Full SQLAlchemy URL overriding the settings above, e.g. a local stand-in for benchmarks
+        'url': os.environ.get('SQL_SERVER_URL')
+    },
+    
+    # EL Pipeline Execution
+    # Controls how extraction and loading are scheduled relative to each other
+    'PIPELINE_CONFIG': {
+        'mode': os.environ.get('EL_PIPELINE_MODE', 'serial'),  # serial or pipelined
+        'queue_size': int(os.environ.get('EL_QUEUE_SIZE', '4')),  # Max batches waiting to be loaded
+        'load_workers': int(os.environ.get('EL_LOAD_WORKERS', '1')),  # Concurrent loader threads
+        # Checkpointing: per-batch watermark stored in the target database
+        'watermark_table': os.environ.get('EL_WATERMARK_TABLE', 'etl_watermark'),
+        'pipeline_name': os.environ.get('EL_PIPELINE_NAME', 'financial_events'),
+        # Local Arrow spool between extract and load, used for retries and replays
+        'spool_enabled': os.environ.get('EL_SPOOL_ENABLED', 'true').lower() == 'true',
+        'spool_dir': os.environ.get('EL_SPOOL_DIR', os.path.join(BASE_DIR, 'spool')),
+        'spool_max_age_hours': int(os.environ.get('EL_SPOOL_MAX_AGE_HOURS', '72')),
+        'spool_max_bytes': int(os.environ.get('EL_SPOOL_MAX_BYTES', str(10 * 1024 ** 3))),
+        # Dimension surrogate keys resolved in the EL step instead of by joins in fct/orders
+        'resolve_dim_keys': os.environ.get('EL_RESOLVE_DIM_KEYS', 'true').lower() == 'true',
+        'dim_schema': os.environ.get('EL_DIM_SCHEMA', 'dim'),
+        'unresolved_keys_table': os.environ.get('EL_UNRESOLVED_KEYS_TABLE', 'staging_unresolved_dim_keys'),
+        # Stamped on every staged row (run_key_ref); one key per process when unset
+        'run_key': os.environ.get('EL_RUN_KEY') or None,
+        # Change data capture: rows modified or soft-deleted after loading, merged into staging
+        'cdc_enabled': os.environ.get('EL_CDC_ENABLED', 'false').lower() == 'true',  # Run after each incremental load
+        'cdc_pipeline_name': os.environ.get('EL_CDC_PIPELINE_NAME', 'financial_events_changes'),  # Change watermark row
+        'cdc_start': os.environ.get('EL_CDC_START') or None,  # First change run's start; defaults to the load watermark
+        # Compressed provider_response payloads, kept out of staging_financial_orders (see elt/payloads.py)
+        'payload_table': os.environ.get('EL_PAYLOAD_TABLE', 'staging_event_payloads'),
+        # Pre-load validation: rows failing a rule of elt/validation.py go to the quarantine table instead of staging
+        'validate': os.environ.get('EL_VALIDATE', 'false').lower() == 'true',
+        'quarantine_table': os.environ.get('EL_QUARANTINE_TABLE', 'staging_quarantined_events'),
+        # Autotuning of the batch sizes and loader count of incremental runs (see elt/autotune.py)
+        'autotune': os.environ.get('EL_AUTOTUNE', 'false').lower() == 'true',
+        'autotune_state_file': os.environ.get('EL_AUTOTUNE_STATE_FILE', os.path.join(BASE_DIR, 'autotune_state.json')),
+        'autotune_target_seconds': float(os.environ.get('EL_AUTOTUNE_TARGET_SECONDS', '30')),  # Slower batches are congestion
+        'autotune_extract_batch_min': int(os.environ.get('EL_AUTOTUNE_EXTRACT_BATCH_MIN', '5000')),  # Also the step
+        'autotune_extract_batch_max': int(os.environ.get('EL_AUTOTUNE_EXTRACT_BATCH_MAX', '250000')),
+        'autotune_load_batch_min': int(os.environ.get('EL_AUTOTUNE_LOAD_BATCH_MIN', '1000')),  # Also the step
+        'autotune_load_batch_max': int(os.environ.get('EL_AUTOTUNE_LOAD_BATCH_MAX', '50000')),
+        'autotune_max_workers': int(os.environ.get('EL_AUTOTUNE_MAX_WORKERS', '4')),  # Capped by the SQL Server pool
+        'autotune_retries': int(os.environ.get('EL_AUTOTUNE_RETRIES', '2')),  # Load retries after a timeout or lock wait
+        'autotune_backoff_seconds': float(os.environ.get('EL_AUTOTUNE_BACKOFF_SECONDS', '5')),  # Doubled per retry
+        # Daily rollups maintained as batches load, read by the report models (see elt/rollups.py)
+        'rollups': os.environ.get('EL_ROLLUPS', 'false').lower() == 'true',
+        'rollup_account_table': os.environ.get('EL_ROLLUP_ACCOUNT_TABLE', 'rollup_account_daily'),
+        'rollup_product_table': os.environ.get('EL_ROLLUP_PRODUCT_TABLE', 'rollup_product_daily'),
+        'rollup_dirty_table': os.environ.get('EL_ROLLUP_DIRTY_TABLE', 'rollup_dirty_days')  # Days to recompute
     }
 
-} 
\ No newline at end of file
+}
\ No newline at end of file
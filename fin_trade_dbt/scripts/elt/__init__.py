@@ -5,18 +5,48 @@ Contains extract, load, and pipeline operations.
 Modules:
 - extract.py: Handles data extraction from MySQL source database
 - load.py: Manages data loading to SQL Server target database
-- pipeline.py: Main entry point for running the ELT pipeline
+- bulk_loader.py: Pluggable bulk load strategies with rows/sec reporting
+- validation.py: Declarative pre-load validation rules and quarantine of failing rows
+- dim_keys.py: Resolves dimension surrogate keys with cached in-memory indexes
+- spool.py: Arrow IPC spool of extracted batches for retries and replays
+- pipelining.py: Overlaps extraction and loading through a bounded queue
+- autotune.py: AIMD tuning of batch sizes and loader count, carried over between runs
+- windows.py: Splits explicit [start, end) backfill ranges into day or hour windows
+- payloads.py: Compressed store of the bulky provider_response payloads, read on demand
+- rollups.py: Per-account and per-product daily rollups maintained during the load, with reconciliation
+- touched.py: Manifest of the dates, accounts, products and dimensions a run loaded
+- el_pipeline.py: Main entry point for running the ELT pipeline
 
 Usage:
     To run the pipeline directly:
-    $ python -m fin_trade.scripts.elt.pipeline
+    $ python -m scripts.elt.el_pipeline
+
+    To reload a historical range, one transaction per day:
+    $ python -m scripts.elt.el_pipeline --start 2024-03-01 --end 2024-04-01 --grain day
+
+    To check the daily rollups against the source, rewriting the days that differ:
+    $ python -m scripts.elt.rollups --reconcile --start 2024-03-01 --end 2024-04-01 --repair
 
     The pipeline can also be executed from Airflow DAGs or GitHub Actions
-    by importing and running the pipeline.py module.
+    by importing and running the el_pipeline.py module.
 """
 
-from .extract import extract_data
-from .load import load_to_sql_server, get_last_processed_data
-from .pipeline import run_el_pipeline
+from .extract import extract_data, extract_batches, extract_partitioned, extract_changes
+from .load import load_to_sql_server, get_last_processed_data, replace_window, merge_changes
+from .bulk_loader import bulk_load, benchmark_strategies
+from .validation import validate_batch
+from .dim_keys import load_dimension_indexes, resolve_dimension_keys
+from .pipelining import run_pipelined
+from .autotune import Autotuner, get_autotuner
+from .windows import plan_windows
+from .rollups import aggregate_batch, apply_rollup, rebuild, settle_dirty_days, reconcile
+from .touched import TouchedKeys, merge_manifests
+from .payloads import offload_payloads, fetch_payloads
+from .el_pipeline import run_pipeline as run_el_pipeline, replay_spool, run_window, run_backfill, run_changes
 
-__all__ = ['extract_data', 'load_to_sql_server', 'get_last_processed_data', 'run_el_pipeline'] 
\ No newline at end of file
+__all__ = ['extract_data', 'extract_batches', 'extract_partitioned', 'extract_changes', 'load_to_sql_server',
+           'get_last_processed_data', 'replace_window', 'merge_changes', 'bulk_load', 'benchmark_strategies',
+           'validate_batch', 'load_dimension_indexes', 'resolve_dimension_keys', 'run_pipelined', 'Autotuner',
+           'get_autotuner', 'plan_windows', 'aggregate_batch', 'apply_rollup', 'rebuild', 'settle_dirty_days',
+           'reconcile', 'TouchedKeys', 'merge_manifests', 'offload_payloads', 'fetch_payloads',
+           'run_el_pipeline', 'replay_spool', 'run_window', 'run_backfill', 'run_changes']
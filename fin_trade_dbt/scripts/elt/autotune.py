@@ -0,0 +1,244 @@
+"""
+Autotuning module for fin_trade pipeline.
+Adjusts the extract batch size, load batch size and loader count from measured batch throughput.
+
+Each setting is an AIMD controller, as in TCP congestion control: while batches
+finish within the latency target and throughput holds up, it grows by a fixed
+step; on congestion (a timeout, lock wait or deadlock, or a batch slower than the
+target) it is halved. An increase that made throughput drop is stepped back and
+held for a few batches, so a setting settles just below the point where it stops
+paying off. The learned values are saved to a JSON state file at the end of a
+run, and the next run starts from them instead of the static configuration.
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from ..config import DB_CONFIG
+from ..utils.logger import LOGGER
+from ..utils.metrics import record_tuned_setting
+
+# Lower-cased error texts that mean the source or target is overloaded rather than the batch being bad
+BACKOFF_ERRORS = (
+    'timeout', 'timed out', 'hyt00',  # Driver, ODBC and query timeouts
+    'lock request time out',  # SQL Server 1222
+    'lock wait timeout',  # MySQL 1205
+    'deadlock',  # SQL Server 1205, MySQL 1213
+)
+
+# Multiplicative decrease factor on congestion
+DECREASE_FACTOR = 0.5
+
+# Relative throughput drop after an increase that counts as "no longer paying off"
+TOLERANCE = 0.1
+
+# Observations a setting is held for after a decrease
+HOLD_BATCHES = 3
+
+def is_backoff_error(exc):
+    """Return True for errors worth backing off and retrying: timeouts, lock waits and deadlocks."""
+    if isinstance(exc, TimeoutError):
+        return True
+    text = str(exc).lower()
+    return any(marker in text for marker in BACKOFF_ERRORS)
+
+class AimdSetting:
+    """One tuned integer setting between minimum and maximum, moved by step."""
+
+    def __init__(self, name, value, minimum, maximum, step):
+        self.name = name
+        self.minimum = minimum
+        self.maximum = max(maximum, minimum)
+        self.step = max(step, 1)
+        self.value = self._clamp(value)
+        self.hold = 0
+        # Throughput at the value before the last increase; None once it has been judged
+        self.baseline = None
+        record_tuned_setting(name, self.value)
+
+    def _clamp(self, value):
+        return int(min(max(value, self.minimum), self.maximum))
+
+    def _set(self, value, reason):
+        value = self._clamp(value)
+        if value != self.value:
+            LOGGER.info("Autotune: %s %d -> %d (%s)", self.name, self.value, value, reason)
+            self.value = value
+            record_tuned_setting(self.name, value)
+
+    def observe(self, rows_per_sec, congested=False):
+        """
+        Adjust the setting after one measurement taken at its current value.
+
+        Args:
+            rows_per_sec (float): Throughput measured at the current value
+            congested (bool): The measurement hit a timeout, lock wait or the latency target
+        """
+        if congested:
+            self.baseline = None
+            self.hold = HOLD_BATCHES
+            self._set(self.value * DECREASE_FACTOR, 'congestion')
+        elif self.baseline is not None and rows_per_sec < self.baseline * (1 - TOLERANCE):
+            self.baseline = None
+            self.hold = HOLD_BATCHES
+            self._set(self.value - self.step, f"throughput fell to {rows_per_sec:.0f} rows/sec")
+        elif self.hold > 0:
+            self.hold -= 1
+        elif self.value < self.maximum:
+            self.baseline = rows_per_sec
+            self._set(self.value + self.step, f"{rows_per_sec:.0f} rows/sec")
+
+class Autotuner:
+    """
+    Thread-safe tuner of the extract batch size, load batch size and loader count.
+
+    Extract and load batch sizes are judged on each batch's own throughput and
+    latency. The loader count is judged on the wall-clock throughput of a window
+    of as many batches as there are loaders, since concurrent loads overlap.
+    """
+
+    def __init__(self, state_path, extract_batch_size, load_batch_size, load_workers, bounds, target_seconds):
+        self._lock = threading.Lock()
+        self.state_path = state_path
+        self.target_seconds = target_seconds
+        state = _read_state(state_path)
+        self.extract = AimdSetting(
+            'extract_batch_size', state.get('extract_batch_size', extract_batch_size),
+            bounds['extract_batch_min'], bounds['extract_batch_max'], bounds['extract_batch_min']
+        )
+        self.load = AimdSetting(
+            'load_batch_size', state.get('load_batch_size', load_batch_size),
+            bounds['load_batch_min'], bounds['load_batch_max'], bounds['load_batch_min']
+        )
+        self.workers = AimdSetting('load_workers', state.get('load_workers', load_workers), 1,
+                                   bounds['max_workers'], 1)
+        # Only pipelined runs have concurrent loaders to tune
+        self.tune_workers = False
+        self.rates = {'extract': None, 'load': None}
+        self._window_rows = 0
+        self._window_batches = 0
+        self._window_congested = False
+        self._window_started = None
+        if state:
+            LOGGER.info("Autotune: starting from the settings learned on %s: %s", state.get('updated_at'),
+                        self.settings())
+
+    @property
+    def extract_batch_size(self):
+        return self.extract.value
+
+    @property
+    def load_batch_size(self):
+        return self.load.value
+
+    @property
+    def load_workers(self):
+        return self.workers.value
+
+    @property
+    def max_workers(self):
+        return self.workers.maximum
+
+    def settings(self):
+        """Return the current settings as a dict."""
+        return {
+            'extract_batch_size': self.extract.value,
+            'load_batch_size': self.load.value,
+            'load_workers': self.workers.value
+        }
+
+    def _congested(self, seconds, error):
+        return (error is not None and is_backoff_error(error)) or seconds > self.target_seconds
+
+    def _rate(self, stage, rows, seconds):
+        rate = rows / seconds if seconds > 0 else float(rows)
+        self.rates[stage] = rate
+        return rate
+
+    def observe_extract(self, rows, seconds, error=None):
+        """Record one extract page of `rows` read in `seconds`, or the error it failed with."""
+        if error is not None and not is_backoff_error(error):
+            return
+        with self._lock:
+            self.extract.observe(self._rate('extract', rows, seconds), self._congested(seconds, error))
+
+    def start_load(self):
+        """Mark the start of a load; opens the loader-count window if none is open."""
+        with self._lock:
+            if self._window_started is None:
+                self._window_started = time.perf_counter()
+
+    def observe_load(self, rows, seconds, error=None):
+        """Record one load attempt of `rows` taking `seconds`, or the error it failed with."""
+        if error is not None and not is_backoff_error(error):
+            return
+        with self._lock:
+            congested = self._congested(seconds, error)
+            self.load.observe(self._rate('load', rows, seconds), congested)
+            if not self.tune_workers:
+                return
+
+            self._window_rows += 0 if error is not None else rows
+            self._window_batches += 1
+            self._window_congested = self._window_congested or congested
+            if self._window_batches >= self.workers.value:
+                elapsed = time.perf_counter() - (self._window_started or time.perf_counter())
+                rate = self._window_rows / elapsed if elapsed > 0 else float(self._window_rows)
+                self.workers.observe(rate, self._window_congested)
+                self._window_rows, self._window_batches = 0, 0
+                self._window_congested, self._window_started = False, None
+
+    def save(self):
+        """Write the learned settings to the state file, atomically."""
+        with self._lock:
+            state = dict(self.settings(), rows_per_sec=self.rates,
+                         updated_at=datetime.utcnow().isoformat(timespec='seconds'))
+        directory = os.path.dirname(self.state_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{self.state_path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, 'w') as handle:
+                json.dump(state, handle, indent=2, sort_keys=True)
+            os.replace(temp_path, self.state_path)
+        except OSError as e:
+            LOGGER.warning("Could not save the autotune state to %s: %s", self.state_path, e)
+            return
+        LOGGER.info("Autotune: saved %s to %s", self.settings(), self.state_path)
+
+def _read_state(path):
+    try:
+        with open(path) as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return {}
+
+def get_autotuner():
+    """
+    Build an Autotuner from PIPELINE_CONFIG, or return None when autotuning is off.
+
+    The loader count is capped by the SQL Server connection pool (pool_size + max_overflow),
+    so tuned loaders never wait for a connection.
+    """
+    pipeline_config = DB_CONFIG['PIPELINE_CONFIG']
+    if not pipeline_config['autotune']:
+        return None
+    sqlserver_config = DB_CONFIG['SQLSERVER_CONFIG']
+    bounds = {
+        'extract_batch_min': pipeline_config['autotune_extract_batch_min'],
+        'extract_batch_max': pipeline_config['autotune_extract_batch_max'],
+        'load_batch_min': pipeline_config['autotune_load_batch_min'],
+        'load_batch_max': pipeline_config['autotune_load_batch_max'],
+        'max_workers': min(pipeline_config['autotune_max_workers'],
+                           sqlserver_config['pool_size'] + sqlserver_config['max_overflow'])
+    }
+    return Autotuner(
+        pipeline_config['autotune_state_file'],
+        DB_CONFIG['MYSQL_CONFIG']['extract_batch_size'],
+        sqlserver_config['load_batch_size'],
+        pipeline_config['load_workers'],
+        bounds,
+        pipeline_config['autotune_target_seconds']
+    )
@@ -0,0 +1,435 @@
+"""
+Bulk loading module for fin_trade pipeline.
+Provides pluggable high-throughput strategies for writing DataFrames to the target database.
+
+Strategies:
+- fast_executemany: DBAPI executemany with pyodbc fast_executemany and typed input sizes
+- multirow_insert: Batched multi-row INSERT ... VALUES statements
+- bcp: Stages each batch as a delimited file and bulk copies it with the bcp utility,
+  logging in with a trusted or Azure AD identity (see bcp_login)
+
+Every strategy also runs against a SQLite engine so loads can be benchmarked offline
+(see scripts/bench/standins.py, which teaches sqlite3 to bind Decimal).
+"""
+
+import os
+import subprocess
+import tempfile
+import time
+from decimal import Decimal
+import pandas as pd
+import sqlalchemy
+from .schema import is_decimal_dtype
+from ..utils.logger import LOGGER
+from ..utils.profiling import record_statement
+
+# SQL Server caps a statement at 2100 parameters and a VALUES list at 1000 rows
+MSSQL_MAX_PARAMS = 2100
+MSSQL_MAX_VALUES_ROWS = 1000
+# Conservative SQLite SQLITE_MAX_VARIABLE_NUMBER for older builds
+SQLITE_MAX_PARAMS = 999
+
+# Field/row terminators for staged files; ASCII unit/record separators never occur in the data
+BCP_FIELD_TERMINATOR = '\x1f'
+BCP_ROW_TERMINATOR = '\x1e'
+
+DEFAULT_BATCH_SIZE = 10000
+
+def _decimal_text(value):
+    """Fixed-point text of a Decimal: str() gives '0E-18' for a decimal(38,18) zero, which SQL Server rejects."""
+    return format(value, 'f')
+
+def _qualified_name(connection, table, schema=None):
+    """Return the quoted, schema-qualified table name for the connection's dialect."""
+    preparer = connection.dialect.identifier_preparer
+    name = preparer.quote(table)
+    return f"{preparer.quote_schema(schema)}.{name}" if schema else name
+
+def _insert_sql(connection, df, table, schema=None, rows=1):
+    """Build an INSERT statement with `rows` qmark/format placeholder groups."""
+    preparer = connection.dialect.identifier_preparer
+    marker = '?' if connection.dialect.paramstyle == 'qmark' else '%s'
+    columns = ', '.join(preparer.quote(col) for col in df.columns)
+    group = f"({', '.join([marker] * len(df.columns))})"
+    values = ', '.join([group] * rows)
+    return f"INSERT INTO {_qualified_name(connection, table, schema)} ({columns}) VALUES {values}"
+
+def _column_values(series):
+    """Convert a Series to a list of DBAPI-friendly Python values with None for nulls."""
+    mask = series.isna().to_numpy()
+    if pd.api.types.is_datetime64_any_dtype(series):
+        values = [None if null else value.to_pydatetime() for value, null in zip(series, mask)]
+    else:
+        values = series.astype(object).to_numpy(copy=True)
+        values[mask] = None
+        values = values.tolist()
+    return values
+
+def _to_rows(df):
+    """Convert a DataFrame slice to a list of row tuples."""
+    return list(zip(*(_column_values(df[col]) for col in df.columns)))
+
+def _timed_execute(method, sql, params, rows, executemany=False):
+    """Run a raw cursor method and record its timing for a profiling session, if one is open."""
+    started = time.perf_counter()
+    method(sql, params)
+    record_statement(sql, time.perf_counter() - started, rows, executemany)
+
+def _iter_slices(df, batch_size):
+    """Yield consecutive row slices of at most batch_size rows."""
+    for start in range(0, len(df), batch_size):
+        yield df.iloc[start:start + batch_size]
+
+def _input_size(pyodbc, series):
+    """Return the pyodbc (sql_type, size, decimal_digits) binding for one column."""
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        # Bind by the type of the category values
+        return _input_size(pyodbc, pd.Series(series.cat.categories))
+    if is_decimal_dtype(dtype):
+        return (pyodbc.SQL_DECIMAL, dtype.pyarrow_dtype.precision, dtype.pyarrow_dtype.scale)
+    if pd.api.types.is_bool_dtype(dtype):
+        return (pyodbc.SQL_BIT, 0, 0)
+    if pd.api.types.is_integer_dtype(dtype):
+        return (pyodbc.SQL_BIGINT, 0, 0)
+    if pd.api.types.is_float_dtype(dtype):
+        return (pyodbc.SQL_DOUBLE, 0, 0)
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return (pyodbc.SQL_TYPE_TIMESTAMP, 27, 7)
+    max_length = series.dropna().astype(str).str.len().max()
+    max_length = int(max_length) if pd.notna(max_length) else 1
+    # 0 binds as NVARCHAR(MAX) for values beyond the 4000 character limit
+    return (pyodbc.SQL_WVARCHAR, max_length if max_length <= 4000 else 0, 0)
+
+def _input_sizes(df):
+    """
+    Derive pyodbc input sizes from DataFrame dtypes.
+
+    Without explicit sizes, fast_executemany binds strings as NVARCHAR(MAX) and
+    allocates parameter buffers for the largest possible value, which is both slow
+    and memory hungry.
+
+    Returns:
+        list: (sql_type, size, decimal_digits) tuples, one per column
+    """
+    import pyodbc
+
+    return [_input_size(pyodbc, df[col]) for col in df.columns]
+
+def load_fast_executemany(connection, df, table, schema=None, batch_size=DEFAULT_BATCH_SIZE, config=None):
+    """
+    Load rows with DBAPI executemany, using pyodbc fast_executemany when available.
+
+    Args:
+        connection (sqlalchemy.engine.Connection): Open connection inside a transaction
+        df (pandas.DataFrame): Data to be loaded
+        table (str): Target table name
+        schema (str): Target schema name
+        batch_size (int): Rows per executemany call
+        config (dict): Unused, accepted for a uniform strategy signature
+
+    Returns:
+        int: Number of rows written
+    """
+    cursor = connection.connection.cursor()
+    try:
+        if hasattr(cursor, 'fast_executemany'):
+            cursor.fast_executemany = True
+            cursor.setinputsizes(_input_sizes(df))
+
+        sql = _insert_sql(connection, df, table, schema)
+        for batch in _iter_slices(df, batch_size):
+            _timed_execute(cursor.executemany, sql, _to_rows(batch), len(batch), executemany=True)
+    finally:
+        cursor.close()
+    return len(df)
+
+def load_multirow_insert(connection, df, table, schema=None, batch_size=DEFAULT_BATCH_SIZE, config=None):
+    """
+    Load rows with multi-row INSERT ... VALUES statements.
+
+    Rows per statement are capped by the dialect's parameter and VALUES limits,
+    so batch_size only lowers that cap.
+
+    Args:
+        connection (sqlalchemy.engine.Connection): Open connection inside a transaction
+        df (pandas.DataFrame): Data to be loaded
+        table (str): Target table name
+        schema (str): Target schema name
+        batch_size (int): Maximum rows per statement
+        config (dict): Unused, accepted for a uniform strategy signature
+
+    Returns:
+        int: Number of rows written
+    """
+    if connection.dialect.name == 'mssql':
+        rows_per_statement = min(MSSQL_MAX_VALUES_ROWS, (MSSQL_MAX_PARAMS - 1) // len(df.columns))
+    else:
+        rows_per_statement = SQLITE_MAX_PARAMS // len(df.columns)
+    rows_per_statement = max(1, min(rows_per_statement, batch_size))
+
+    cursor = connection.connection.cursor()
+    try:
+        full_sql = _insert_sql(connection, df, table, schema, rows=rows_per_statement)
+        for batch in _iter_slices(df, rows_per_statement):
+            sql = full_sql if len(batch) == rows_per_statement else \
+                _insert_sql(connection, df, table, schema, rows=len(batch))
+            _timed_execute(cursor.execute, sql, [value for row in _to_rows(batch) for value in row], len(batch))
+    finally:
+        cursor.close()
+    return len(df)
+
+def _staged_field(value):
+    if value is None:
+        return ''
+    if isinstance(value, Decimal):
+        return _decimal_text(value)
+    return str(value)
+
+def _write_staged_file(df, path):
+    """Write a DataFrame as a terminator-delimited text file; nulls become empty fields."""
+    with open(path, 'w', encoding='utf-8', newline='') as handle:
+        for row in _to_rows(df):
+            handle.write(BCP_FIELD_TERMINATOR.join(_staged_field(value) for value in row))
+            handle.write(BCP_ROW_TERMINATOR)
+
+def _read_staged_file(path):
+    """Read a staged file back into row tuples; empty fields become None."""
+    with open(path, 'r', encoding='utf-8', newline='') as handle:
+        records = handle.read().split(BCP_ROW_TERMINATOR)
+    return [
+        tuple(value if value != '' else None for value in record.split(BCP_FIELD_TERMINATOR))
+        for record in records if record
+    ]
+
+BCP_AUTH_MODES = ('trusted', 'aad', 'password')
+
+def bcp_login(config):
+    """
+    Return the bcp login arguments for config['bcp_auth'].
+
+    bcp has no way to read a password other than -P on its command line, where
+    any local user can see it with ps and process accounting records it. The
+    password login is therefore refused unless config['bcp_allow_password'] is set.
+
+    Raises:
+        ValueError: If the mode is unknown, or is password without bcp_allow_password
+    """
+    auth = config.get('bcp_auth', 'trusted')
+    if auth == 'trusted':
+        return ['-T']
+    if auth == 'aad':
+        return ['-G']
+    if auth == 'password':
+        if not config.get('bcp_allow_password'):
+            raise ValueError("bcp password logins expose the password on the command line; use "
+                             "SQL_BCP_AUTH=trusted or aad, or set SQL_BCP_ALLOW_PASSWORD=true to accept that")
+        LOGGER.warning("bcp is passing the SQL Server password on its command line")
+        return ['-U', config['username'], '-P', config['password']]
+    raise ValueError(f"Unknown bcp login '{auth}'. Use one of: {', '.join(BCP_AUTH_MODES)}")
+
+def _run_bcp(path, table, schema, batch_size, config):
+    """Bulk copy a staged file into SQL Server with the bcp command line utility."""
+    command = [
+        config.get('bcp_path', 'bcp'),
+        f"{config['database']}.{schema or config.get('schema', 'dbo')}.{table}", 'in', path,
+        '-S', f"{config['server']},{config['port']}",
+        *bcp_login(config),
+        '-c', '-C', '65001',
+        '-t', BCP_FIELD_TERMINATOR,
+        '-r', BCP_ROW_TERMINATOR,
+        '-b', str(batch_size),
+        '-k'
+    ]
+    if str(config.get('trust_server_certificate', 'false')).lower() == 'true':
+        command.append('-u')
+    started = time.perf_counter()
+    try:
+        subprocess.run(command, check=True, capture_output=True, timeout=config.get('command_timeout'))
+    except subprocess.CalledProcessError as e:
+        # Raised without the command line, which may hold the password
+        output = (e.stdout or e.stderr or b'').decode('utf-8', 'replace').strip()
+        raise RuntimeError(f"bcp into {command[1]} exited with {e.returncode}: {output}") from None
+    except subprocess.TimeoutExpired:
+        raise TimeoutError(f"bcp into {command[1]} timed out after {config.get('command_timeout')}s") from None
+    record_statement(f"bcp {command[1]} in", time.perf_counter() - started)
+
+def load_bcp(connection, df, table, schema=None, batch_size=DEFAULT_BATCH_SIZE, config=None):
+    """
+    Load rows by staging them to a delimited file and bulk copying it.
+
+    Against SQL Server the file is loaded with `bcp` in its own session, so it
+    commits independently of the surrounding transaction. Against any other
+    dialect (e.g. the SQLite stand-in) the staged file is read back and inserted
+    with executemany, so the file staging cost is still measured.
+
+    Args:
+        connection (sqlalchemy.engine.Connection): Open connection inside a transaction
+        df (pandas.DataFrame): Data to be loaded
+        table (str): Target table name
+        schema (str): Target schema name
+        batch_size (int): Rows per bcp batch / executemany call
+        config (dict): SQL Server connection parameters, required for SQL Server targets
+
+    Returns:
+        int: Number of rows written
+    """
+    fd, path = tempfile.mkstemp(prefix=f"{table}_", suffix='.bcp')
+    os.close(fd)
+    try:
+        _write_staged_file(df, path)
+        if connection.dialect.name == 'mssql':
+            _run_bcp(path, table, schema, batch_size, config)
+        else:
+            rows = _read_staged_file(path)
+            cursor = connection.connection.cursor()
+            try:
+                sql = _insert_sql(connection, df, table, schema)
+                for start in range(0, len(rows), batch_size):
+                    batch = rows[start:start + batch_size]
+                    _timed_execute(cursor.executemany, sql, batch, len(batch), executemany=True)
+            finally:
+                cursor.close()
+    finally:
+        os.remove(path)
+    return len(df)
+
+STRATEGIES = {
+    'fast_executemany': load_fast_executemany,
+    'multirow_insert': load_multirow_insert,
+    'bcp': load_bcp,
+}
+
+def _inferred_sql_type(series):
+    """Pick a SQLAlchemy type for a column added to an existing table without an explicit type."""
+    dtype = series.dtype
+    if pd.api.types.is_bool_dtype(dtype):
+        return sqlalchemy.Boolean()
+    if pd.api.types.is_integer_dtype(dtype):
+        return sqlalchemy.BigInteger()
+    if pd.api.types.is_float_dtype(dtype):
+        return sqlalchemy.Float()
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return sqlalchemy.DateTime()
+    return sqlalchemy.UnicodeText()
+
+def ensure_table(connection, df, table, schema=None, dtype=None):
+    """
+    Create the target table from the DataFrame's columns if it does not exist yet,
+    and add any DataFrame columns the existing table is missing as nullable columns.
+
+    Args:
+        dtype (dict): Column -> SQLAlchemy type overrides, so pandas does not guess
+    """
+    inspector = sqlalchemy.inspect(connection)
+    if not inspector.has_table(table, schema=schema):
+        df.head(0).to_sql(name=table, con=connection, schema=schema, if_exists='append', index=False, dtype=dtype)
+        return
+
+    existing = {column['name'] for column in inspector.get_columns(table, schema=schema)}
+    missing = [column for column in df.columns if column not in existing]
+    if not missing:
+        return
+
+    preparer = connection.dialect.identifier_preparer
+    for column in missing:
+        column_type = (dtype or {}).get(column) or _inferred_sql_type(df[column])
+        connection.exec_driver_sql(
+            f"ALTER TABLE {_qualified_name(connection, table, schema)} "
+            f"ADD {preparer.quote(column)} {column_type.compile(dialect=connection.dialect)} NULL"
+        )
+        LOGGER.info("Added column %s to %s", column, table)
+
+def bulk_load(df, engine, table, schema=None, strategy='fast_executemany',
+              batch_size=DEFAULT_BATCH_SIZE, config=None, after_load=None, dtype=None, connection=None):
+    """
+    Load a DataFrame into the target table with the selected strategy.
+
+    Args:
+        df (pandas.DataFrame): Data to be loaded
+        engine (sqlalchemy.engine.Engine): Target database engine
+        table (str): Target table name
+        schema (str): Target schema name
+        strategy (str): One of STRATEGIES
+        batch_size (int): Rows per batch, interpreted by the strategy
+        config (dict): Target connection parameters, used by the bcp strategy
+        after_load (callable): Called with the open connection after the rows are
+                               written and before the transaction commits
+        dtype (dict): Column -> SQLAlchemy type used if the table has to be created or extended
+        connection (sqlalchemy.engine.Connection): Load within this connection's open
+                                                   transaction instead of committing one of its own
+
+    Returns:
+        dict: Load statistics (strategy, rows, batch_size, seconds, rows_per_sec)
+
+    Raises:
+        ValueError: If the strategy is unknown
+        Exception: If data loading fails
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown bulk load strategy '{strategy}'. "
+                         f"Use one of: {', '.join(STRATEGIES)}")
+
+    def load(connection):
+        ensure_table(connection, df, table, schema, dtype)
+        rows = STRATEGIES[strategy](connection, df, table, schema, batch_size, config)
+        if after_load is not None:
+            after_load(connection)
+        return rows
+
+    started = time.perf_counter()
+    if connection is not None:
+        rows = load(connection)
+    else:
+        with engine.begin() as connection:
+            rows = load(connection)
+    seconds = time.perf_counter() - started
+
+    stats = {
+        'strategy': strategy,
+        'rows': rows,
+        'batch_size': batch_size,
+        'seconds': round(seconds, 3),
+        'rows_per_sec': round(rows / seconds, 1) if seconds > 0 else float(rows)
+    }
+    LOGGER.info("Bulk loaded %d rows into %s with %s in %ss (%s rows/sec)",
+                rows, table, strategy, stats['seconds'], stats['rows_per_sec'])
+    return stats
+
+def benchmark_strategies(df, engine, table, schema=None, strategies=None,
+                         batch_size=DEFAULT_BATCH_SIZE, config=None):
+    """
+    Load the same DataFrame with each strategy and report rows/sec per strategy.
+
+    The target table is emptied before each strategy runs, so point this at a
+    scratch table or a local stand-in database, never at production staging.
+
+    Returns:
+        list: One statistics dict per strategy, as returned by bulk_load
+    """
+    results = []
+    for strategy in strategies or STRATEGIES:
+        with engine.begin() as connection:
+            ensure_table(connection, df, table, schema)
+            connection.exec_driver_sql(f"DELETE FROM {_qualified_name(connection, table, schema)}")
+        results.append(bulk_load(df, engine, table, schema, strategy, batch_size, config))
+    return results
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark bulk load strategies against a target database.")
+    parser.add_argument('source', help="CSV or Parquet file with rows to load")
+    parser.add_argument('--target-url', default='sqlite:///bulk_load_bench.db',
+                        help="SQLAlchemy URL of the target (defaults to a local SQLite stand-in)")
+    parser.add_argument('--table', default='bench_financial_orders')
+    parser.add_argument('--schema', default=None)
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--strategies', nargs='+', choices=list(STRATEGIES), default=list(STRATEGIES))
+    args = parser.parse_args()
+
+    source_df = pd.read_parquet(args.source) if args.source.endswith('.parquet') else pd.read_csv(args.source)
+    for result in benchmark_strategies(source_df, sqlalchemy.create_engine(args.target_url), args.table,
+                                       args.schema, args.strategies, args.batch_size):
+        print(f"{result['strategy']:<18} {result['rows']:>10} rows  {result['seconds']:>8}s  "
+              f"{result['rows_per_sec']:>12} rows/sec")
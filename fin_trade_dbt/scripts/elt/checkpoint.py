@@ -0,0 +1,103 @@
+"""
+Checkpoint module for fin_trade pipeline.
+Keeps a durable per-pipeline (created_at, id) watermark in the target database.
+
+The watermark row is advanced in the same transaction as each loaded batch, so
+reading it back is a primary key lookup and a crashed run resumes right after
+the last committed batch. Against a SQLite stand-in target the same table lives
+in the local database file.
+"""
+
+from datetime import datetime
+import sqlalchemy
+
+_METADATA = sqlalchemy.MetaData()
+
+def get_watermark_table(name='etl_watermark', schema=None):
+    """
+    Return the SQLAlchemy Core definition of the watermark table.
+
+    Args:
+        name (str): Table name
+        schema (str): Schema name
+
+    Returns:
+        sqlalchemy.Table: Watermark table definition
+    """
+    key = f"{schema}.{name}" if schema else name
+    if key in _METADATA.tables:
+        return _METADATA.tables[key]
+    return sqlalchemy.Table(
+        name, _METADATA,
+        sqlalchemy.Column('pipeline_name', sqlalchemy.String(100), primary_key=True),
+        sqlalchemy.Column('last_ts', sqlalchemy.DateTime, nullable=False),
+        sqlalchemy.Column('last_id', sqlalchemy.BigInteger, nullable=False),
+        sqlalchemy.Column('batch_seq', sqlalchemy.BigInteger, nullable=False),
+        sqlalchemy.Column('rows_loaded', sqlalchemy.BigInteger, nullable=False),
+        sqlalchemy.Column('updated_at', sqlalchemy.DateTime, nullable=False),
+        schema=schema
+    )
+
+def ensure_watermark_table(connection, table):
+    """Create the watermark table if it does not exist."""
+    table.create(connection, checkfirst=True)
+
+def read_watermark(connection, table, pipeline_name):
+    """
+    Read the committed watermark for a pipeline.
+
+    Returns:
+        tuple: (last_ts, last_id), or None if the pipeline has no checkpoint yet
+    """
+    row = connection.execute(
+        sqlalchemy.select(table.c.last_ts, table.c.last_id)
+        .where(table.c.pipeline_name == pipeline_name)
+    ).first()
+    return (row.last_ts, row.last_id) if row else None
+
+def advance_watermark(connection, table, pipeline_name, last_ts, last_id, rows):
+    """
+    Move the watermark forward to (last_ts, last_id) within the caller's transaction.
+
+    The update only applies when the new key is greater than the stored one, so
+    replaying an older batch can never move the watermark backwards.
+
+    Args:
+        connection (sqlalchemy.engine.Connection): Connection holding the batch's transaction
+        table (sqlalchemy.Table): Watermark table
+        pipeline_name (str): Pipeline the watermark belongs to
+        last_ts (datetime): created_at of the last row in the batch
+        last_id (int): id of the last row in the batch
+        rows (int): Number of rows in the batch
+    """
+    now = datetime.utcnow()
+    result = connection.execute(
+        table.update()
+        .where(table.c.pipeline_name == pipeline_name)
+        .where(sqlalchemy.or_(
+            table.c.last_ts < last_ts,
+            sqlalchemy.and_(table.c.last_ts == last_ts, table.c.last_id < last_id)
+        ))
+        .values(
+            last_ts=last_ts,
+            last_id=last_id,
+            batch_seq=table.c.batch_seq + 1,
+            rows_loaded=table.c.rows_loaded + rows,
+            updated_at=now
+        )
+    )
+    if result.rowcount:
+        return
+
+    exists = connection.execute(
+        sqlalchemy.select(table.c.pipeline_name).where(table.c.pipeline_name == pipeline_name)
+    ).first()
+    if not exists:
+        connection.execute(table.insert().values(
+            pipeline_name=pipeline_name,
+            last_ts=last_ts,
+            last_id=last_id,
+            batch_seq=1,
+            rows_loaded=rows,
+            updated_at=now
+        ))
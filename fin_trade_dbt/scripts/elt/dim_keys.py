@@ -0,0 +1,146 @@
+"""
+Dimension key resolution module for fin_trade pipeline.
+Resolves the fact table's surrogate keys in the EL step with cached in-memory hash indexes.
+
+Each small dimension is read from SQL Server once per process into a pandas
+Index mapping its natural code(s) to the surrogate key. Batches are resolved
+with vectorized Index.get_indexer lookups, matching the null handling of the
+isnull(col, '0') joins in fct/orders.sql. Codes that are not in a dimension yet
+are reported so they can be written to a side table.
+"""
+
+import threading
+import numpy as np
+import pandas as pd
+import sqlalchemy
+from ..utils.logger import LOGGER
+
+# Surrogate key column -> dimension table, key column and (dimension column, staging column) pairs
+DIMENSIONS = {
+    'approval_key': {
+        'table': 'ord_auth',
+        'columns': [('status_description', 'status_code')]
+    },
+    'category_key': {
+        'table': 'prd_category',
+        'columns': [('category_level_3', 'market_symbol'), ('product_type', 'base_currency')]
+    },
+    'direction_key': {
+        'table': 'ord_side',
+        'columns': [('direction_code', 'order_direction')]
+    },
+    'operation_key': {
+        'table': 'ord_type',
+        'columns': [('operation_code', 'order_type')]
+    },
+    'account_key': {
+        'table': 'cust_profile',
+        'columns': [('user_identifier', 'user_identifier')]
+    },
+    'provider_key': {
+        'table': 'prd_provider',
+        'columns': [('provider_code', 'liquidity_provider')]
+    }
+}
+
+# Value the fact model's isnull(col, '0') join predicates substitute for NULL
+NULL_CODE = '0'
+
+_INDEXES = {}
+_LOCK = threading.Lock()
+
+def _normalize(series):
+    """Render codes as strings with NULL mapped to NULL_CODE, as the SQL joins compare them."""
+    values = series.astype(object)
+    return values.where(series.notna(), NULL_CODE).astype(str)
+
+def _build_index(frame, code_columns):
+    """Build a unique (code...) -> position index; the lowest key wins on duplicate codes."""
+    frame = frame.sort_values('key').drop_duplicates(subset=code_columns, keep='first')
+    arrays = [_normalize(frame[column]) for column in code_columns]
+    index = pd.Index(arrays[0]) if len(arrays) == 1 else pd.MultiIndex.from_arrays(arrays)
+    return index, frame['key'].to_numpy(dtype='int64')
+
+def load_dimension_indexes(engine, schema, refresh=False):
+    """
+    Load every dimension into an in-memory hash index, once per process.
+
+    A dimension that cannot be read (e.g. before the first dbt build) gets an
+    empty index, so all of its codes are reported as unresolved.
+
+    Args:
+        engine (sqlalchemy.engine.Engine): Target database engine
+        schema (str): Schema holding the dimension tables
+        refresh (bool): Reload even if the indexes are already cached
+
+    Returns:
+        dict: Key column -> (pandas.Index, numpy key array)
+    """
+    with _LOCK:
+        cache_key = (str(engine.url), schema)
+        if not refresh and cache_key in _INDEXES:
+            return _INDEXES[cache_key]
+
+        indexes = {}
+        for key_column, spec in DIMENSIONS.items():
+            code_columns = [dim_column for dim_column, _ in spec['columns']]
+            table = sqlalchemy.table(
+                spec['table'],
+                sqlalchemy.column(key_column),
+                *(sqlalchemy.column(column) for column in code_columns),
+                schema=schema
+            )
+            query = sqlalchemy.select(table.c[key_column].label('key'), *(table.c[c] for c in code_columns))
+            try:
+                with engine.connect() as connection:
+                    frame = pd.read_sql(query, connection)
+            except Exception as e:
+                LOGGER.warning("Could not load dimension %s.%s, its keys will be resolved by dbt: %s",
+                               schema, spec['table'], e)
+                frame = pd.DataFrame(columns=['key'] + code_columns)
+            indexes[key_column] = _build_index(frame, code_columns)
+            LOGGER.debug("Cached %d keys from %s.%s", len(indexes[key_column][1]), schema, spec['table'])
+
+        _INDEXES[cache_key] = indexes
+        return indexes
+
+def resolve_dimension_keys(df, indexes):
+    """
+    Add the six surrogate key columns to a batch with vectorized hash lookups.
+
+    The key columns are added to the batch in place.
+
+    Args:
+        df (pandas.DataFrame): Extracted batch
+        indexes (dict): Output of load_dimension_indexes
+
+    Returns:
+        tuple: (DataFrame with nullable Int64 key columns,
+                DataFrame of unresolved codes with record_id, creation_timestamp,
+                dimension and code columns)
+    """
+    unresolved = []
+    for key_column, spec in DIMENSIONS.items():
+        index, keys = indexes[key_column]
+        arrays = [_normalize(df[source_column]) for _, source_column in spec['columns']]
+        lookup = pd.Index(arrays[0]) if len(arrays) == 1 else pd.MultiIndex.from_arrays(arrays)
+        positions = index.get_indexer(lookup) if len(index) else np.full(len(df), -1)
+
+        missing = positions < 0
+        resolved = keys[positions] if len(keys) else np.zeros(len(df), dtype='int64')
+        df[key_column] = pd.array(resolved, dtype='Int64')
+        df.loc[missing, key_column] = pd.NA
+
+        if missing.any():
+            codes = arrays[0] if len(arrays) == 1 else arrays[0].str.cat(arrays[1:], sep='|')
+            unresolved.append(pd.DataFrame({
+                'record_id': df['record_id'].to_numpy()[missing],
+                'creation_timestamp': df['creation_timestamp'].to_numpy()[missing],
+                'dimension': spec['table'],
+                'code': codes.to_numpy()[missing]
+            }))
+
+    unresolved = pd.concat(unresolved, ignore_index=True) if unresolved else pd.DataFrame(
+        columns=['record_id', 'creation_timestamp', 'dimension', 'code']
+    )
+    return df, unresolved
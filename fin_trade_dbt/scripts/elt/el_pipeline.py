@@ -3,31 +3,470 @@ Main entry point for the fin_trade ELT pipeline.
 Can be run directly or called from Airflow DAG and GitHub Actions.
 """
 
+import time
 from datetime import datetime
-from .extract import extract_data
-from .load import get_last_processed_data, load_to_sql_server
+import pandas as pd
+import pyarrow as pa
+from .extract import extract_batches, extract_partitioned, extract_changes, change_timestamps
+from .load import (
+    get_last_processed_data, get_last_change, get_run_key, get_sql_server_engine, load_to_sql_server, merge_changes,
+    replace_window
+)
+from .autotune import get_autotuner, is_backoff_error
+from .validation import validate_batch
+from .rollups import (
+    aggregate_batch, apply_rollup, batch_dates, combine, day_range, is_whole_days, mark_dirty, replace_days
+)
+from .dim_keys import load_dimension_indexes, resolve_dimension_keys
+from .pipelining import run_pipelined
+from .windows import GRAINS, parse_bound, plan_windows
+from .spool import (
+    new_run_id, write_batch, read_batch, read_metadata, mark_loaded,
+    list_batches, pending_batches, is_committed, collect_garbage
+)
 from ..config import DB_CONFIG
 from ..utils.logger import LOGGER
+from ..utils.metrics import instrument_batches, export_metrics
+from ..utils.profiling import PROFILE_CONFIG, profiled, profile_batch, profile_stage
 
-def run_pipeline():
-    """Run the ELT pipeline end-to-end."""
+def _validate(df, touched=None):
+    """
+    Split off the rows of a batch that fail the validation rules (see validation.py).
+    
+    Returns:
+        tuple: (passing rows, side_tables with the quarantined rows, or None)
+    """
+    pipeline_config = DB_CONFIG['PIPELINE_CONFIG']
+    if not pipeline_config['validate'] or df.empty:
+        return df, None
+    df, quarantined, stats = validate_batch(df, run_key=get_run_key())
+    if touched is not None:
+        touched.add_validation(stats)
+    if quarantined is None:
+        return df, None
+    return df, {pipeline_config['quarantine_table']: quarantined}
+
+def _prepare_batch(df, touched=None):
+    """Validate a batch and resolve the dimension keys of its passing rows; returns (df, side_tables)."""
+    df, quarantine = _validate(df, touched)
+    df, side_tables = _resolve_keys(df)
+    if quarantine:
+        side_tables = {**quarantine, **(side_tables or {})}
+    return df, side_tables
+
+def _resolve_keys(df):
+    """Resolve a batch's dimension keys; returns (df, side_tables) for the loader."""
+    pipeline_config = DB_CONFIG['PIPELINE_CONFIG']
+    side_tables = None
+    if pipeline_config['resolve_dim_keys'] and not df.empty:
+        indexes = load_dimension_indexes(
+            get_sql_server_engine(DB_CONFIG['SQLSERVER_CONFIG']), pipeline_config['dim_schema']
+        )
+        df, unresolved = resolve_dimension_keys(df, indexes)
+        if not unresolved.empty:
+            LOGGER.warning("%d record(s) have dimension codes without a key; writing them to %s",
+                           unresolved['record_id'].nunique(), pipeline_config['unresolved_keys_table'])
+        side_tables = {pipeline_config['unresolved_keys_table']: unresolved}
+    return df, side_tables
+
+def _touch(touched, df, side_tables):
+    """Record a loaded batch, with its unresolved dimension codes, in a TouchedKeys accumulator."""
+    if touched is not None:
+        unresolved = side_tables.get(DB_CONFIG['PIPELINE_CONFIG']['unresolved_keys_table']) if side_tables else None
+        touched.add_batch(df, unresolved)
+
+def _rollup_hook(df):
+    """Return the before_commit hook adding a batch's aggregates to the daily rollups, or None when they are off."""
+    if not DB_CONFIG['PIPELINE_CONFIG']['rollups'] or df.empty:
+        return None
+    rollup = aggregate_batch(df)
+    return lambda connection: apply_rollup(connection, rollup)
+
+def _load_tuned(df, wait_turn, side_tables, watermark, tuner, before_commit=None):
+    """
+    Load a batch with the tuner's load batch size, backing off and retrying on congestion.
+    
+    Timeouts, lock waits and deadlocks roll the whole batch back, watermark included,
+    so it is retried after a pause with the smaller batch size the tuner has moved to.
+    bcp commits its rows in a session of its own, so its batches are never retried.
+    """
+    pipeline_config = DB_CONFIG['PIPELINE_CONFIG']
+    retryable = DB_CONFIG['SQLSERVER_CONFIG']['load_strategy'] != 'bcp'
+    if wait_turn is not None:
+        # Wait for the commit turn before timing the load, so the tuner measures the load alone
+        wait_turn()
+    attempt = 0
+    while True:
+        tuner.start_load()
+        started = time.perf_counter()
+        try:
+            load_to_sql_server(df, batch_size=tuner.load_batch_size, wait_turn=wait_turn, side_tables=side_tables,
+                               watermark=watermark, before_commit=before_commit)
+        except Exception as e:
+            tuner.observe_load(len(df), time.perf_counter() - started, error=e)
+            if not retryable or not is_backoff_error(e) or attempt >= pipeline_config['autotune_retries']:
+                raise
+            attempt += 1
+            pause = pipeline_config['autotune_backoff_seconds'] * 2 ** (attempt - 1)
+            LOGGER.warning("Load of %d rows hit %s; retrying in %.1fs with batches of %d (attempt %d)",
+                           len(df), type(e).__name__, pause, tuner.load_batch_size, attempt)
+            time.sleep(pause)
+            continue
+        tuner.observe_load(len(df), time.perf_counter() - started)
+        return
+
+def _load_batch(df, wait_turn=None, touched=None, tuner=None):
+    """Validate, resolve dimension keys, load one batch and mark its spool file, if any, as loaded."""
+    spool_path = df.attrs.get('spool_path')
+    # Checkpointed past the whole batch, quarantined rows included
+    watermark = (df.iloc[-1]['creation_timestamp'], df.iloc[-1]['record_id']) if not df.empty else None
+    with profile_batch('load', len(df)):
+        with profile_stage('prepare'):
+            df, side_tables = _prepare_batch(df, touched)
+            # Added in the batch's own transaction, so a batch is never counted twice
+            before_commit = _rollup_hook(df)
+        if tuner is not None:
+            _load_tuned(df, wait_turn, side_tables, watermark, tuner, before_commit)
+        else:
+            load_to_sql_server(df, wait_turn=wait_turn, side_tables=side_tables, watermark=watermark,
+                               before_commit=before_commit)
+    _touch(touched, df, side_tables)
+    if spool_path:
+        mark_loaded(spool_path)
+
+def _spool_batches(batches, spool_dir, run_id):
+    """
+    Write each extracted batch to the spool before handing it to the loader.
+    
+    Spooling runs before validation, so a batch Arrow cannot encode (e.g. mixed
+    types in a column) is handed over unspooled instead of failing the run; its
+    bad rows are then quarantined like any other.
+    
+    Spooling stops for the rest of the run at the first such batch. A replay
+    after a failed load of the unspooled batch would otherwise load the later
+    spooled batches and move the watermark past the rows that were never loaded.
+    """
+    spooling = True
     try:
+        for seq, df in enumerate(batches):
+            if spooling:
+                try:
+                    df.attrs['spool_path'] = write_batch(df, spool_dir, run_id, seq)
+                except pa.ArrowException as e:
+                    spooling = False
+                    LOGGER.warning("Could not spool batch %d of run %s, loading it and the rest of the run "
+                                   "without spool files: %s", seq, run_id, e)
+            yield df
+    finally:
+        if hasattr(batches, 'close'):
+            batches.close()
+
+@profiled('el_replay')
+def replay_spool(run_id=None, force=False, touched=None):
+    """
+    Load spooled batches from disk without reading the source database.
+    
+    Args:
+        run_id (str): Replay every batch of this run. When None, only batches
+                      that were extracted but never marked as loaded are replayed
+        force (bool): Also reload batches at or below the committed watermark
+        touched (TouchedKeys): Records the loaded dates, accounts and products
+    
+    Returns:
+        int: Number of rows loaded from the spool
+    """
+    spool_dir = DB_CONFIG['PIPELINE_CONFIG']['spool_dir']
+    paths = list_batches(spool_dir, run_id) if run_id else pending_batches(spool_dir)
+    if not paths:
+        return 0
+    
+    last_event_date, last_record_id = get_last_processed_data()
+    total_rows = 0
+    for path in paths:
+        metadata = read_metadata(path)
+        if not force and is_committed(metadata, last_event_date, last_record_id):
+            # Committed before the previous attempt could mark it; loading again would duplicate rows
+            mark_loaded(path)
+            continue
+        
+        df, _ = read_batch(path)
+        _load_batch(df, touched=touched)
+        total_rows += len(df)
+        LOGGER.info("Replayed spooled batch %s (%d rows)", metadata['batch_id'], len(df))
+    return total_rows
+
+@profiled('el_pipeline')
+def run_pipeline(touched=None):
+    """
+    Run the ELT pipeline end-to-end.
+    
+    With EL_PROFILE=true the run is profiled and a report is written to
+    EL_PROFILE_DIR (see scripts/utils/profiling.py).
+    
+    Args:
+        touched (TouchedKeys): Records the loaded dates, accounts and products, for
+                               change-aware dbt builds
+    """
+    tuner = None
+    try:
+        pipeline_config = DB_CONFIG['PIPELINE_CONFIG']
+        spool_enabled = pipeline_config['spool_enabled']
+        total_rows = 0
+        # Batch sizes and loader count learned from earlier runs, adjusted as batches go
+        tuner = get_autotuner()
+        
+        if spool_enabled:
+            # Finish batches an earlier attempt extracted but did not load, without re-reading the source
+            total_rows += replay_spool(touched=touched)
+        
         # Get last processed data
         last_event_date, last_record_id = get_last_processed_data()
         
-        # Extract and load
-        df = extract_data(last_event_date, last_record_id)
-        if not df.empty:
-            load_to_sql_server(df)
-            LOGGER.info(f"Processed {len(df)} records")
+        # Extract and load batch by batch so only a bounded number of batches is held in memory
+        if DB_CONFIG['MYSQL_CONFIG']['extract_partitions'] > 1:
+            batches = extract_partitioned(last_event_date, last_record_id)
+        else:
+            batches = extract_batches(last_event_date, last_record_id, tuner=tuner)
+        batches = instrument_batches('extract', batches)
+        
+        if spool_enabled:
+            batches = _spool_batches(batches, pipeline_config['spool_dir'], new_run_id())
+        
+        if pipeline_config['mode'] == 'pipelined':
+            # Overlap extraction with loading through a bounded queue
+            if tuner is not None:
+                tuner.tune_workers = True
+            total_rows += run_pipelined(
+                batches,
+                lambda df, wait_turn: _load_batch(df, wait_turn, touched, tuner),
+                queue_size=pipeline_config['queue_size'],
+                workers=tuner.max_workers if tuner else pipeline_config['load_workers'],
+                ordered_commits=True,
+                active_limit=(lambda: tuner.load_workers) if tuner else None
+            )
+        else:
+            for df in batches:
+                _load_batch(df, touched=touched, tuner=tuner)
+                total_rows += len(df)
+        
+        if pipeline_config['cdc_enabled']:
+            total_rows += run_changes(touched)
+        
+        if spool_enabled:
+            collect_garbage(
+                pipeline_config['spool_dir'],
+                max_age_hours=pipeline_config['spool_max_age_hours'],
+                max_bytes=pipeline_config['spool_max_bytes']
+            )
+        
+        if total_rows:
+            LOGGER.info("Processed %d records", total_rows)
         else:
             LOGGER.info("No new data to process")
             
         return True
         
     except Exception as e:
-        LOGGER.error(f"Pipeline failed: {str(e)}")
+        LOGGER.error("Pipeline failed: %s", e)
+        raise
+        
+    finally:
+        # Saved on failure too: a run that backed off should not start the next one where it failed
+        if tuner is not None:
+            tuner.save()
+        # Export on failure too, so a failed run still shows up in the dashboards
+        export_metrics()
+
+@profiled('el_changes')
+def run_changes(touched=None):
+    """
+    Merge rows modified or soft-deleted since the change watermark into staging.
+    
+    Runs after the incremental load: only rows it has already loaded are read, and
+    each batch is upserted by record_id (see load.merge_changes) together with the
+    change watermark, so a rerun resumes after the last merged batch. Soft deletes
+    arrive as rows with their deletion_timestamp set. The changed rows' days are
+    marked for a rollup recompute, since their earlier versions were already counted.
+    
+    Args:
+        touched (TouchedKeys): Records the changed rows' dates, accounts and products
+    
+    Returns:
+        int: Number of changed rows merged
+    """
+    last_change, last_change_id = get_last_change()
+    last_event_date, last_record_id = get_last_processed_data()
+    batches = extract_changes(last_change, last_change_id, last_event_date, last_record_id)
+    
+    rollups = DB_CONFIG['PIPELINE_CONFIG']['rollups']
+    total_rows = 0
+    for df in instrument_batches('extract_changes', batches):
+        last_change = (pd.Timestamp(change_timestamps(df).iloc[-1]).to_pydatetime(), int(df.iloc[-1]['record_id']))
+        dates = batch_dates(df) if rollups else None
+        df, side_tables = _prepare_batch(df, touched)
+        merge_changes(df, last_change, side_tables=side_tables,
+                      before_commit=(lambda connection: mark_dirty(connection, dates)) if dates else None)
+        _touch(touched, df, side_tables)
+        total_rows += len(df)
+    LOGGER.info("Merged %d changed records", total_rows)
+    return total_rows
+
+def run_window(start, end, watermark=None, touched=None):
+    """
+    Reload one explicit [start, end) creation_timestamp window of financial_events.
+    
+    The window's staged rows are replaced in a single transaction (see
+    load.replace_window), so rerunning a window is safe and windows can run in
+    parallel. Rows past the committed watermark belong to the incremental run:
+    the window is cut at the watermark's timestamp, so the two never load the
+    same row. Window batches are not spooled, since spool replays advance the
+    watermark. A window of whole days replaces those days' rollups in its
+    transaction; the days of any other window are marked for a recompute.
+    
+    Args:
+        start (str|datetime): Inclusive lower bound, ISO format
+        end (str|datetime): Exclusive upper bound, ISO format
+        watermark (datetime): Committed watermark timestamp, read from the target when None
+        touched (TouchedKeys): Records the window's dates and the loaded accounts and products
+    
+    Returns:
+        int: Number of rows loaded
+    """
+    start, end = parse_bound(start), parse_bound(end)
+    if watermark is None:
+        watermark = parse_bound(get_last_processed_data()[0])
+    if watermark <= start:
+        LOGGER.info("Window [%s, %s) starts at or after the watermark (%s): not loaded incrementally yet, "
+                    "nothing to reload", start, end, watermark)
+        return 0
+    if watermark < end:
+        LOGGER.info("Window [%s, %s) ends after the watermark; stopping at %s", start, end, watermark)
+        end = watermark
+    
+    # Bounds are passed as 'YYYY-MM-DD HH:MM:SS' text, which MySQL and SQL Server convert to
+    # the column's type and which compares correctly with the SQLite stand-ins' text timestamps
+    start_text, end_text = str(start), str(end)
+    
+    # Keyset starting just before `start`: created_at > start OR (created_at = start AND id > -1)
+    if DB_CONFIG['MYSQL_CONFIG']['extract_partitions'] > 1:
+        batches = extract_partitioned(start_text, -1, end_date=end_text)
+    else:
+        batches = extract_batches(start_text, -1, end_date=end_text)
+    
+    pipeline_config = DB_CONFIG['PIPELINE_CONFIG']
+    whole_days = pipeline_config['rollups'] and is_whole_days(start, end)
+    rollups = []
+    
+    def prepare(df):
+        df, side_tables = _prepare_batch(df, touched)
+        _touch(touched, df, side_tables)
+        if whole_days:
+            rollups.append(aggregate_batch(df))
+        return df, side_tables
+    
+    def before_commit(connection):
+        if whole_days:
+            replace_days(connection, combine(rollups), start.date(), end.date())
+        else:
+            mark_dirty(connection, day_range(start, end))
+    
+    side_table_names = [pipeline_config['unresolved_keys_table']] if pipeline_config['resolve_dim_keys'] else []
+    if pipeline_config['validate']:
+        side_table_names.append(pipeline_config['quarantine_table'])
+    stats = replace_window(
+        instrument_batches('extract', batches),
+        start_text,
+        end_text,
+        prepare=prepare,
+        side_table_names=side_table_names,
+        before_commit=before_commit if pipeline_config['rollups'] else None
+    )
+    if touched is not None:
+        touched.add_window(start, end)
+    return stats['rows']
+
+@profiled('el_backfill')
+def run_backfill(start, end, grain=None, touched=None):
+    """
+    Reload [start, end) window by window in this process.
+    
+    Airflow fans the same windows out to parallel mapped tasks instead; this is
+    the command line equivalent.
+    
+    Args:
+        start (str|datetime): Inclusive lower bound, ISO format
+        end (str|datetime): Exclusive upper bound, ISO format
+        grain (str): Split the range into day or hour windows; None loads it as one window
+        touched (TouchedKeys): Records the windows' dates and the loaded accounts and products
+    
+    Returns:
+        int: Number of rows loaded
+    """
+    try:
+        # Windows past the watermark have nothing to reload, so the range is cut there before planning
+        watermark = parse_bound(get_last_processed_data()[0])
+        start, end = parse_bound(start), min(parse_bound(end), watermark)
+        if end <= start:
+            LOGGER.info("Nothing before the watermark (%s) to backfill", watermark)
+            return 0
+        
+        windows = plan_windows(start, end, grain) if grain else [(start, end)]
+        total_rows = 0
+        for window_start, window_end in windows:
+            total_rows += run_window(window_start, window_end, watermark, touched)
+        LOGGER.info("Backfilled %d records in %d window(s)", total_rows, len(windows))
+        return total_rows
+    
+    except Exception as e:
+        LOGGER.error("Backfill failed: %s", e)
         raise
+    
+    finally:
+        export_metrics()
 
 if __name__ == "__main__":
-    run_pipeline() 
\ No newline at end of file
+    import argparse
+    import json
+    from .touched import TouchedKeys, write_manifest
+    from ..utils.logger import flush_logs
+    
+    parser = argparse.ArgumentParser(description="Run the fin_trade EL pipeline.")
+    parser.add_argument('--replay', metavar='RUN_ID', help="Reload a spooled run from disk instead of extracting")
+    parser.add_argument('--force', action='store_true', help="With --replay, also reload already committed batches")
+    parser.add_argument('--start', help="Reload the window starting at this ISO date/datetime (inclusive)")
+    parser.add_argument('--end', help="End of the window to reload (exclusive)")
+    parser.add_argument('--changes', action='store_true',
+                        help="Only merge rows modified or soft-deleted since the change watermark")
+    parser.add_argument('--grain', choices=list(GRAINS), help="With --start/--end, reload one window per day or hour")
+    parser.add_argument('--profile', action='store_true',
+                        help="Profile the run and write a report to EL_PROFILE_DIR (same as EL_PROFILE=true)")
+    parser.add_argument('--touched-manifest', metavar='PATH',
+                        help="Also write the manifest of loaded dates, accounts and products to this file")
+    args = parser.parse_args()
+    
+    if bool(args.start) != bool(args.end):
+        parser.error("--start and --end must be given together")
+    if args.profile:
+        PROFILE_CONFIG['ENABLED'] = True
+    
+    touched = TouchedKeys()
+    if args.start:
+        run_backfill(args.start, args.end, args.grain, touched=touched)
+    elif args.changes:
+        try:
+            run_changes(touched=touched)
+        finally:
+            export_metrics()
+    elif args.replay:
+        replay_spool(args.replay, force=args.force, touched=touched)
+        export_metrics()
+    else:
+        run_pipeline(touched=touched)
+    
+    manifest = touched.to_dict()
+    if args.touched_manifest:
+        write_manifest(manifest, args.touched_manifest)
+    # The manifest is the last line on stdout, which the Airflow BashOperator pushes as the task's
+    # XCom for the dbt step; queued log lines are written out first so none can follow it
+    flush_logs()
+    print(json.dumps(manifest))
@@ -3,14 +3,26 @@ Data extraction module for fin_trade pipeline.
 Handles data extraction from MySQL source database.
 """
 
+import importlib.util
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import sqlalchemy
 import pandas as pd
+from .schema import extract_dtypes
 from ..config import DB_CONFIG
 from ..utils.logger import LOGGER
+from ..utils.engine_registry import get_engine
+from ..utils.metrics import instrument
 
 def get_mysql_engine(config):
     """
-    Create MySQL SQLAlchemy engine for database connection.
+    Get the shared MySQL SQLAlchemy engine for database connection.
+    
+    Engines are cached in the process-wide registry, so repeated calls with the
+    same configuration reuse one connection pool.
     
     Args:
         config (dict): Dictionary containing MySQL connection parameters
@@ -21,32 +33,145 @@ def get_mysql_engine(config):
     
     Raises:
         sqlalchemy.exc.SQLAlchemyError: If connection creation fails
+    
+    Note:
+        If config['url'] is set (MYSQL_URL), that URL is used as is and the
+        MySQL specific connect arguments are skipped, so a local stand-in
+        database can be used in place of the source.
+        With config['compress'] (MYSQL_COMPRESS) the connection uses the MySQL
+        protocol's compression through the mysqlclient driver, if it is installed.
     """
-    connection_url = (
-        f"mysql+pymysql://{config['username']}:{config['password']}"
-        f"@{config['server']}:{config['port']}/{config['database']}"
-        f"?charset={config['charset']}"
-        f"&ssl_verify_cert={config['ssl_verify_cert']}"
-        f"&ssl_verify_identity={config['ssl_verify_identity']}"
-    )
-    return sqlalchemy.create_engine(
+    if config.get('url'):
+        return get_engine(
+            config['pool_name'],
+            config['url'],
+            pool_size=config['pool_size'],
+            max_overflow=config['max_overflow'],
+            pool_timeout=config['pool_timeout'],
+            pool_recycle=config['pool_recycle'],
+            warmup=config['pool_warmup']
+        )
+    
+    connect_args = {
+        'connect_timeout': config['connection_timeout'],
+        'read_timeout': config['read_timeout'],
+        'write_timeout': config['write_timeout']
+    }
+    if config['compress'] and importlib.util.find_spec('MySQLdb') is not None:
+        # Protocol compression needs mysqlclient; PyMySQL does not implement it
+        connect_args['compress'] = True
+        if config['ssl_verify_identity'] == 'true':
+            connect_args['ssl_mode'] = 'VERIFY_IDENTITY'
+        elif config['ssl_verify_cert'] == 'true':
+            connect_args['ssl_mode'] = 'VERIFY_CA'
+        connection_url = (
+            f"mysql+mysqldb://{config['username']}:{config['password']}"
+            f"@{config['server']}:{config['port']}/{config['database']}"
+            f"?charset={config['charset']}"
+        )
+    else:
+        if config['compress']:
+            LOGGER.warning("MYSQL_COMPRESS needs the mysqlclient driver, which is not installed; "
+                           "connecting uncompressed with PyMySQL")
+        connection_url = (
+            f"mysql+pymysql://{config['username']}:{config['password']}"
+            f"@{config['server']}:{config['port']}/{config['database']}"
+            f"?charset={config['charset']}"
+            f"&ssl_verify_cert={config['ssl_verify_cert']}"
+            f"&ssl_verify_identity={config['ssl_verify_identity']}"
+        )
+    return get_engine(
+        config['pool_name'],
         connection_url,
         pool_size=config['pool_size'],
-        pool_name=config['pool_name'],
-        connect_args={
-            'connect_timeout': config['connection_timeout'],
-            'read_timeout': config['read_timeout'],
-            'write_timeout': config['write_timeout']
-        }
+        max_overflow=config['max_overflow'],
+        pool_timeout=config['pool_timeout'],
+        pool_recycle=config['pool_recycle'],
+        warmup=config['pool_warmup'],
+        retries=config['retries'],
+        connect_args=connect_args
     )
 
-def extract_data(last_event_date="2000-01-01T00:00:00", last_record_id=0):
+# Named column projections of financial_events (MYSQL_CONFIG['extract_projection'])
+PROJECTIONS = {
+    # Everything, for audits: the provider_response payload is routed to the payload store
+    'audit': [
+        # Primary identifier for the record
+        'record_id',
+        # Timestamps for record lifecycle
+        'creation_timestamp', 'modification_timestamp', 'deletion_timestamp',
+        # User information
+        'user_identifier', 'user_email',
+        # order status information
+        'status_code',
+        # Asset information
+        'quote_currency', 'base_currency', 'quote_amount', 'base_amount',
+        # Price and order details
+        'execution_price', 'order_direction', 'market_symbol', 'order_type',
+        # Execution details
+        'executed_amount', 'total_quote_executed', 'time_validity', 'fee_amount',
+        # Provider details
+        'provider_quoted_price', 'provider_fee', 'liquidity_provider', 'provider_response'
+    ]
+}
+# Only what the dbt models read: fct.orders (including deletion_timestamp for deleted_at), and
+# the dimensions built from stg_orders (user_email for cust_profile, time_validity for prd_category)
+PROJECTIONS['fact'] = [
+    column for column in PROJECTIONS['audit'] if column != 'provider_response'
+]
+
+def projection_columns(extra=()):
+    """
+    Return the columns of the configured projection, plus any extra columns.
+    
+    Raises:
+        ValueError: If MYSQL_CONFIG['extract_projection'] names no projection
+    """
+    projection = DB_CONFIG['MYSQL_CONFIG']['extract_projection']
+    if projection not in PROJECTIONS:
+        raise ValueError(f"Unknown extract projection '{projection}'. Use one of: {', '.join(PROJECTIONS)}")
+    return PROJECTIONS[projection] + [column for column in extra if column not in PROJECTIONS[projection]]
+
+def select_columns(extra=()):
+    """Return the SELECT list of the configured projection, plus any extra columns."""
+    return ',\n        '.join(projection_columns(extra))
+
+def _read_frame(query_sql, connection, params, extra=()):
+    """
+    Run an extract query and type its columns by the schema contract as they are read.
+    
+    coerce_float=False keeps MySQL DECIMAL values as exact Decimals until they are
+    cast to the decimal128 dtype, instead of round-tripping them through float64.
+    extra must match the extra columns passed to select_columns.
+    """
+    return pd.read_sql(
+        sqlalchemy.text(query_sql),
+        connection,
+        params=params,
+        coerce_float=False,
+        dtype=extract_dtypes(projection_columns(extra))
+    )
+
+def _upper_bound(end_date, params):
+    """
+    Return the created_at upper bound filter: the explicit window end when one is
+    given, otherwise midnight today, so incremental runs never read a partial day.
+    """
+    if end_date is None:
+        return "AND created_at < CURDATE()"
+    params["end_date"] = end_date
+    return "AND created_at < :end_date"
+
+@instrument('extract')
+def extract_data(last_event_date="2000-01-01T00:00:00", last_record_id=0, parallel=False, end_date=None):
     """
     Extract data from MySQL source database with incremental loading support.
     
     Args:
         last_event_date (str): Timestamp of the last processed record (ISO format)
         last_record_id (int): ID of the last processed record
+        parallel (bool): Pull range partitions concurrently (see extract_partitioned)
+        end_date (datetime): Exclusive created_at upper bound. Defaults to CURDATE()
     
     Returns:
         pandas.DataFrame: DataFrame containing extracted data
@@ -54,59 +179,404 @@ def extract_data(last_event_date="2000-01-01T00:00:00", last_record_id=0):
     Raises:
         Exception: If data extraction fails
     """
+    if parallel:
+        frames = list(extract_partitioned(last_event_date, last_record_id, end_date=end_date))
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
     mysql_config = DB_CONFIG['MYSQL_CONFIG']
 
-    LOGGER.info(f"Fetching data from {mysql_config['database']} "
-                f"since ts > '{last_event_date}' AND id > {last_record_id}")
-    
-    query_sql = """
-    SELECT 
-        -- Primary identifier for the record
-        record_id,
-        -- Timestamps for record lifecycle
-        creation_timestamp,
-        modification_timestamp,
-        deletion_timestamp,
-        -- User information
-        user_identifier,
-        user_email,
-        -- order status information
-        status_code,
-        -- Asset information
-        quote_currency,
-        base_currency,
-        quote_amount,
-        base_amount,
-        -- Price and order details
-        execution_price,
-        order_direction,
-        market_symbol,
-        order_type,
-        -- Execution details
-        executed_amount,
-        total_quote_executed,
-        time_validity,
-        fee_amount,
-        -- Provider details
-        provider_quoted_price,
-        provider_fee,
-        liquidity_provider,
-        provider_response
+    LOGGER.info("Fetching data from %s since ts > '%s' AND id > %s",
+                mysql_config['database'], last_event_date, last_record_id)
+    
+    params = {
+        "last_create_date": last_event_date,
+        "last_natural_key": last_record_id
+    }
+    query_sql = f"""
+    SELECT {select_columns()}
     FROM financial_events
     WHERE (created_at > :last_create_date OR (created_at = :last_create_date AND id > :last_natural_key))
-    AND created_at < CURDATE()
+    {_upper_bound(end_date, params)}
     ORDER BY created_at, id;
     """
     
     try:
         engine = get_mysql_engine(mysql_config)
         with engine.connect() as connection:
-            df = pd.read_sql(sqlalchemy.text(query_sql), connection, params={
-                "last_create_date": last_event_date,
-                "last_natural_key": last_record_id
-            })
-        LOGGER.info(f"Fetched {len(df)} new rows from financial_events table.")
+            df = _read_frame(query_sql, connection, params=params)
+        LOGGER.info("Fetched %d new rows from financial_events table.", len(df))
         return df
     except Exception as e:
-        LOGGER.error(f"Error extracting data from MySQL: {e}")
-        raise 
\ No newline at end of file
+        LOGGER.error("Error extracting data from MySQL: %s", e)
+        raise
+
+def extract_batches(last_event_date="2000-01-01T00:00:00", last_record_id=0, batch_size=None, end_date=None,
+                    tuner=None):
+    """
+    Stream data from MySQL source database in bounded, keyset-paginated batches.
+    
+    Each batch is fetched with `ORDER BY created_at, id LIMIT batch_size` and the
+    next page starts strictly after the last (created_at, id) seen, so no OFFSET
+    scan is needed and memory stays bounded by the batch size regardless of how
+    large the backlog is. Rows are read over an unbuffered (server-side) pymysql
+    cursor so the driver never holds more than the current page.
+    
+    Args:
+        last_event_date (str): Timestamp of the last processed record (ISO format)
+        last_record_id (int): ID of the last processed record
+        batch_size (int): Maximum rows per batch. Defaults to
+                          MYSQL_CONFIG['extract_batch_size']
+        end_date (datetime): Exclusive created_at upper bound. Defaults to CURDATE()
+        tuner (Autotuner): Sizes each page and is told how long it took (see autotune.py);
+                           overrides batch_size
+    
+    Yields:
+        pandas.DataFrame: Non-empty batches in (created_at, id) order
+    
+    Raises:
+        Exception: If data extraction fails
+    """
+    mysql_config = DB_CONFIG['MYSQL_CONFIG']
+    batch_size = tuner.extract_batch_size if tuner else batch_size or mysql_config['extract_batch_size']
+
+    LOGGER.info("Streaming data from %s in batches of %d since ts > '%s' AND id > %s",
+                mysql_config['database'], batch_size, last_event_date, last_record_id)
+    
+    params = {
+        "last_create_date": last_event_date,
+        "last_natural_key": last_record_id,
+        "batch_size": batch_size
+    }
+    query_sql = f"""
+    SELECT {select_columns()}
+    FROM financial_events
+    WHERE (created_at > :last_create_date OR (created_at = :last_create_date AND id > :last_natural_key))
+    {_upper_bound(end_date, params)}
+    ORDER BY created_at, id
+    LIMIT :batch_size;
+    """
+    total_rows = 0
+    
+    try:
+        engine = get_mysql_engine(mysql_config)
+        with engine.connect() as connection:
+            connection = connection.execution_options(stream_results=True)
+            while True:
+                if tuner is not None:
+                    params["batch_size"] = tuner.extract_batch_size
+                started = time.perf_counter()
+                try:
+                    df = _read_frame(query_sql, connection, params)
+                except Exception as e:
+                    if tuner is not None:
+                        tuner.observe_extract(0, time.perf_counter() - started, error=e)
+                    raise
+                if tuner is not None and not df.empty:
+                    tuner.observe_extract(len(df), time.perf_counter() - started)
+                if df.empty:
+                    break
+                
+                total_rows += len(df)
+                LOGGER.debug("Fetched batch of %d rows (%d total).", len(df), total_rows)
+                
+                # Advance the keyset to the last row of this page
+                last_row = df.iloc[-1]
+                params["last_create_date"] = pd.Timestamp(last_row['creation_timestamp']).to_pydatetime()
+                params["last_natural_key"] = int(last_row['record_id'])
+                
+                is_last_page = len(df) < params["batch_size"]
+                yield df
+                del df
+                if is_last_page:
+                    break
+        LOGGER.info("Fetched %d new rows from financial_events table.", total_rows)
+    except Exception as e:
+        LOGGER.error("Error extracting data from MySQL: %s", e)
+        raise
+
+# Read by every change extract, whatever the projection
+CHANGE_COLUMNS = ['modification_timestamp', 'deletion_timestamp']
+
+# Latest change of a row: its modification or soft deletion, whichever is later
+CHANGE_TIMESTAMP = """CASE WHEN modification_timestamp IS NULL OR deletion_timestamp > modification_timestamp
+              THEN deletion_timestamp ELSE modification_timestamp END"""
+
+def change_timestamps(df):
+    """Return each extracted row's change timestamp, as CHANGE_TIMESTAMP computes it in the source."""
+    return df[CHANGE_COLUMNS].max(axis=1)
+
+def extract_changes(last_change_date, last_record_id, last_event_date, last_loaded_id, batch_size=None):
+    """
+    Stream rows modified or soft-deleted since the change watermark, in keyset-paginated batches.
+    
+    Only rows at or below the load watermark (last_event_date, last_loaded_id) are read:
+    rows past it have not been loaded yet, and the incremental run picks up their
+    current values anyway. Pages are ordered by (CHANGE_TIMESTAMP, id); the sargable
+    modification/deletion timestamp filter lets the source use an index on either
+    column before the exact keyset comparison. Like the incremental extract, changes
+    of the current day are left for the next run.
+    
+    Args:
+        last_change_date (str|datetime): Change timestamp of the last merged change
+        last_record_id (int): ID of the last merged change
+        last_event_date (str|datetime): created_at of the last loaded record
+        last_loaded_id (int): ID of the last loaded record
+        batch_size (int): Maximum rows per batch. Defaults to
+                          MYSQL_CONFIG['extract_batch_size']
+    
+    Yields:
+        pandas.DataFrame: Non-empty batches in (change timestamp, id) order
+    
+    Raises:
+        Exception: If data extraction fails
+    """
+    mysql_config = DB_CONFIG['MYSQL_CONFIG']
+    batch_size = batch_size or mysql_config['extract_batch_size']
+
+    LOGGER.info("Streaming changes from %s since change ts > '%s' AND id > %s",
+                mysql_config['database'], last_change_date, last_record_id)
+    
+    params = {
+        "last_change_date": last_change_date,
+        "last_natural_key": last_record_id,
+        "last_create_date": last_event_date,
+        "last_loaded_key": last_loaded_id,
+        "batch_size": batch_size
+    }
+    query_sql = f"""
+    SELECT {select_columns(extra=CHANGE_COLUMNS)}
+    FROM financial_events
+    WHERE (modification_timestamp >= :last_change_date OR deletion_timestamp >= :last_change_date)
+    AND ({CHANGE_TIMESTAMP} > :last_change_date
+         OR ({CHANGE_TIMESTAMP} = :last_change_date AND id > :last_natural_key))
+    AND {CHANGE_TIMESTAMP} < CURDATE()
+    AND (created_at < :last_create_date OR (created_at = :last_create_date AND id <= :last_loaded_key))
+    ORDER BY {CHANGE_TIMESTAMP}, id
+    LIMIT :batch_size;
+    """
+    total_rows = 0
+    
+    try:
+        engine = get_mysql_engine(mysql_config)
+        with engine.connect() as connection:
+            connection = connection.execution_options(stream_results=True)
+            while True:
+                df = _read_frame(query_sql, connection, params, extra=CHANGE_COLUMNS)
+                if df.empty:
+                    break
+                
+                total_rows += len(df)
+                LOGGER.debug("Fetched batch of %d changed rows (%d total).", len(df), total_rows)
+                
+                # Advance the keyset to the last row of this page
+                params["last_change_date"] = pd.Timestamp(change_timestamps(df).iloc[-1]).to_pydatetime()
+                params["last_natural_key"] = int(df.iloc[-1]['record_id'])
+                
+                is_last_page = len(df) < batch_size
+                yield df
+                del df
+                if is_last_page:
+                    break
+        LOGGER.info("Fetched %d changed rows from financial_events table.", total_rows)
+    except Exception as e:
+        LOGGER.error("Error extracting changes from MySQL: %s", e)
+        raise
+
+def plan_partitions(connection, last_event_date, last_record_id, partitions, end_date=None):
+    """
+    Split the pending (created_at, id) keyspace into disjoint created_at ranges.
+    
+    Boundaries come from a single MIN/MAX query that the (created_at, id) index
+    answers without scanning rows. The first range is open below and the last is
+    open above (bounded only by end_date or CURDATE()), so together they cover the keyspace
+    exactly once.
+    
+    Args:
+        connection (sqlalchemy.engine.Connection): Open MySQL connection
+        last_event_date (str): Timestamp of the last processed record (ISO format)
+        last_record_id (int): ID of the last processed record
+        partitions (int): Desired number of partitions
+        end_date (datetime): Exclusive created_at upper bound. Defaults to CURDATE()
+    
+    Returns:
+        list: (lower, upper) datetime pairs in created_at order; None marks an open bound
+    """
+    params = {
+        "last_create_date": last_event_date,
+        "last_natural_key": last_record_id
+    }
+    bounds_sql = f"""
+    SELECT MIN(created_at) AS min_ts, MAX(created_at) AS max_ts
+    FROM financial_events
+    WHERE (created_at > :last_create_date OR (created_at = :last_create_date AND id > :last_natural_key))
+    {_upper_bound(end_date, params)};
+    """
+    row = connection.execute(sqlalchemy.text(bounds_sql), params).one()
+    
+    if row.min_ts is None:
+        return []
+    
+    min_ts, max_ts = pd.Timestamp(row.min_ts), pd.Timestamp(row.max_ts)
+    step = (max_ts - min_ts) / max(partitions, 1)
+    if partitions <= 1 or step <= pd.Timedelta(0):
+        return [(None, None)]
+    
+    cuts = [(min_ts + step * i).to_pydatetime() for i in range(1, partitions)]
+    return list(zip([None] + cuts, cuts + [None]))
+
+# Pages a partition worker may fetch ahead of the consumer before it waits
+PARTITION_PAGES_AHEAD = 2
+
+# Put on a partition's page queue after its last page
+_PARTITION_DONE = object()
+
+def _extract_partition(engine, lower, upper, last_event_date, last_record_id, batch_size, end_date=None):
+    """
+    Page through one created_at range of the pending keyspace in (created_at, id) order.
+    
+    Uses the same keyset LIMIT loop as extract_batches, so a partition is never
+    held in memory as a whole.
+    """
+    range_filter = ""
+    params = {
+        "last_create_date": last_event_date,
+        "last_natural_key": last_record_id,
+        "batch_size": batch_size
+    }
+    if lower is not None:
+        range_filter += "AND created_at >= :lower_ts "
+        params["lower_ts"] = lower
+    if upper is not None:
+        range_filter += "AND created_at < :upper_ts "
+        params["upper_ts"] = upper
+    
+    query_sql = f"""
+    SELECT {select_columns()}
+    FROM financial_events
+    WHERE (created_at > :last_create_date OR (created_at = :last_create_date AND id > :last_natural_key))
+    {_upper_bound(end_date, params)}
+    {range_filter}
+    ORDER BY created_at, id
+    LIMIT :batch_size;
+    """
+    with engine.connect() as connection:
+        connection = connection.execution_options(stream_results=True)
+        while True:
+            df = _read_frame(query_sql, connection, params)
+            if df.empty:
+                return
+            
+            # Advance the keyset to the last row of this page
+            last_row = df.iloc[-1]
+            params["last_create_date"] = pd.Timestamp(last_row['creation_timestamp']).to_pydatetime()
+            params["last_natural_key"] = int(last_row['record_id'])
+            
+            is_last_page = len(df) < batch_size
+            yield df
+            del df
+            if is_last_page:
+                return
+
+def _put_page(pages, item, stop):
+    """Put an item on a partition's page queue, waiting for room; False once the consumer has stopped."""
+    while not stop.is_set():
+        try:
+            pages.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+def _fill_partition(partition, pages, stop):
+    """Worker: move a partition's pages onto its queue, then the done marker or the error it failed with."""
+    try:
+        for df in partition:
+            if not _put_page(pages, df, stop):
+                return
+        _put_page(pages, _PARTITION_DONE, stop)
+    except BaseException as e:
+        _put_page(pages, e, stop)
+    finally:
+        partition.close()
+
+def extract_partitioned(last_event_date="2000-01-01T00:00:00", last_record_id=0, partitions=None, workers=None,
+                        end_date=None, batch_size=None):
+    """
+    Extract pending rows as range partitions pulled concurrently on a thread pool.
+    
+    All workers share one pooled engine. Each worker pages its range with a
+    keyset LIMIT loop and hands the pages over through a small queue, so at
+    most `workers` partitions are in flight and each holds no more than
+    PARTITION_PAGES_AHEAD pages plus the one being read: memory stays bounded by
+    the batch size, as with extract_batches. Pages are yielded partition by
+    partition in plan order, so the output is in deterministic (created_at, id) order.
+    
+    Args:
+        last_event_date (str): Timestamp of the last processed record (ISO format)
+        last_record_id (int): ID of the last processed record
+        partitions (int): Number of ranges to plan. Defaults to MYSQL_CONFIG['extract_partitions']
+        workers (int): Concurrent queries. Defaults to MYSQL_CONFIG['extract_workers'],
+                       capped at the engine's pool_size
+        end_date (datetime): Exclusive created_at upper bound. Defaults to CURDATE()
+        batch_size (int): Maximum rows per page. Defaults to MYSQL_CONFIG['extract_batch_size']
+    
+    Yields:
+        pandas.DataFrame: Non-empty batches in (created_at, id) order
+    
+    Raises:
+        Exception: If data extraction fails
+    """
+    mysql_config = DB_CONFIG['MYSQL_CONFIG']
+    partitions = partitions or mysql_config['extract_partitions']
+    workers = min(workers or mysql_config['extract_workers'], mysql_config['pool_size'])
+    batch_size = batch_size or mysql_config['extract_batch_size']
+    
+    pending = deque()
+    stop = threading.Event()
+    total_rows = 0
+    
+    try:
+        engine = get_mysql_engine(mysql_config)
+        with engine.connect() as connection:
+            plan = plan_partitions(connection, last_event_date, last_record_id, partitions, end_date)
+        
+        LOGGER.info("Fetching data from %s in %d partitions with %d workers in batches of %d since ts > '%s' "
+                    "AND id > %s", mysql_config['database'], len(plan), workers, batch_size, last_event_date,
+                    last_record_id)
+        
+        ranges = iter(plan)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='extract') as executor:
+            def submit_next():
+                bounds = next(ranges, None)
+                if bounds is not None:
+                    pages = queue.Queue(maxsize=PARTITION_PAGES_AHEAD)
+                    partition = _extract_partition(engine, *bounds, last_event_date, last_record_id, batch_size,
+                                                   end_date)
+                    executor.submit(_fill_partition, partition, pages, stop)
+                    pending.append(pages)
+            
+            try:
+                for _ in range(workers):
+                    submit_next()
+                
+                while pending:
+                    item = pending[0].get()
+                    if item is _PARTITION_DONE:
+                        pending.popleft()
+                        submit_next()
+                        continue
+                    if isinstance(item, BaseException):
+                        raise item
+                    total_rows += len(item)
+                    LOGGER.debug("Fetched batch of %d rows (%d total).", len(item), total_rows)
+                    yield item
+                    del item
+            finally:
+                # On close or failure: workers stop after their current page, queued partitions never start
+                stop.set()
+                executor.shutdown(wait=True, cancel_futures=True)
+        
+        LOGGER.info("Fetched %d new rows from financial_events table.", total_rows)
+    except Exception as e:
+        LOGGER.error("Error extracting data from MySQL: %s", e)
+        raise
@@ -3,14 +3,26 @@ Data loading module for fin_trade pipeline.
 Handles data loading to SQL Server target database.
 """
 
+import time
+from datetime import datetime
 import sqlalchemy
 import pandas as pd
+from .bulk_loader import STRATEGIES, _qualified_name, bulk_load, ensure_table
+from .schema import FINANCIAL_EVENTS_SCHEMA, RESOLVED_KEY_COLUMNS, LOAD_METADATA_COLUMNS, sql_types
+from .payloads import offload_payloads
+from .spool import new_run_id
+from .checkpoint import get_watermark_table, ensure_watermark_table, read_watermark, advance_watermark
 from ..config import DB_CONFIG
 from ..utils.logger import LOGGER
+from ..utils.engine_registry import get_engine
+from ..utils.metrics import instrument, stage_timer, record_watermark
 
 def get_sql_server_engine(config):
     """
-    Create SQL Server SQLAlchemy engine for database connection.
+    Get the shared SQL Server SQLAlchemy engine for database connection.
+    
+    Engines are cached in the process-wide registry, so the watermark read and
+    every batch load reuse one connection pool.
     
     Args:
         config (dict): Dictionary containing SQL Server connection parameters
@@ -21,7 +33,23 @@ def get_sql_server_engine(config):
     
     Raises:
         sqlalchemy.exc.SQLAlchemyError: If connection creation fails
+    
+    Note:
+        If config['url'] is set (SQL_SERVER_URL), that URL is used as is and the
+        pyodbc specific options are skipped, so a local stand-in database can be
+        used in place of the target.
     """
+    if config.get('url'):
+        return get_engine(
+            config['application_name'],
+            config['url'],
+            pool_size=config['pool_size'],
+            max_overflow=config['max_overflow'],
+            pool_timeout=config['pool_timeout'],
+            pool_recycle=config['pool_recycle'],
+            warmup=config['pool_warmup']
+        )
+    
     conn_str = (
         f"mssql+pyodbc://{config['username']}:{config['password']}"
         f"@{config['server']}:{config['port']}/{config['database']}"
@@ -30,91 +58,514 @@ def get_sql_server_engine(config):
         f"&TrustServerCertificate={config['trust_server_certificate']}"
     )
     
-    return sqlalchemy.create_engine(
+    return get_engine(
+        config['application_name'],
         conn_str,
         pool_size=config['pool_size'],
+        max_overflow=config['max_overflow'],
+        pool_timeout=config['pool_timeout'],
+        pool_recycle=config['pool_recycle'],
+        warmup=config['pool_warmup'],
+        retries=config['retries'],
+        command_timeout=config['command_timeout'],
+        fast_executemany=True,
         connect_args={
             'timeout': config['timeout'],
             'application_name': config['application_name']
         }
     )
 
+# Relation every staged row comes from, recorded in _dbt_source_relation
+SOURCE_RELATION = 'mysql.financial_events'
+
+_RUN_KEY = None
+
+def get_run_key():
+    """
+    Return the run key stamped on every batch this process loads.
+    
+    PIPELINE_CONFIG['run_key'] (EL_RUN_KEY, the Airflow run ID) when set, so the
+    mapped partitions of one DAG run share it; otherwise one key per process.
+    """
+    global _RUN_KEY
+    if _RUN_KEY is None:
+        _RUN_KEY = DB_CONFIG['PIPELINE_CONFIG']['run_key'] or new_run_id()
+    return _RUN_KEY
+
+def stamp_batch(df):
+    """
+    Add the load metadata columns to a batch in place: run_key_ref, _dbt_loaded_at (UTC)
+    and _dbt_source_relation. stg_orders reads the staged slices by them and dbt's
+    on-run-end hook purges the slices a successful build has processed.
+    """
+    df['run_key_ref'] = get_run_key()
+    df['_dbt_loaded_at'] = datetime.utcnow().replace(microsecond=0)
+    df['_dbt_source_relation'] = SOURCE_RELATION
+    return df
+
+def _stage_batch(df, side_tables=None):
+    """
+    Stamp a batch and move its payload columns to the payload store.
+    
+    Returns:
+        tuple: (df, side_tables) with the payload rows added to the side tables
+    """
+    df, payloads = offload_payloads(stamp_batch(df))
+    if payloads is not None:
+        side_tables = dict(side_tables or {})
+        side_tables[DB_CONFIG['PIPELINE_CONFIG']['payload_table']] = payloads
+    return df, side_tables
+
+_STAGING_READY = set()
+
+def _ensure_staging_table(engine, schema):
+    """
+    Create staging_financial_orders with every extract, key and metadata column, once per process.
+    
+    A batch of a narrow projection would otherwise create the table without the
+    columns stg_orders selects; they stay null for rows of such batches.
+    """
+    if schema in _STAGING_READY:
+        return
+    columns = sql_types(list(FINANCIAL_EVENTS_SCHEMA) + RESOLVED_KEY_COLUMNS + LOAD_METADATA_COLUMNS)
+    staging = sqlalchemy.Table(
+        'staging_financial_orders', sqlalchemy.MetaData(),
+        *(sqlalchemy.Column(name, column_type) for name, column_type in columns.items()),
+        schema=schema
+    )
+    with engine.begin() as connection:
+        staging.create(connection, checkfirst=True)
+    _STAGING_READY.add(schema)
+
+def get_watermark():
+    """Return the watermark table definition and pipeline name from configuration."""
+    pipeline_config = DB_CONFIG['PIPELINE_CONFIG']
+    table = get_watermark_table(pipeline_config['watermark_table'], DB_CONFIG['DBT_CONFIG']['target_schema'])
+    return table, pipeline_config['pipeline_name']
+
+def _bootstrap_watermark(engine):
+    """
+    Derive a first watermark from the fact table when no checkpoint exists yet.
+    
+    Takes the greatest (creation_timestamp, record_id) pair as one row so the
+    keyset tuple is consistent. This scan only happens once per pipeline.
+    Returns None when the fact table does not exist yet or is empty.
+    """
+    if not sqlalchemy.inspect(engine).has_table('fact_financial_events'):
+        LOGGER.info("fact_financial_events does not exist yet; nothing to bootstrap from")
+        return None
+    fact = sqlalchemy.table(
+        'fact_financial_events',
+        sqlalchemy.column('creation_timestamp'),
+        sqlalchemy.column('record_id')
+    )
+    query = (
+        sqlalchemy.select(fact.c.creation_timestamp, fact.c.record_id)
+        .order_by(fact.c.creation_timestamp.desc(), fact.c.record_id.desc())
+        .limit(1)
+    )
+    with engine.connect() as connection:
+        row = connection.execute(query).first()
+    return (row[0], row[1]) if row else None
+
+@instrument('watermark_read')
 def get_last_processed_data():
     """
-    Get the last processed record's timestamp and ID from the fact table.
+    Get the last processed record's timestamp and ID from the watermark table.
     
     Returns:
         tuple: (last_timestamp, last_record_id)
                - last_timestamp (str): ISO format timestamp of last processed record
                - last_record_id (int): ID of last processed record
     
+    Raises:
+        Exception: If the checkpoint or the fact table cannot be read. A transient
+                   error must fail the run rather than restart it from the beginning
+    
     Note:
-        Returns default values ("2000-01-01T00:00:00", 0) if no records found
-        or in case of error
+        Falls back to the greatest (creation_timestamp, record_id) in the fact table
+        the first time, before any checkpoint has been committed.
+        Returns default values ("2000-01-01T00:00:00", 0) only when neither the
+        checkpoint nor the fact table has a record
     """
     try:
         config = DB_CONFIG['SQLSERVER_CONFIG']
         engine = get_sql_server_engine(config)
-        query = """
-        SELECT MAX(creation_timestamp) as last_ts, 
-               MAX(record_id) as last_id 
-        FROM fact_financial_events
-        """
+        table, pipeline_name = get_watermark()
+        
+        with engine.begin() as connection:
+            ensure_watermark_table(connection, table)
+            watermark = read_watermark(connection, table, pipeline_name)
         
-        with engine.connect() as connection:
-            result = pd.read_sql(sqlalchemy.text(query), connection)
+        if watermark is None:
+            LOGGER.info("No checkpoint found for %s, bootstrapping from fact_financial_events", pipeline_name)
+            watermark = _bootstrap_watermark(engine)
             
-        last_ts = result['last_ts'].iloc[0]
-        last_id = result['last_id'].iloc[0]
+        last_ts, last_id = watermark if watermark else (None, None)
         
         if pd.isna(last_ts):
             last_ts = "2000-01-01T00:00:00"
         if pd.isna(last_id):
             last_id = 0
             
-        LOGGER.info(f"Last processed record: timestamp = {last_ts}, id = {last_id}")
+        LOGGER.info("Last processed record: timestamp = %s, id = %s", last_ts, last_id)
+        record_watermark(last_ts)
         return last_ts, last_id
         
     except Exception as e:
-        LOGGER.error(f"Error getting last processed data: {e}")
-        return "2000-01-01T00:00:00", 0
+        LOGGER.error("Error getting last processed data: %s", e)
+        raise
 
-def load_to_sql_server(df):
+@instrument('watermark_read')
+def get_last_change():
     """
-    Load DataFrame to SQL Server staging table.
+    Get the change watermark: the (change timestamp, record ID) of the last merged change.
+    
+    Kept in the watermark table under its own pipeline name, independent of the
+    load watermark. Before the first change run it starts at PIPELINE_CONFIG['cdc_start'],
+    or at the load watermark, so only changes made after rows were loaded are read.
+    
+    Returns:
+        tuple: (last_change_ts, last_record_id)
+    """
+    pipeline_config = DB_CONFIG['PIPELINE_CONFIG']
+    engine = get_sql_server_engine(DB_CONFIG['SQLSERVER_CONFIG'])
+    table, _ = get_watermark()
+    with engine.begin() as connection:
+        ensure_watermark_table(connection, table)
+        watermark = read_watermark(connection, table, pipeline_config['cdc_pipeline_name'])
+    
+    if watermark is None:
+        start = pipeline_config['cdc_start'] or get_last_processed_data()[0]
+        LOGGER.info("No change checkpoint found for %s, starting at %s", pipeline_config['cdc_pipeline_name'], start)
+        return start, 0
+    LOGGER.info("Last merged change: timestamp = %s, id = %s", *watermark)
+    return watermark
+
+def _drop_quarantined(connection, quarantined, table, schema):
+    """
+    Drop the quarantine rows whose (record_id, changed_at) version is already quarantined.
+    
+    A change pass reads rows the incremental run quarantined again, unchanged, and
+    would otherwise record the same failure once per pass.
+    """
+    ensure_table(connection, quarantined, table, schema, sql_types(quarantined.columns))
+    lookup = sqlalchemy.text(
+        f"SELECT record_id, changed_at FROM {_qualified_name(connection, table, schema)} WHERE record_id IN :ids"
+    ).bindparams(sqlalchemy.bindparam('ids', expanding=True))
+    ids = [int(record_id) for record_id in quarantined['record_id'].dropna().unique()]
+    existing = [
+        row for offset in range(0, len(ids), 1000)
+        for row in connection.execute(lookup, {'ids': ids[offset:offset + 1000]})
+    ]
+    if not existing:
+        return quarantined
+    seen = pd.MultiIndex.from_frame(pd.DataFrame({
+        'record_id': [int(row.record_id) for row in existing],
+        'changed_at': pd.to_datetime([row.changed_at for row in existing])
+    }))
+    versions = pd.MultiIndex.from_arrays([quarantined['record_id'], pd.to_datetime(quarantined['changed_at'])])
+    return quarantined[~versions.isin(seen)]
+
+def _append_side_tables(connection, side_tables, schema):
+    """Append each non-empty side table DataFrame within the caller's transaction."""
+    quarantine_table = DB_CONFIG['PIPELINE_CONFIG']['quarantine_table']
+    for side_table, side_df in (side_tables or {}).items():
+        if side_table == quarantine_table and not side_df.empty:
+            side_df = _drop_quarantined(connection, side_df, side_table, schema)
+        if not side_df.empty:
+            side_df.to_sql(name=side_table, con=connection, schema=schema,
+                           if_exists='append', index=False, dtype=sql_types(side_df.columns))
+
+@instrument('load', df_arg=0)
+def load_to_sql_server(df, strategy=None, batch_size=None, wait_turn=None, side_tables=None, watermark=None,
+                       before_commit=None):
+    """
+    Load DataFrame to SQL Server staging table and advance the watermark.
+    
+    The watermark is moved to the batch's last (creation_timestamp, record_id)
+    in the same transaction as the rows, so a crash never leaves a batch loaded
+    without its checkpoint or the other way round. The bcp strategy commits its
+    rows in a separate session, so it only gets checkpoint-after-load semantics.
     
     Args:
         df (pandas.DataFrame): Data to be loaded
+        strategy (str): Bulk load strategy (fast_executemany, multirow_insert, bcp).
+                        Defaults to SQLSERVER_CONFIG['load_strategy']
+        batch_size (int): Rows per batch. Defaults to SQLSERVER_CONFIG['load_batch_size']
+        wait_turn (callable): Blocks until every earlier batch has committed; used by
+                              pipelined mode so batches load and checkpoint in batch order.
+                              Called before the load transaction opens: a batch holding
+                              the staging table's locks while it waited would block the
+                              earlier batch it waits for
+        side_tables (dict): Table name -> DataFrame appended in the same transaction,
+                            e.g. dimension codes that could not be resolved
+        watermark (tuple): (creation_timestamp, record_id) to checkpoint instead of the
+                           last row's, when rows past it were left out, e.g. quarantined
+        before_commit (callable): Called with the open connection just before the watermark
+                                  is advanced; e.g. adds the batch's rollups
+    
+    Returns:
+        dict: Load statistics including rows/sec, or None if there was nothing to load
     
     Raises:
         Exception: If data loading fails
     
     Note:
-        - Skips operation if DataFrame is empty
-        - Uses batch loading with chunk size of 1000
+        - Skips operation if DataFrame is empty and no watermark is given; with one,
+          only the side tables and the watermark are written
+        - Uses the bulk load engine in scripts/elt/bulk_loader.py
         - Appends data to existing table
     """
-    if df.empty:
+    if df.empty and watermark is None:
         LOGGER.info("No data to load.")
-        return
+        return None
         
     config = DB_CONFIG['SQLSERVER_CONFIG']
     dbt_config = DB_CONFIG['DBT_CONFIG']
+    strategy = strategy or config['load_strategy']
+    batch_size = batch_size or config['load_batch_size']
+    df, side_tables = _stage_batch(df, side_tables)
     
-    LOGGER.info(f"Loading {len(df)} rows into SQL Server table: {dbt_config['target_schema']}.staging_financial_events")
+    LOGGER.info("Loading %d rows into SQL Server table: %s.staging_financial_orders", len(df), dbt_config['target_schema'])
     engine = get_sql_server_engine(config)
+    _ensure_staging_table(engine, dbt_config['target_schema'])
+    table, pipeline_name = get_watermark()
+    
+    # Batches arrive in (creation_timestamp, record_id) order, so the last row is the new watermark
+    if watermark is None:
+        last_row = df.iloc[-1]
+        watermark = (last_row['creation_timestamp'], last_row['record_id'])
+    last_ts = pd.Timestamp(watermark[0]).to_pydatetime()
+    last_id = int(watermark[1])
+    
+    def record_checkpoint(connection):
+        _append_side_tables(connection, side_tables, dbt_config['target_schema'])
+        if before_commit is not None:
+            before_commit(connection)
+        advance_watermark(connection, table, pipeline_name, last_ts, last_id, len(df))
+    
+    if wait_turn is not None:
+        wait_turn()
+    
+    if df.empty:
+        with engine.begin() as connection:
+            record_checkpoint(connection)
+        record_watermark(last_ts)
+        LOGGER.info("No rows of the batch left to load; watermark at (%s, %s).", last_ts, last_id)
+        return None
     
     try:
-        df.to_sql(
-            name='staging_financial_orders',
-            con=engine,
+        stats = bulk_load(
+            df,
+            engine,
+            table='staging_financial_orders',
             schema=dbt_config['target_schema'],
-            if_exists='append',
-            index=False,
-            chunksize=1000
+            strategy=strategy,
+            batch_size=batch_size,
+            config=config,
+            after_load=record_checkpoint,
+            dtype=sql_types(df.columns)
         )
-        LOGGER.info(f"Successfully loaded data into {dbt_config['target_schema']}.staging_financial_events.")
+        record_watermark(last_ts)
+        LOGGER.info("Successfully loaded data into %s.staging_financial_orders, watermark at (%s, %s).",
+                    dbt_config['target_schema'], last_ts, last_id)
+        return stats
         
     except Exception as e:
-        LOGGER.error(f"Error loading data to SQL Server: {e}")
-        raise 
\ No newline at end of file
+        LOGGER.error("Error loading data to SQL Server: %s", e)
+        raise
+
+def _delete_window(connection, table, schema, start, end):
+    """Delete a table's rows with creation_timestamp in [start, end); a missing table has none."""
+    if not sqlalchemy.inspect(connection).has_table(table, schema=schema):
+        return 0
+    target = sqlalchemy.table(table, sqlalchemy.column('creation_timestamp'), schema=schema)
+    result = connection.execute(
+        target.delete()
+        .where(target.c.creation_timestamp >= start)
+        .where(target.c.creation_timestamp < end)
+    )
+    return result.rowcount
+
+def replace_window(batches, start, end, prepare=None, strategy=None, batch_size=None, side_table_names=(),
+                   before_commit=None):
+    """
+    Replace the staged rows of one [start, end) creation_timestamp window.
+    
+    The window's existing rows are deleted and the new batches inserted in a
+    single transaction, so a window can be reloaded any number of times and
+    readers see either the old slice or the new one, never a mix. Windows that
+    do not overlap can be replaced concurrently. The watermark is left alone.
+    
+    Args:
+        batches (iterable): DataFrame batches of the window
+        start (datetime|str): Inclusive lower creation_timestamp bound
+        end (datetime|str): Exclusive upper creation_timestamp bound
+        prepare (callable): Called with each batch, returns (df, side_tables) as
+                            passed to load_to_sql_server
+        strategy (str): Bulk load strategy. Defaults to SQLSERVER_CONFIG['load_strategy'];
+                        bcp commits in its own session, so it is replaced by fast_executemany
+        batch_size (int): Rows per batch. Defaults to SQLSERVER_CONFIG['load_batch_size']
+        side_table_names (iterable): Side tables whose rows in the window are replaced too
+        before_commit (callable): Called with the open connection after the last batch,
+                                  before the window commits
+    
+    Returns:
+        dict: Window statistics (deleted, rows)
+    
+    Raises:
+        Exception: If data loading fails; nothing of the window is committed
+    """
+    config = DB_CONFIG['SQLSERVER_CONFIG']
+    schema = DB_CONFIG['DBT_CONFIG']['target_schema']
+    strategy = strategy or config['load_strategy']
+    batch_size = batch_size or config['load_batch_size']
+    if strategy == 'bcp':
+        LOGGER.warning("bcp cannot load inside the window's transaction; using fast_executemany")
+        strategy = 'fast_executemany'
+    
+    engine = get_sql_server_engine(config)
+    _ensure_staging_table(engine, schema)
+    deleted, rows = 0, 0
+    try:
+        with engine.begin() as connection:
+            for table in ('staging_financial_orders', DB_CONFIG['PIPELINE_CONFIG']['payload_table'], *side_table_names):
+                deleted += _delete_window(connection, table, schema, start, end)
+            
+            for df in batches:
+                side_tables = None
+                if prepare is not None:
+                    df, side_tables = prepare(df)
+                df, side_tables = _stage_batch(df, side_tables)
+                with stage_timer('load') as record:
+                    record['df'] = df
+                    if not df.empty:
+                        bulk_load(df, engine, table='staging_financial_orders', schema=schema, strategy=strategy,
+                                  batch_size=batch_size, config=config, dtype=sql_types(df.columns),
+                                  connection=connection)
+                    _append_side_tables(connection, side_tables, schema)
+                rows += len(df)
+            if before_commit is not None:
+                before_commit(connection)
+        
+        LOGGER.info("Replaced window [%s, %s) of %s.staging_financial_orders: %d rows deleted, %d loaded",
+                    start, end, schema, deleted, rows)
+        return {'deleted': deleted, 'rows': rows}
+    
+    except Exception as e:
+        LOGGER.error("Error replacing window [%s, %s): %s", start, end, e)
+        raise
+
+def _merge_sql(connection, target, source, columns):
+    """
+    Build the statement(s) that upsert the source rows into the target by record_id.
+    
+    SQL Server gets a single MERGE; other dialects (the SQLite stand-in) an
+    UPDATE ... FROM followed by an INSERT of the rows that did not match.
+    """
+    quote = connection.dialect.identifier_preparer.quote
+    names = [quote(column) for column in columns]
+    updates = ', '.join(f"{name} = s.{name}" for name in names if name != quote('record_id'))
+    column_list = ', '.join(names)
+    source_list = ', '.join(f"s.{name}" for name in names)
+    if connection.dialect.name == 'mssql':
+        return [
+            f"MERGE {target} WITH (HOLDLOCK) AS t USING {source} AS s ON t.record_id = s.record_id "
+            f"WHEN MATCHED THEN UPDATE SET {updates} "
+            f"WHEN NOT MATCHED BY TARGET THEN INSERT ({column_list}) VALUES ({source_list});"
+        ]
+    return [
+        f"UPDATE {target} AS t SET {updates} FROM {source} AS s WHERE t.record_id = s.record_id",
+        f"INSERT INTO {target} ({column_list}) SELECT {source_list} FROM {source} AS s "
+        f"WHERE NOT EXISTS (SELECT 1 FROM {target} AS t WHERE t.record_id = s.record_id)"
+    ]
+
+def _create_change_table(connection, target, columns):
+    """
+    Create an empty session temp table with the target's types for the given columns.
+    
+    Returns:
+        tuple: (table, schema) as the bulk load strategies take them
+    """
+    quote = connection.dialect.identifier_preparer.quote
+    column_list = ', '.join(quote(column) for column in columns)
+    if connection.dialect.name == 'mssql':
+        connection.exec_driver_sql(f"SELECT TOP 0 {column_list} INTO #financial_orders_changes FROM {target}")
+        return '#financial_orders_changes', None
+    connection.exec_driver_sql(f"CREATE TEMP TABLE financial_orders_changes AS SELECT {column_list} FROM {target} LIMIT 0")
+    return 'financial_orders_changes', 'temp'
+
+@instrument('merge', df_arg=0)
+def merge_changes(df, last_change, strategy=None, batch_size=None, side_tables=None, before_commit=None):
+    """
+    Upsert a batch of changed rows into the staging table and advance the change watermark.
+    
+    The batch is bulk loaded into a session temp table and merged into
+    staging_financial_orders by record_id in one set-based statement, so a
+    correction costs in proportion to the changed rows, not the table. Rows that
+    are no longer staged are inserted again. Temp table, merge, side tables and
+    watermark share one transaction.
+    
+    Args:
+        df (pandas.DataFrame): Changed rows, in change timestamp order
+        last_change (tuple): (change timestamp, record ID) of the batch's last row
+        strategy (str): Bulk load strategy for the temp table. Defaults to
+                        SQLSERVER_CONFIG['load_strategy']; bcp cannot reach a session
+                        temp table, so it is replaced by fast_executemany
+        batch_size (int): Rows per batch. Defaults to SQLSERVER_CONFIG['load_batch_size']
+        side_tables (dict): Table name -> DataFrame appended in the same transaction
+        before_commit (callable): Called with the open connection before the change
+                                  watermark is advanced
+    
+    Returns:
+        dict: Merge statistics (rows, seconds), or None if there was nothing to merge
+    
+    Raises:
+        Exception: If the merge fails; nothing of the batch is committed
+    
+    Note:
+        An empty batch with side tables, e.g. one whose rows were all quarantined,
+        only writes the side tables and moves the change watermark past it.
+    """
+    if df.empty and not side_tables:
+        return None
+    
+    config = DB_CONFIG['SQLSERVER_CONFIG']
+    schema = DB_CONFIG['DBT_CONFIG']['target_schema']
+    pipeline_config = DB_CONFIG['PIPELINE_CONFIG']
+    strategy = strategy or config['load_strategy']
+    batch_size = batch_size or config['load_batch_size']
+    if strategy == 'bcp':
+        strategy = 'fast_executemany'
+    
+    engine = get_sql_server_engine(config)
+    table, _ = get_watermark()
+    last_ts, last_id = last_change
+    df, side_tables = _stage_batch(df, side_tables)
+    _ensure_staging_table(engine, schema)
+    started = time.perf_counter()
+    try:
+        with engine.begin() as connection:
+            if not df.empty:
+                ensure_table(connection, df, 'staging_financial_orders', schema, sql_types(df.columns))
+                target = _qualified_name(connection, 'staging_financial_orders', schema)
+                changes, changes_schema = _create_change_table(connection, target, df.columns)
+                source = _qualified_name(connection, changes, changes_schema)
+                STRATEGIES[strategy](connection, df, changes, changes_schema, batch_size, config)
+                for statement in _merge_sql(connection, target, source, df.columns):
+                    connection.exec_driver_sql(statement)
+                connection.exec_driver_sql(f"DROP TABLE {source}")
+            _append_side_tables(connection, side_tables, schema)
+            if before_commit is not None:
+                before_commit(connection)
+            advance_watermark(connection, table, pipeline_config['cdc_pipeline_name'], last_ts, last_id, len(df))
+        
+        seconds = time.perf_counter() - started
+        LOGGER.info("Merged %d changed rows into %s.staging_financial_orders in %.2fs, change watermark at (%s, %s).",
+                    len(df), schema, seconds, last_ts, last_id)
+        return {'rows': len(df), 'seconds': round(seconds, 3)}
+    
+    except Exception as e:
+        LOGGER.error("Error merging changes into SQL Server: %s", e)
+        raise
@@ -0,0 +1,99 @@
+"""
+Payload store module for fin_trade pipeline.
+Moves bulky free-text columns out of the staged rows into a compressed side table read on demand.
+
+Payloads are stored gzip-compressed as UTF-16LE, the encoding SQL Server's
+DECOMPRESS() returns for nvarchar, so they can be read in SQL as well:
+cast(decompress(provider_response_gz) as nvarchar(max)).
+"""
+
+import gzip
+import pandas as pd
+import sqlalchemy
+from ..config import DB_CONFIG
+from ..utils.logger import LOGGER
+
+# Extract columns offloaded to the payload store instead of staging_financial_orders
+PAYLOAD_COLUMNS = ['provider_response']
+
+# gzip level: 6 is zlib's default trade-off between CPU and size
+COMPRESS_LEVEL = 6
+
+# Record IDs per lookup query, below SQL Server's 2100 parameter limit
+LOOKUP_CHUNK = 1000
+
+def compress_text(value):
+    """Compress one payload; None for a missing value."""
+    if value is None or pd.isna(value):
+        return None
+    return gzip.compress(str(value).encode('utf-16-le'), compresslevel=COMPRESS_LEVEL)
+
+def decompress_text(value):
+    """Reverse compress_text."""
+    if value is None:
+        return None
+    return gzip.decompress(bytes(value)).decode('utf-16-le')
+
+def offload_payloads(df):
+    """
+    Split the payload columns off a stamped batch.
+
+    Args:
+        df (pandas.DataFrame): Batch after load.stamp_batch
+
+    Returns:
+        tuple: (df without the payload columns, payload DataFrame with record_id,
+               creation_timestamp, _dbt_loaded_at and one <column>_gz per payload
+               column, or None when the batch has no payload columns or values)
+    """
+    present = [column for column in PAYLOAD_COLUMNS if column in df.columns]
+    if not present:
+        return df, None
+
+    payloads = df[['record_id', 'creation_timestamp', '_dbt_loaded_at']].copy()
+    for column in present:
+        payloads[f"{column}_gz"] = [compress_text(value) for value in df[column].astype(object)]
+    compressed = [f"{column}_gz" for column in present]
+    payloads = payloads[payloads[compressed].notna().any(axis=1)]
+    return df.drop(columns=present), (payloads if not payloads.empty else None)
+
+def fetch_payloads(engine, record_ids, column='provider_response'):
+    """
+    Read payloads back from the store, only for the records asked for.
+
+    Args:
+        engine (sqlalchemy.engine.Engine): Target database engine
+        record_ids (iterable): Record IDs to look up
+        column (str): One of PAYLOAD_COLUMNS
+
+    Returns:
+        pandas.Series: Decompressed text by record_id; the latest load wins when a
+                       record was staged more than once
+    """
+    pipeline_config = DB_CONFIG['PIPELINE_CONFIG']
+    store = sqlalchemy.table(
+        pipeline_config['payload_table'],
+        sqlalchemy.column('record_id'),
+        sqlalchemy.column('_dbt_loaded_at'),
+        sqlalchemy.column(f"{column}_gz"),
+        schema=DB_CONFIG['DBT_CONFIG']['target_schema']
+    )
+    record_ids = list(dict.fromkeys(int(record_id) for record_id in record_ids))
+    frames = []
+    with engine.connect() as connection:
+        for start in range(0, len(record_ids), LOOKUP_CHUNK):
+            chunk = record_ids[start:start + LOOKUP_CHUNK]
+            query = (
+                sqlalchemy.select(store.c.record_id, store.c._dbt_loaded_at, store.c[f"{column}_gz"])
+                .where(store.c.record_id.in_(chunk))
+            )
+            frames.append(pd.DataFrame(connection.execute(query).fetchall(),
+                                       columns=['record_id', '_dbt_loaded_at', 'payload']))
+    if not frames:
+        return pd.Series(dtype=object, name=column)
+
+    found = pd.concat(frames, ignore_index=True).sort_values('_dbt_loaded_at')
+    found = found.drop_duplicates('record_id', keep='last')
+    LOGGER.debug("Fetched %d of %d %s payloads", len(found), len(record_ids), column)
+    return pd.Series([decompress_text(value) for value in found['payload']],
+                     index=found['record_id'].to_numpy(), name=column)
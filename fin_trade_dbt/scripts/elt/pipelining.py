@@ -0,0 +1,177 @@
+"""
+Pipelined execution module for fin_trade pipeline.
+Overlaps extraction and loading with a bounded producer-consumer queue.
+"""
+
+import queue
+import threading
+import time
+from ..utils.logger import LOGGER
+
+# Marks the end of the stream for a loader worker
+_SENTINEL = object()
+
+class PipelineCancelled(Exception):
+    """Raised in a loader waiting for its commit turn after the run has been stopped."""
+
+def run_pipelined(batches, load_fn, queue_size=4, workers=1, ordered_commits=False, active_limit=None):
+    """
+    Drain an iterator of batches into load_fn while the iterator keeps producing.
+
+    The calling thread pulls batches from the extractor and puts them on a
+    bounded queue; `workers` loader threads take batches off the queue and load
+    them. A full queue blocks the extractor, so at most queue_size + workers
+    batches are held in memory at once.
+
+    The first failure on either side stops the run: the extractor stops
+    producing (and a generator extractor is closed so it can release its
+    cursor), loaders discard queued batches, and the exception is re-raised in
+    the calling thread once every worker has exited. KeyboardInterrupt is
+    handled the same way.
+
+    With ordered_commits, load_fn is called as load_fn(batch, wait_turn).
+    Loaders prepare their batches concurrently, but wait_turn() blocks until
+    every earlier batch has finished, so whatever the loader does after it
+    happens in batch order. A loader must not hold database locks while it
+    waits (see load.load_to_sql_server): the earlier batch could block on them.
+
+    With active_limit, `workers` threads are started but only active_limit()
+    of them load at once; the limit is read again for every batch, so an
+    autotuner can change it during the run. Batches are admitted in order, so
+    a batch waiting for its commit turn never holds the slot an earlier one needs.
+
+    Args:
+        batches (iterable): Iterable of pandas.DataFrame batches
+        load_fn (callable): Called with each batch from a loader thread
+        queue_size (int): Maximum number of batches waiting to be loaded
+        workers (int): Number of loader threads
+        ordered_commits (bool): Pass a wait_turn callable to load_fn
+        active_limit (callable): Returns the number of loaders allowed to load at once
+
+    Returns:
+        int: Total number of rows loaded
+
+    Raises:
+        Exception: The first exception raised by the extractor or a loader
+    """
+    work = queue.Queue(maxsize=max(queue_size, 1))
+    stop = threading.Event()
+    lock = threading.Lock()
+    errors = []
+    totals = {'rows': 0, 'load_seconds': 0.0, 'extract_seconds': 0.0}
+    turn = threading.Condition()
+    next_turn = [0]
+
+    def fail(exc):
+        with lock:
+            if not errors:
+                errors.append(exc)
+        stop.set()
+        with turn:
+            turn.notify_all()
+
+    def wait_turn(seq):
+        with turn:
+            while next_turn[0] != seq:
+                if stop.is_set():
+                    raise PipelineCancelled("Pipeline stopped before this batch's turn to commit")
+                turn.wait(timeout=0.5)
+
+    def finish_turn(seq):
+        with turn:
+            next_turn[0] = seq + 1
+            turn.notify_all()
+
+    gate = threading.Condition()
+    admission = {'next': 0, 'active': 0}
+
+    def admit(seq):
+        with gate:
+            while admission['next'] != seq or admission['active'] >= max(active_limit(), 1):
+                if stop.is_set():
+                    raise PipelineCancelled("Pipeline stopped before this batch was admitted")
+                gate.wait(timeout=0.5)
+            admission['next'] += 1
+            admission['active'] += 1
+
+    def leave():
+        with gate:
+            admission['active'] -= 1
+            gate.notify_all()
+
+    def loader():
+        while True:
+            item = work.get()
+            try:
+                if item is _SENTINEL:
+                    return
+                if stop.is_set():
+                    # Keep draining so a blocked producer can make progress
+                    continue
+                seq, batch = item
+                if active_limit is not None:
+                    admit(seq)
+                started = time.perf_counter()
+                try:
+                    if ordered_commits:
+                        load_fn(batch, lambda: wait_turn(seq))
+                        finish_turn(seq)
+                    else:
+                        load_fn(batch)
+                finally:
+                    if active_limit is not None:
+                        leave()
+                with lock:
+                    totals['rows'] += len(batch)
+                    totals['load_seconds'] += time.perf_counter() - started
+            except BaseException as e:
+                fail(e)
+            finally:
+                work.task_done()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                work.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    threads = [
+        threading.Thread(target=loader, name=f"el-loader-{i}", daemon=True)
+        for i in range(max(workers, 1))
+    ]
+    for thread in threads:
+        thread.start()
+
+    started = time.perf_counter()
+    iterator = iter(batches)
+    seq = 0
+    try:
+        while not stop.is_set():
+            extract_started = time.perf_counter()
+            batch = next(iterator, _SENTINEL)
+            totals['extract_seconds'] += time.perf_counter() - extract_started
+            if batch is _SENTINEL or not put((seq, batch)):
+                break
+            seq += 1
+    except BaseException as e:
+        fail(e)
+    finally:
+        if stop.is_set() and hasattr(iterator, 'close'):
+            iterator.close()
+        for _ in threads:
+            work.put(_SENTINEL)
+        for thread in threads:
+            thread.join()
+
+    if errors:
+        # errors[0] is the root cause; PipelineCancelled only follows an earlier failure
+        LOGGER.error("Pipelined EL stopped: %s", errors[0])
+        raise errors[0]
+
+    LOGGER.info("Pipelined EL loaded %d rows in %.2fs (extract %.2fs, load %.2fs across %d loader(s))",
+                totals['rows'], time.perf_counter() - started, totals['extract_seconds'],
+                totals['load_seconds'], len(threads))
+    return totals['rows']
@@ -0,0 +1,609 @@
+"""
+Rollup module for fin_trade pipeline.
+Maintains daily aggregates of the staged orders as batches load, so the daily reports read compact rollups instead of rescanning fct.orders.
+
+Two tables in the target schema, keyed by the source's natural codes since a
+batch's dimension keys may not exist yet when it is loaded:
+
+    rollup_account_daily  per day, user_identifier, base_currency, order_direction and
+                          status_code: order count, amount and fee sums, first and last
+                          creation time
+    rollup_product_daily  per day, base_currency and status_code: order counts, amount
+                          and fee sums, in total and by direction, and a HyperLogLog
+                          sketch of the accounts that traded with its estimate
+
+Sums and counts merge by addition and sketches by taking the larger register,
+so an incremental batch adds its aggregates in the transaction that advances
+its watermark and is counted exactly once, however often a run is retried.
+Window reloads and change capture replace rows that were already counted, so
+the days they touch are recomputed instead: a window of whole days rebuilds its
+days from its own batches; other reloads mark their days in rollup_dirty_days,
+which settle_dirty_days recomputes from the source before dbt runs. reconcile
+compares the tables with a full recompute of a date range and can repair the
+days that differ.
+
+Usage:
+    $ python -m scripts.elt.rollups --settle
+    $ python -m scripts.elt.rollups --rebuild --start 2024-01-01 --end 2024-04-01
+    $ python -m scripts.elt.rollups --reconcile --start 2024-03-01 --end 2024-04-01 [--repair]
+"""
+
+import zlib
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+import sqlalchemy
+from sqlalchemy.dialects import mssql
+from .bulk_loader import STRATEGIES, _qualified_name
+from .extract import extract_batches
+from .load import get_last_processed_data, get_sql_server_engine
+from .schema import SQL_TYPES
+from .validation import validate_batch
+from .windows import parse_bound
+from ..config import DB_CONFIG
+from ..utils.logger import LOGGER
+
+ACCOUNT_KEY = ['activity_date', 'user_identifier', 'base_currency', 'order_direction', 'status_code']
+PRODUCT_KEY = ['activity_date', 'base_currency', 'status_code']
+
+# Summed when rows of the same key are merged
+ACCOUNT_SUMS = ['order_count', 'base_amount_sum', 'amount_count', 'fee_amount_sum']
+PRODUCT_SUMS = ['order_count', 'buy_count', 'sell_count', 'base_amount_sum', 'amount_count', 'buy_amount_sum',
+                'sell_amount_sum', 'fee_amount_sum']
+
+# HyperLogLog precision: 2**12 registers, about 1.6% standard error on the distinct count.
+# Fixed, since only sketches of the same precision merge
+HLL_PRECISION = 12
+HLL_REGISTERS = 1 << HLL_PRECISION
+
+# Key of pandas' SipHash, fixed so an account hashes the same in every process and run
+HASH_KEY = '0123456789123456'
+
+_METADATA = sqlalchemy.MetaData()
+_TABLES_READY = set()
+
+def _tables(schema):
+    """Return the Core definitions of the rollup and dirty-day tables: (account, product, dirty)."""
+    pipeline_config = DB_CONFIG['PIPELINE_CONFIG']
+    names = (pipeline_config['rollup_account_table'], pipeline_config['rollup_product_table'],
+             pipeline_config['rollup_dirty_table'])
+    keys = [f"{schema}.{name}" if schema else name for name in names]
+    if all(key in _METADATA.tables for key in keys):
+        return tuple(_METADATA.tables[key] for key in keys)
+
+    def code(column):
+        return sqlalchemy.Column(column, SQL_TYPES[column], primary_key=True)
+
+    def count(column):
+        return sqlalchemy.Column(column, sqlalchemy.BigInteger, nullable=False)
+
+    def amount(column):
+        return sqlalchemy.Column(column, SQL_TYPES['base_amount'], nullable=False)
+
+    account = sqlalchemy.Table(
+        names[0], _METADATA,
+        sqlalchemy.Column('activity_date', sqlalchemy.Date(), primary_key=True),
+        code('user_identifier'), code('base_currency'), code('order_direction'), code('status_code'),
+        count('order_count'), amount('base_amount_sum'), count('amount_count'), amount('fee_amount_sum'),
+        sqlalchemy.Column('first_created_at', SQL_TYPES['creation_timestamp'], nullable=False),
+        sqlalchemy.Column('last_created_at', SQL_TYPES['creation_timestamp'], nullable=False),
+        schema=schema
+    )
+    product = sqlalchemy.Table(
+        names[1], _METADATA,
+        sqlalchemy.Column('activity_date', sqlalchemy.Date(), primary_key=True),
+        code('base_currency'), code('status_code'),
+        count('order_count'), count('buy_count'), count('sell_count'),
+        amount('base_amount_sum'), count('amount_count'), amount('buy_amount_sum'), amount('sell_amount_sum'),
+        amount('fee_amount_sum'),
+        sqlalchemy.Column('account_sketch', sqlalchemy.LargeBinary().with_variant(mssql.VARBINARY('max'), 'mssql'),
+                          nullable=False),
+        count('active_accounts'),
+        schema=schema
+    )
+    dirty = sqlalchemy.Table(
+        names[2], _METADATA,
+        sqlalchemy.Column('activity_date', sqlalchemy.Date(), primary_key=True),
+        sqlalchemy.Column('marked_at', SQL_TYPES['creation_timestamp'], nullable=False),
+        schema=schema
+    )
+    return account, product, dirty
+
+def _ensure_tables(connection, schema):
+    """Create the rollup tables once per process."""
+    tables = _tables(schema)
+    if schema not in _TABLES_READY:
+        for table in tables:
+            table.create(connection, checkfirst=True)
+        _TABLES_READY.add(schema)
+    return tables
+
+# HyperLogLog sketches of user_identifier values, one row of registers per group
+
+def _sketch_registers(groups, group_count, values):
+    """
+    Build the registers of one sketch per group.
+
+    Args:
+        groups (numpy.ndarray): Group number of each value
+        group_count (int): Number of groups
+        values (pandas.Series): Values to count, as strings
+
+    Returns:
+        numpy.ndarray: uint8 registers, one row per group
+    """
+    hashes = pd.util.hash_pandas_object(values, index=False, hash_key=HASH_KEY).to_numpy()
+    register = (hashes >> np.uint64(64 - HLL_PRECISION)).astype(np.intp)
+    # The remaining 52 bits are exact as float64, so frexp's exponent is their bit length
+    remainder = (hashes & np.uint64((1 << (64 - HLL_PRECISION)) - 1)).astype(np.float64)
+    rank = (64 - HLL_PRECISION + 1 - np.frexp(remainder)[1]).astype(np.uint8)
+    registers = np.zeros((group_count, HLL_REGISTERS), dtype=np.uint8)
+    np.maximum.at(registers, (groups, register), rank)
+    return registers
+
+def estimate_distinct(registers):
+    """Estimate the distinct count of each row of registers, with the linear counting correction for small counts."""
+    registers = np.atleast_2d(registers)
+    alpha = 0.7213 / (1 + 1.079 / HLL_REGISTERS)
+    raw = alpha * HLL_REGISTERS ** 2 / np.power(2.0, -registers.astype(np.float64)).sum(axis=1)
+    zeros = (registers == 0).sum(axis=1)
+    linear = HLL_REGISTERS * np.log(HLL_REGISTERS / np.maximum(zeros, 1))
+    return np.rint(np.where((raw <= 2.5 * HLL_REGISTERS) & (zeros > 0), linear, raw)).astype(np.int64)
+
+def pack_sketch(registers):
+    """Serialize one row of registers; zlib keeps the sketches of small counts, mostly zeros, small."""
+    return zlib.compress(registers.tobytes())
+
+def unpack_sketch(value):
+    """Reverse pack_sketch."""
+    return np.frombuffer(zlib.decompress(bytes(value)), dtype=np.uint8)
+
+# Rollup rows of a batch, and merging them
+
+class Rollup:
+    """Rollup rows of one or more batches: account and product frames keyed by ACCOUNT_KEY and PRODUCT_KEY."""
+
+    def __init__(self, accounts, products):
+        self.accounts = accounts
+        self.products = products
+
+    @property
+    def empty(self):
+        return self.accounts.empty and self.products.empty
+
+    def dates(self):
+        """Return the activity dates the rollup has rows for."""
+        return sorted(set(self.accounts['activity_date']) | set(self.products['activity_date']))
+
+    def restrict(self, dates):
+        """Return the rollup's rows of the given dates."""
+        dates = set(dates)
+        return Rollup(self.accounts[self.accounts['activity_date'].isin(dates)],
+                      self.products[self.products['activity_date'].isin(dates)])
+
+def _codes(series):
+    """Codes as plain strings; missing codes become '' since they are part of the primary key."""
+    return series.astype(object).where(series.notna(), '').astype(str)
+
+def _empty_accounts():
+    return pd.DataFrame(columns=ACCOUNT_KEY + ACCOUNT_SUMS + ['first_created_at', 'last_created_at'])
+
+def _empty_products():
+    return pd.DataFrame(columns=PRODUCT_KEY + PRODUCT_SUMS + ['account_sketch', 'active_accounts'])
+
+def aggregate_batch(df):
+    """
+    Aggregate a batch of staged rows into rollup rows.
+
+    Rows without a creation_timestamp have no day and are left out.
+
+    Args:
+        df (pandas.DataFrame): Batch as loaded
+
+    Returns:
+        Rollup: The batch's account and product rows
+    """
+    df = df[df['creation_timestamp'].notna()]
+    if df.empty:
+        return Rollup(_empty_accounts(), _empty_products())
+
+    rows = pd.DataFrame({
+        'activity_date': pd.to_datetime(df['creation_timestamp']).dt.normalize(),
+        **{column: _codes(df[column]) for column in ACCOUNT_KEY[1:]},
+        'base_amount': df['base_amount'],
+        'fee_amount': df['fee_amount'],
+        'creation_timestamp': pd.to_datetime(df['creation_timestamp'])
+    })
+    accounts = rows.groupby(ACCOUNT_KEY, sort=False).agg(
+        order_count=('creation_timestamp', 'size'),
+        base_amount_sum=('base_amount', 'sum'),
+        amount_count=('base_amount', 'count'),
+        fee_amount_sum=('fee_amount', 'sum'),
+        first_created_at=('creation_timestamp', 'min'),
+        last_created_at=('creation_timestamp', 'max')
+    ).reset_index()
+    accounts['activity_date'] = accounts['activity_date'].dt.date
+    for column in ('order_count', 'amount_count'):
+        accounts[column] = accounts[column].astype('int64')
+    return Rollup(accounts, _products_from_accounts(accounts))
+
+def _products_from_accounts(accounts):
+    """Derive the product rows, sketches included, from account rows."""
+    if accounts.empty:
+        return _empty_products()
+    direction = accounts['order_direction']
+    rows = accounts.assign(
+        buy_count=accounts['order_count'].where(direction == 'BUY', 0),
+        sell_count=accounts['order_count'].where(direction == 'SELL', 0),
+        buy_amount_sum=accounts['base_amount_sum'].where(direction == 'BUY', 0),
+        sell_amount_sum=accounts['base_amount_sum'].where(direction == 'SELL', 0)
+    )
+    grouped = rows.groupby(PRODUCT_KEY, sort=False)
+    products = grouped[PRODUCT_SUMS].sum().reset_index()
+    registers = _sketch_registers(grouped.ngroup().to_numpy(), grouped.ngroups, accounts['user_identifier'])
+    return _with_sketches(products, registers)
+
+def _with_sketches(products, registers):
+    products['account_sketch'] = [pack_sketch(row) for row in registers]
+    products['active_accounts'] = estimate_distinct(registers)
+    return products
+
+def combine(rollups):
+    """Merge rollups into one, adding up the rows of the same key."""
+    rollups = [rollup for rollup in rollups if not rollup.empty]
+    if not rollups:
+        return Rollup(_empty_accounts(), _empty_products())
+    if len(rollups) == 1:
+        return rollups[0]
+    return Rollup(_combine_accounts([rollup.accounts for rollup in rollups]),
+                  _combine_products([rollup.products for rollup in rollups]))
+
+def _combine_accounts(frames):
+    rows = pd.concat([frame for frame in frames if not frame.empty], ignore_index=True)
+    return rows.groupby(ACCOUNT_KEY, sort=False).agg(
+        **{column: (column, 'sum') for column in ACCOUNT_SUMS},
+        first_created_at=('first_created_at', 'min'),
+        last_created_at=('last_created_at', 'max')
+    ).reset_index()
+
+def _combine_products(frames):
+    rows = pd.concat([frame for frame in frames if not frame.empty], ignore_index=True)
+    if rows.empty:
+        return _empty_products()
+    grouped = rows.groupby(PRODUCT_KEY, sort=False)
+    products = grouped[PRODUCT_SUMS].sum().reset_index()
+    registers = np.zeros((grouped.ngroups, HLL_REGISTERS), dtype=np.uint8)
+    np.maximum.at(registers, grouped.ngroup().to_numpy(),
+                  np.stack([unpack_sketch(value) for value in rows['account_sketch']]))
+    return _with_sketches(products, registers)
+
+# Writing rollups, within the caller's transaction
+
+def _insert(connection, df, table, name=None, schema=None):
+    """Insert rows into a rollup table, or into a temp table `name` with its columns."""
+    if df.empty:
+        return
+    config = DB_CONFIG['SQLSERVER_CONFIG']
+    STRATEGIES['fast_executemany'](connection, df[[column.name for column in table.columns]], name or table.name,
+                                   schema if name else table.schema, config['load_batch_size'], config)
+
+def _add_sql(connection, target, source):
+    """
+    Build the statement(s) adding the source's account rows to the target's.
+
+    SQL Server gets a single MERGE; other dialects (the SQLite stand-in) an
+    UPDATE ... FROM followed by an INSERT of the rows that did not match.
+    """
+    quote = connection.dialect.identifier_preparer.quote
+    match = ' AND '.join(f"t.{quote(column)} = s.{quote(column)}" for column in ACCOUNT_KEY)
+    updates = ', '.join(
+        [f"{quote(column)} = t.{quote(column)} + s.{quote(column)}" for column in ACCOUNT_SUMS] +
+        ["first_created_at = CASE WHEN s.first_created_at < t.first_created_at "
+         "THEN s.first_created_at ELSE t.first_created_at END",
+         "last_created_at = CASE WHEN s.last_created_at > t.last_created_at "
+         "THEN s.last_created_at ELSE t.last_created_at END"]
+    )
+    columns = ACCOUNT_KEY + ACCOUNT_SUMS + ['first_created_at', 'last_created_at']
+    column_list = ', '.join(quote(column) for column in columns)
+    source_list = ', '.join(f"s.{quote(column)}" for column in columns)
+    if connection.dialect.name == 'mssql':
+        return [
+            f"MERGE {target} WITH (HOLDLOCK) AS t USING {source} AS s ON {match} "
+            f"WHEN MATCHED THEN UPDATE SET {updates} "
+            f"WHEN NOT MATCHED BY TARGET THEN INSERT ({column_list}) VALUES ({source_list});"
+        ]
+    return [
+        f"UPDATE {target} AS t SET {updates} FROM {source} AS s WHERE {match}",
+        f"INSERT INTO {target} ({column_list}) SELECT {source_list} FROM {source} AS s "
+        f"WHERE NOT EXISTS (SELECT 1 FROM {target} AS t WHERE {match})"
+    ]
+
+def _add_accounts(connection, table, accounts):
+    """Add account rows to the table with one set-based merge through a session temp table."""
+    if accounts.empty:
+        return
+    target = _qualified_name(connection, table.name, table.schema)
+    columns = ', '.join(connection.dialect.identifier_preparer.quote(column.name) for column in table.columns)
+    if connection.dialect.name == 'mssql':
+        connection.exec_driver_sql(f"SELECT TOP 0 {columns} INTO #rollup_account_delta FROM {target}")
+        delta, delta_schema = '#rollup_account_delta', None
+    else:
+        connection.exec_driver_sql(f"CREATE TEMP TABLE rollup_account_delta AS SELECT {columns} FROM {target} LIMIT 0")
+        delta, delta_schema = 'rollup_account_delta', 'temp'
+    _insert(connection, accounts, table, delta, delta_schema)
+    source = _qualified_name(connection, delta, delta_schema)
+    for statement in _add_sql(connection, target, source):
+        connection.exec_driver_sql(statement)
+    connection.exec_driver_sql(f"DROP TABLE {source}")
+
+def _read_rows(connection, table, dates=None, start=None, end=None):
+    """Read a rollup table's rows of the given dates, or of [start, end)."""
+    query = sqlalchemy.select(table)
+    if dates is not None:
+        query = query.where(table.c.activity_date.in_(list(dates)))
+    if start is not None:
+        query = query.where(table.c.activity_date >= start).where(table.c.activity_date < end)
+    return pd.DataFrame(connection.execute(query).fetchall(), columns=[column.name for column in table.columns])
+
+def _add_products(connection, table, products):
+    """
+    Merge product rows into the table: the days' stored rows are read, merged with the
+    new ones in Python, where sketches can be merged, and written back. A day has one
+    row per currency and status, so this costs next to nothing.
+    """
+    if products.empty:
+        return
+    dates = sorted(set(products['activity_date']))
+    merged = _combine_products([_read_rows(connection, table, dates=dates), products])
+    connection.execute(table.delete().where(table.c.activity_date.in_(dates)))
+    _insert(connection, merged, table)
+
+def apply_rollup(connection, rollup, schema=None):
+    """
+    Add a batch's rollup rows to the rollup tables within the caller's transaction.
+
+    Args:
+        connection (sqlalchemy.engine.Connection): Connection holding the batch's transaction
+        rollup (Rollup): Output of aggregate_batch
+        schema (str): Target schema. Defaults to DBT_CONFIG['target_schema']
+    """
+    schema = schema or DB_CONFIG['DBT_CONFIG']['target_schema']
+    account, product, _ = _ensure_tables(connection, schema)
+    _add_accounts(connection, account, rollup.accounts)
+    _add_products(connection, product, rollup.products)
+
+def replace_days(connection, rollup, start, end, schema=None):
+    """
+    Replace the rollup rows of the days in [start, end) with the rollup's rows, within
+    the caller's transaction, and clear those days' dirty marks.
+
+    Args:
+        rollup (Rollup): Rows of every order of those days, e.g. of a whole-day window
+        start (date): First day replaced
+        end (date): Day after the last day replaced
+    """
+    schema = schema or DB_CONFIG['DBT_CONFIG']['target_schema']
+    tables = _ensure_tables(connection, schema)
+    for table in tables:
+        connection.execute(
+            table.delete().where(table.c.activity_date >= start).where(table.c.activity_date < end)
+        )
+    _insert(connection, rollup.accounts, tables[0])
+    _insert(connection, rollup.products, tables[1])
+
+def mark_dirty(connection, dates, schema=None):
+    """Mark days whose rollups no longer match their staged rows, within the caller's transaction."""
+    schema = schema or DB_CONFIG['DBT_CONFIG']['target_schema']
+    dirty = _ensure_tables(connection, schema)[2]
+    dates = sorted(set(dates))
+    if not dates:
+        return
+    marked = set(connection.execute(
+        sqlalchemy.select(dirty.c.activity_date).where(dirty.c.activity_date.in_(dates))
+    ).scalars())
+    now = datetime.utcnow()
+    new = [{'activity_date': date, 'marked_at': now} for date in dates if date not in marked]
+    if new:
+        connection.execute(dirty.insert(), new)
+        LOGGER.info("Marked %d rollup day(s) for recompute", len(new))
+
+def batch_dates(df):
+    """Return the creation dates of a batch's rows."""
+    return set(pd.to_datetime(df['creation_timestamp']).dropna().dt.date)
+
+def day_range(start, end):
+    """Return every date of the [start, end) timestamp range."""
+    day, last = start.date(), (end - timedelta(microseconds=1)).date()
+    dates = []
+    while day <= last:
+        dates.append(day)
+        day += timedelta(days=1)
+    return dates
+
+def is_whole_days(start, end):
+    """Whether a [start, end) timestamp range starts and ends at midnight."""
+    midnight = datetime.min.time()
+    return start.time() == midnight and end.time() == midnight
+
+# Recomputing rollups from the source
+
+def recompute(start, end):
+    """
+    Aggregate every loaded order created in [start, end) from the source.
+
+    Reads the source like a window reload does, cut at the committed watermark
+    so rows the incremental run has not loaded yet are left out, and drops the
+    rows the pre-load validation would have quarantined.
+
+    Args:
+        start (date|datetime|str): Inclusive lower bound
+        end (date|datetime|str): Exclusive upper bound
+
+    Returns:
+        Rollup: Rows of the whole range
+    """
+    start, end = parse_bound(start), parse_bound(end)
+    last_ts, last_id = get_last_processed_data()
+    last_ts = parse_bound(last_ts)
+    # Rows created at the watermark's timestamp are loaded up to its record ID
+    end = min(end, last_ts + timedelta(microseconds=1))
+    if end <= start:
+        return combine([])
+
+    validate = DB_CONFIG['PIPELINE_CONFIG']['validate']
+    parts = []
+    rows = 0
+    for df in extract_batches(str(start), -1, end_date=str(end)):
+        created = pd.to_datetime(df['creation_timestamp'])
+        df = df[(created < last_ts) | ((created == last_ts) & (df['record_id'] <= last_id))]
+        if validate and not df.empty:
+            df = validate_batch(df)[0]
+        parts.append(aggregate_batch(df))
+        rows += len(df)
+    LOGGER.info("Recomputed the rollups of [%s, %s) from %d rows", start, end, rows)
+    return combine(parts)
+
+def _date_ranges(dates):
+    """Group sorted dates into [start, end) runs of consecutive days."""
+    ranges = []
+    for day in sorted(dates):
+        if ranges and ranges[-1][1] == day:
+            ranges[-1][1] = day + timedelta(days=1)
+        else:
+            ranges.append([day, day + timedelta(days=1)])
+    return [tuple(bounds) for bounds in ranges]
+
+def rebuild(start, end):
+    """
+    Recompute the rollups of [start, end) from the source and replace them in one transaction.
+
+    Returns:
+        int: Number of days rebuilt
+    """
+    start, end = parse_bound(start).date(), parse_bound(end).date()
+    rollup = recompute(start, end)
+    engine = get_sql_server_engine(DB_CONFIG['SQLSERVER_CONFIG'])
+    with engine.begin() as connection:
+        replace_days(connection, rollup, start, end)
+    days = (end - start).days
+    LOGGER.info("Rebuilt %d rollup day(s) of [%s, %s)", days, start, end)
+    return days
+
+def settle_dirty_days():
+    """
+    Recompute every day marked dirty by window reloads and change capture.
+
+    Run after the EL step and before dbt, so the reports never read a dirty day.
+
+    Returns:
+        int: Number of days recomputed
+    """
+    schema = DB_CONFIG['DBT_CONFIG']['target_schema']
+    engine = get_sql_server_engine(DB_CONFIG['SQLSERVER_CONFIG'])
+    with engine.begin() as connection:
+        dirty = _ensure_tables(connection, schema)[2]
+        dates = list(connection.execute(sqlalchemy.select(dirty.c.activity_date)).scalars())
+    if not dates:
+        LOGGER.info("No dirty rollup days to recompute")
+        return 0
+    return sum(rebuild(start, end) for start, end in _date_ranges(dates))
+
+# Reconciliation
+
+def _comparable(frame):
+    """Copy of rollup rows with timestamps parsed and sketches as raw registers, as stored and recomputed differ."""
+    frame = frame.copy()
+    for column in ('first_created_at', 'last_created_at'):
+        if column in frame.columns:
+            frame[column] = pd.to_datetime(frame[column])
+    if 'account_sketch' in frame.columns:
+        frame['account_sketch'] = [unpack_sketch(value).tobytes() for value in frame['account_sketch']]
+    return frame
+
+def _differing_dates(expected, actual, key, exact, amounts):
+    """Return the dates whose rows differ between two frames of the same rollup table."""
+    both = expected.merge(actual, on=key, how='outer', suffixes=('_expected', '_actual'), indicator=True)
+    differs = (both['_merge'] != 'both').to_numpy(copy=True)
+    for column in exact:
+        differs |= (both[f"{column}_expected"] != both[f"{column}_actual"]).to_numpy()
+    for column in amounts:
+        gap = (pd.to_numeric(both[f"{column}_expected"].astype(object), errors='coerce') -
+               pd.to_numeric(both[f"{column}_actual"].astype(object), errors='coerce')).abs()
+        differs |= (gap > 1e-6).fillna(False).to_numpy()
+    return set(both.loc[differs, 'activity_date'])
+
+def reconcile(start, end, repair=False):
+    """
+    Compare the rollups of [start, end) with a full recompute from the source.
+
+    Counts, first and last creation times and sketch registers must match
+    exactly, sums to 1e-6. Without change capture, rows modified in the source
+    after they were loaded show up as differences too.
+
+    Args:
+        start (date|datetime|str): First day compared
+        end (date|datetime|str): Day after the last day compared
+        repair (bool): Replace the rows of the days that differ with the recomputed ones
+
+    Returns:
+        dict: days compared, the dates that differ (ISO) and whether they were repaired
+    """
+    start, end = parse_bound(start).date(), parse_bound(end).date()
+    expected = recompute(start, end)
+    schema = DB_CONFIG['DBT_CONFIG']['target_schema']
+    engine = get_sql_server_engine(DB_CONFIG['SQLSERVER_CONFIG'])
+    with engine.begin() as connection:
+        account, product, _ = _ensure_tables(connection, schema)
+        actual_accounts = _read_rows(connection, account, start=start, end=end)
+        actual_products = _read_rows(connection, product, start=start, end=end)
+
+    dates = _differing_dates(_comparable(expected.accounts), _comparable(actual_accounts), ACCOUNT_KEY,
+                             ['order_count', 'amount_count', 'first_created_at', 'last_created_at'],
+                             ['base_amount_sum', 'fee_amount_sum'])
+    dates |= _differing_dates(_comparable(expected.products), _comparable(actual_products), PRODUCT_KEY,
+                              ['order_count', 'buy_count', 'sell_count', 'amount_count', 'account_sketch'],
+                              ['base_amount_sum', 'buy_amount_sum', 'sell_amount_sum', 'fee_amount_sum'])
+    dates = sorted(dates)
+    result = {'days': (end - start).days, 'differing_dates': [day.isoformat() for day in dates], 'repaired': False}
+    if not dates:
+        LOGGER.info("Rollups of [%s, %s) match a full recompute", start, end)
+        return result
+
+    LOGGER.warning("Rollups of %d of %d day(s) differ from a full recompute: %s", len(dates), result['days'],
+                   ', '.join(result['differing_dates']))
+    if repair:
+        with engine.begin() as connection:
+            for range_start, range_end in _date_ranges(dates):
+                replace_days(connection, expected.restrict(day for day in dates if range_start <= day < range_end),
+                             range_start, range_end)
+        result['repaired'] = True
+        LOGGER.info("Repaired the rollups of %d day(s)", len(dates))
+    return result
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Maintain the fin_trade daily rollups.")
+    action = parser.add_mutually_exclusive_group(required=True)
+    action.add_argument('--settle', action='store_true', help="Recompute the days marked dirty")
+    action.add_argument('--rebuild', action='store_true', help="Recompute [--start, --end) from the source")
+    action.add_argument('--reconcile', action='store_true',
+                        help="Compare [--start, --end) with a full recompute from the source")
+    parser.add_argument('--start', help="First day, ISO date (inclusive)")
+    parser.add_argument('--end', help="Day after the last day, ISO date (exclusive)")
+    parser.add_argument('--repair', action='store_true', help="With --reconcile, replace the days that differ")
+    args = parser.parse_args()
+
+    if (args.rebuild or args.reconcile) and not (args.start and args.end):
+        parser.error("--rebuild and --reconcile need --start and --end")
+
+    if args.settle:
+        if DB_CONFIG['PIPELINE_CONFIG']['rollups']:
+            settle_dirty_days()
+        else:
+            LOGGER.info("Rollups are off (EL_ROLLUPS); nothing to settle")
+    elif args.rebuild:
+        rebuild(args.start, args.end)
+    else:
+        print(json.dumps(reconcile(args.start, args.end, repair=args.repair)))
@@ -0,0 +1,124 @@
+"""
+Schema contract for the financial_events extract.
+Defines the pandas dtypes applied while reading from MySQL and the matching SQL Server column types.
+
+- Low-cardinality codes are categoricals, stored once per batch instead of once per row
+- Amounts and prices are exact decimal128 values instead of float64
+- Timestamps are nullable datetime64 columns (NaT for missing values)
+"""
+
+import pandas as pd
+import pyarrow as pa
+import sqlalchemy
+from sqlalchemy.dialects import mssql
+
+# Precision/scale shared by every amount and price column
+AMOUNT_PRECISION = 38
+AMOUNT_SCALE = 18
+
+_CODE = 'code'
+_TEXT = 'text'
+_AMOUNT = 'amount'
+_TIMESTAMP = 'timestamp'
+_ID = 'id'
+
+# Column -> (kind, max length for text columns)
+FINANCIAL_EVENTS_SCHEMA = {
+    'record_id': (_ID, None),
+    'creation_timestamp': (_TIMESTAMP, None),
+    'modification_timestamp': (_TIMESTAMP, None),
+    'deletion_timestamp': (_TIMESTAMP, None),
+    'user_identifier': (_TEXT, 64),
+    'user_email': (_TEXT, 320),
+    'status_code': (_CODE, 16),
+    'quote_currency': (_CODE, 16),
+    'base_currency': (_CODE, 16),
+    'quote_amount': (_AMOUNT, None),
+    'base_amount': (_AMOUNT, None),
+    'execution_price': (_AMOUNT, None),
+    'order_direction': (_CODE, 16),
+    'market_symbol': (_CODE, 32),
+    'order_type': (_CODE, 16),
+    'executed_amount': (_AMOUNT, None),
+    'total_quote_executed': (_AMOUNT, None),
+    'time_validity': (_CODE, 16),
+    'fee_amount': (_AMOUNT, None),
+    'provider_quoted_price': (_AMOUNT, None),
+    'provider_fee': (_AMOUNT, None),
+    'liquidity_provider': (_CODE, 64),
+    'provider_response': (_TEXT, None)
+}
+
+AMOUNT_DTYPE = pd.ArrowDtype(pa.decimal128(AMOUNT_PRECISION, AMOUNT_SCALE))
+
+_PANDAS_DTYPES = {
+    _ID: 'int64',
+    _TIMESTAMP: 'datetime64[ns]',
+    _CODE: 'category',
+    _TEXT: pd.StringDtype(),
+    _AMOUNT: AMOUNT_DTYPE
+}
+
+def _sql_type(kind, length):
+    if kind == _ID:
+        return sqlalchemy.BigInteger()
+    if kind == _TIMESTAMP:
+        return sqlalchemy.DateTime().with_variant(mssql.DATETIME2(precision=6), 'mssql')
+    if kind == _AMOUNT:
+        return sqlalchemy.Numeric(AMOUNT_PRECISION, AMOUNT_SCALE)
+    if length is None:
+        return sqlalchemy.UnicodeText()
+    return sqlalchemy.Unicode(length)
+
+# pandas dtypes passed to read_sql so columns are typed as each chunk is read
+EXTRACT_DTYPES = {column: _PANDAS_DTYPES[kind] for column, (kind, _) in FINANCIAL_EVENTS_SCHEMA.items()}
+
+# SQLAlchemy column types used when the loader creates the staging table
+SQL_TYPES = {column: _sql_type(kind, length) for column, (kind, length) in FINANCIAL_EVENTS_SCHEMA.items()}
+
+# Surrogate keys added to each batch by the EL step (see dim_keys.py)
+RESOLVED_KEY_COLUMNS = ['approval_key', 'category_key', 'direction_key', 'operation_key', 'account_key', 'provider_key']
+SQL_TYPES.update({column: sqlalchemy.BigInteger() for column in RESOLVED_KEY_COLUMNS})
+
+# Load metadata stamped on each batch by the loader (see load.stamp_batch)
+LOAD_METADATA_COLUMNS = ['run_key_ref', '_dbt_loaded_at', '_dbt_source_relation']
+SQL_TYPES.update({
+    'run_key_ref': sqlalchemy.Unicode(250),
+    '_dbt_loaded_at': _sql_type(_TIMESTAMP, None),
+    '_dbt_source_relation': sqlalchemy.Unicode(128)
+})
+
+# Columns of the quarantine table (see validation.validate_batch)
+SQL_TYPES.update({
+    'failed_rules': sqlalchemy.Unicode(1000),
+    'row_json': sqlalchemy.UnicodeText(),
+    'quarantined_at': _sql_type(_TIMESTAMP, None)
+})
+
+# Gzip-compressed payload columns of the payload store (see payloads.offload_payloads)
+SQL_TYPES['provider_response_gz'] = sqlalchemy.LargeBinary().with_variant(mssql.VARBINARY('max'), 'mssql')
+
+def extract_dtypes(columns):
+    """Return the pandas dtypes for the given extracted columns."""
+    return {column: EXTRACT_DTYPES[column] for column in columns if column in EXTRACT_DTYPES}
+
+def sql_types(columns):
+    """Return the SQLAlchemy column types for the given columns, skipping unknown ones."""
+    return {column: SQL_TYPES[column] for column in columns if column in SQL_TYPES}
+
+def apply_schema(df):
+    """
+    Cast a DataFrame to the extract schema.
+
+    Used for data that did not come through read_sql, e.g. batches read back
+    from the spool, where decimal columns arrive as Python Decimal objects.
+    """
+    dtypes = {
+        column: dtype for column, dtype in extract_dtypes(df.columns).items()
+        if str(df[column].dtype) != str(dtype)
+    }
+    return df.astype(dtypes) if dtypes else df
+
+def is_decimal_dtype(dtype):
+    """Whether a pandas dtype holds exact decimals."""
+    return isinstance(dtype, pd.ArrowDtype) and pa.types.is_decimal(dtype.pyarrow_dtype)
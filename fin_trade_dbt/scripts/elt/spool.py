@@ -0,0 +1,180 @@
+"""
+Spool module for fin_trade pipeline.
+Persists extracted batches as Arrow IPC files between extract and load.
+
+Each batch is written to <spool_dir>/<run_id>/batch_<seq>.arrow with its batch
+id and (created_at, id) watermark range in the schema metadata. A batch that
+has been loaded gets a .loaded marker next to it. Loads that fail, Airflow
+retries and manual replays read batches back from disk (memory-mapped) instead
+of querying the source again.
+"""
+
+import os
+import time
+from datetime import datetime
+import pandas as pd
+import pyarrow as pa
+from .schema import apply_schema
+from ..utils.logger import LOGGER
+
+SPOOL_SUFFIX = '.arrow'
+LOADED_SUFFIX = '.loaded'
+
+def new_run_id():
+    """Return a sortable identifier for a pipeline run."""
+    return datetime.utcnow().strftime('run_%Y%m%dT%H%M%S_') + str(os.getpid())
+
+def _watermark(row):
+    return pd.Timestamp(row['creation_timestamp']).isoformat(), int(row['record_id'])
+
+def write_batch(df, spool_dir, run_id, seq):
+    """
+    Write one extracted batch to the spool.
+
+    The file is written under a temporary name and renamed into place, so a
+    crash never leaves a truncated batch behind.
+
+    Args:
+        df (pandas.DataFrame): Batch in (creation_timestamp, record_id) order
+        spool_dir (str): Spool root directory
+        run_id (str): Identifier of the run the batch belongs to
+        seq (int): Batch sequence number within the run
+
+    Returns:
+        str: Path of the spooled batch file
+    """
+    run_dir = os.path.join(spool_dir, run_id)
+    os.makedirs(run_dir, exist_ok=True)
+    path = os.path.join(run_dir, f"batch_{seq:06d}{SPOOL_SUFFIX}")
+
+    low_ts, low_id = _watermark(df.iloc[0])
+    high_ts, high_id = _watermark(df.iloc[-1])
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata.update({
+        b'batch_id': f"{run_id}/{seq:06d}".encode(),
+        b'run_id': run_id.encode(),
+        b'seq': str(seq).encode(),
+        b'rows': str(len(df)).encode(),
+        b'low_ts': low_ts.encode(),
+        b'low_id': str(low_id).encode(),
+        b'high_ts': high_ts.encode(),
+        b'high_id': str(high_id).encode()
+    })
+    table = table.replace_schema_metadata(metadata)
+
+    tmp_path = path + '.tmp'
+    try:
+        with pa.OSFile(tmp_path, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, path)
+    return path
+
+def read_metadata(path):
+    """Read a spooled batch's metadata without loading its data."""
+    with pa.memory_map(path, 'r') as source:
+        raw = pa.ipc.open_file(source).schema.metadata
+    return {
+        key.decode(): value.decode()
+        for key, value in raw.items() if key != b'pandas'
+    }
+
+def read_batch(path):
+    """
+    Read a spooled batch back into a DataFrame through a memory map.
+
+    Columns are cast back to the extract schema, since Arrow decimals come back
+    as Python Decimal objects.
+
+    Returns:
+        tuple: (pandas.DataFrame, dict metadata)
+    """
+    with pa.memory_map(path, 'r') as source:
+        table = pa.ipc.open_file(source).read_all()
+    df = apply_schema(table.to_pandas())
+    df.attrs['spool_path'] = path
+    return df, read_metadata(path)
+
+def mark_loaded(path):
+    """Record that a spooled batch has been committed to the target."""
+    with open(path + LOADED_SUFFIX, 'w') as marker:
+        marker.write(datetime.utcnow().isoformat())
+
+def is_loaded(path):
+    return os.path.exists(path + LOADED_SUFFIX)
+
+def list_batches(spool_dir, run_id=None):
+    """
+    List spooled batch files in (run_id, seq) order.
+
+    Args:
+        spool_dir (str): Spool root directory
+        run_id (str): Restrict to one run; all runs when None
+
+    Returns:
+        list: Batch file paths
+    """
+    if not os.path.isdir(spool_dir):
+        return []
+    run_ids = [run_id] if run_id else sorted(os.listdir(spool_dir))
+    paths = []
+    for run in run_ids:
+        run_dir = os.path.join(spool_dir, run)
+        if not os.path.isdir(run_dir):
+            continue
+        paths.extend(
+            os.path.join(run_dir, name)
+            for name in sorted(os.listdir(run_dir)) if name.endswith(SPOOL_SUFFIX)
+        )
+    return paths
+
+def pending_batches(spool_dir):
+    """List spooled batches that have not been marked as loaded, oldest first."""
+    return [path for path in list_batches(spool_dir) if not is_loaded(path)]
+
+def is_committed(metadata, last_ts, last_id):
+    """Whether a batch lies entirely at or below the committed (ts, id) watermark."""
+    high = (pd.Timestamp(metadata['high_ts']), int(metadata['high_id']))
+    return high <= (pd.Timestamp(last_ts), int(last_id))
+
+def collect_garbage(spool_dir, max_age_hours=72, max_bytes=10 * 1024 ** 3):
+    """
+    Delete loaded batches older than max_age_hours, then the oldest loaded batches
+    until the spool fits in max_bytes. Batches not yet loaded are never removed.
+
+    Returns:
+        int: Number of batch files removed
+    """
+    loaded = []
+    total_bytes = 0
+    for path in list_batches(spool_dir):
+        size = os.path.getsize(path)
+        total_bytes += size
+        if is_loaded(path):
+            loaded.append((os.path.getmtime(path), path, size))
+
+    cutoff = time.time() - max_age_hours * 3600
+    removed = 0
+    for mtime, path, size in sorted(loaded):
+        if mtime >= cutoff and total_bytes <= max_bytes:
+            break
+        os.remove(path)
+        os.remove(path + LOADED_SUFFIX)
+        total_bytes -= size
+        removed += 1
+
+    for run in os.listdir(spool_dir) if os.path.isdir(spool_dir) else []:
+        run_dir = os.path.join(spool_dir, run)
+        if os.path.isdir(run_dir) and not os.listdir(run_dir):
+            os.rmdir(run_dir)
+
+    if total_bytes > max_bytes:
+        LOGGER.warning("Spool %s holds %d bytes of unloaded batches, above %d", spool_dir, total_bytes, max_bytes)
+    if removed:
+        LOGGER.info("Removed %d loaded batch(es) from spool %s", removed, spool_dir)
+    return removed
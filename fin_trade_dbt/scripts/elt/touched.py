@@ -0,0 +1,139 @@
+"""
+Touched-keys module for fin_trade pipeline.
+Records which dates, accounts, products and dimensions an EL run loaded, so dbt only rebuilds what changed.
+
+A manifest is a small JSON-able dict:
+    rows        rows loaded
+    dates       creation dates (ISO) that received or lost rows
+    accounts    user_identifier values loaded, or None for "too many to list"
+    products    market_symbol values loaded, or None for "too many to list"
+    dimensions  dimension models with codes that had no key yet, or None for "all"
+    validation  pre-load validation counts: rows checked, passed, quarantined, warned and
+                failures per rule; every loaded row was validated when passed >= rows
+"""
+
+import json
+import threading
+from datetime import timedelta
+import pandas as pd
+
+# Keys per list beyond which a manifest only says "all" (None), keeping it small enough for an XCom
+MAX_KEYS = 1000
+
+def _add_capped(keys, values):
+    """Add values to a key set; returns None (all) once the set grows past MAX_KEYS."""
+    if keys is None:
+        return None
+    keys.update(values)
+    return keys if len(keys) <= MAX_KEYS else None
+
+class TouchedKeys:
+    """
+    Thread-safe accumulator of the keys an EL run loaded.
+
+    Loader threads of pipelined mode add their batches concurrently.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.rows = 0
+        self.dates = set()
+        self.accounts = set()
+        self.products = set()
+        self.dimensions = set()
+        self.validation = _empty_validation()
+
+    def add_batch(self, df, unresolved=None):
+        """
+        Record a loaded batch.
+
+        Args:
+            df (pandas.DataFrame): Loaded batch
+            unresolved (pandas.DataFrame): Its unresolved dimension codes, as returned by
+                                           resolve_dimension_keys; None when keys were not
+                                           resolved, so every dimension has to be rebuilt
+        """
+        if df.empty:
+            return
+        dates = pd.to_datetime(df['creation_timestamp']).dt.date.dropna().unique()
+        accounts = df['user_identifier'].dropna().astype(str).unique()
+        products = df['market_symbol'].dropna().astype(str).unique()
+        with self._lock:
+            self.rows += len(df)
+            self.dates.update(date.isoformat() for date in dates)
+            self.accounts = _add_capped(self.accounts, accounts)
+            self.products = _add_capped(self.products, products)
+            if unresolved is None:
+                self.dimensions = None
+            elif not unresolved.empty:
+                self.dimensions = _add_capped(self.dimensions, unresolved['dimension'].unique())
+
+    def add_validation(self, stats):
+        """Record the counts of one validated batch (see validation.validate_batch)."""
+        with self._lock:
+            _add_validation(self.validation, stats)
+
+    def add_window(self, start, end):
+        """Record every date of a replaced [start, end) window; rows deleted there leave no batch behind."""
+        day, last = start.date(), (end - timedelta(microseconds=1)).date()
+        with self._lock:
+            while day <= last:
+                self.dates.add(day.isoformat())
+                day += timedelta(days=1)
+
+    def to_dict(self):
+        """Return the manifest."""
+        with self._lock:
+            return {
+                'rows': self.rows,
+                'dates': sorted(self.dates),
+                'accounts': sorted(self.accounts) if self.accounts is not None else None,
+                'products': sorted(self.products) if self.products is not None else None,
+                'dimensions': sorted(self.dimensions) if self.dimensions is not None else None,
+                'validation': {**self.validation, 'failures': dict(self.validation['failures'])}
+            }
+
+def _empty_validation():
+    return {'rows': 0, 'passed': 0, 'quarantined': 0, 'warned': 0, 'failures': {}}
+
+def _add_validation(totals, stats):
+    for key in ('rows', 'passed', 'quarantined', 'warned'):
+        totals[key] += stats.get(key, 0)
+    for rule, count in stats.get('failures', {}).items():
+        totals['failures'][rule] = totals['failures'].get(rule, 0) + count
+
+def is_fully_validated(manifest):
+    """Return True when every row a manifest's run loaded passed the pre-load validation."""
+    validation = manifest.get('validation')
+    return bool(validation) and manifest['rows'] > 0 and validation['passed'] >= manifest['rows']
+
+def merge_manifests(manifests):
+    """
+    Merge the manifests of several EL processes, e.g. the mapped partitions of one DAG run.
+
+    Args:
+        manifests (iterable): Manifest dicts or their JSON text; None entries are ignored
+
+    Returns:
+        dict: Combined manifest; a list that is None ("all") in any input stays None
+    """
+    merged = {'rows': 0, 'dates': set(), 'accounts': set(), 'products': set(), 'dimensions': set(),
+              'validation': _empty_validation()}
+    for manifest in manifests:
+        if not manifest:
+            continue
+        if isinstance(manifest, str):
+            manifest = json.loads(manifest)
+        merged['rows'] += manifest.get('rows', 0)
+        merged['dates'].update(manifest.get('dates', []))
+        _add_validation(merged['validation'], manifest.get('validation') or {})
+        for key in ('accounts', 'products', 'dimensions'):
+            values = manifest.get(key, [])
+            if merged[key] is not None:
+                merged[key] = None if values is None else merged[key] | set(values)
+    return {key: sorted(value) if isinstance(value, set) else value for key, value in merged.items()}
+
+def write_manifest(manifest, path):
+    """Write a manifest as JSON."""
+    with open(path, 'w') as handle:
+        json.dump(manifest, handle, indent=2, sort_keys=True)
@@ -0,0 +1,152 @@
+"""
+Validation module for fin_trade pipeline.
+Checks each extracted batch against a declarative rule set before it is loaded and quarantines the rows that fail.
+
+Each rule is evaluated as one vectorized column operation over the whole
+batch; only the rows that fail are touched row by row, to record why. The
+rules mirror the column tests of models/fct/orders.yml, so a batch that passes
+here cannot fail them: the dbt build of an EL run that validated every row skips
+those tests (see dags/utils/dbt_runner.py, tag preload_validated).
+
+A rule is a dict:
+    name      reported in the quarantine table and the run's counts
+    column    checked column; rules on columns missing from the batch are skipped
+    check     one of CHECKS
+    value     the check's argument: a bound, a list of values or another column
+    when      optional {column: [values]}; only rows matching it are checked
+    severity  'error' (default) quarantines the row, 'warn' only counts it
+
+Null values only fail not_null, as in dbt's range and expression tests.
+"""
+
+import json
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from ..utils.logger import LOGGER
+from ..utils.metrics import record_validation
+
+RULES = [
+    {'name': 'record_id_not_null', 'column': 'record_id', 'check': 'not_null'},
+    {'name': 'creation_timestamp_not_null', 'column': 'creation_timestamp', 'check': 'not_null'},
+    {'name': 'creation_timestamp_not_in_future', 'column': 'creation_timestamp', 'check': 'not_in_future'},
+    {'name': 'modification_after_creation', 'column': 'modification_timestamp', 'check': 'at_least_column',
+     'value': 'creation_timestamp'},
+    {'name': 'user_identifier_not_null', 'column': 'user_identifier', 'check': 'not_null'},
+    {'name': 'order_direction_accepted', 'column': 'order_direction', 'check': 'accepted_values',
+     'value': ['BUY', 'SELL']},
+    {'name': 'quote_amount_not_null', 'column': 'quote_amount', 'check': 'not_null'},
+    {'name': 'quote_amount_non_negative', 'column': 'quote_amount', 'check': 'min_value', 'value': 0},
+    {'name': 'base_amount_not_null', 'column': 'base_amount', 'check': 'not_null'},
+    {'name': 'base_amount_non_negative', 'column': 'base_amount', 'check': 'min_value', 'value': 0},
+    {'name': 'execution_price_not_null', 'column': 'execution_price', 'check': 'not_null'},
+    {'name': 'execution_price_non_negative', 'column': 'execution_price', 'check': 'min_value', 'value': 0},
+    # net_position_change divides fee_amount by execution_price for buys
+    {'name': 'buy_execution_price_positive', 'column': 'execution_price', 'check': 'greater_than', 'value': 0,
+     'when': {'order_direction': ['BUY']}},
+    {'name': 'executed_amount_not_null', 'column': 'executed_amount', 'check': 'not_null'},
+    {'name': 'executed_amount_non_negative', 'column': 'executed_amount', 'check': 'min_value', 'value': 0},
+    {'name': 'executed_within_base_amount', 'column': 'executed_amount', 'check': 'at_most_column',
+     'value': 'base_amount'},
+    {'name': 'total_quote_executed_not_null', 'column': 'total_quote_executed', 'check': 'not_null'},
+    {'name': 'total_quote_executed_non_negative', 'column': 'total_quote_executed', 'check': 'min_value', 'value': 0},
+    {'name': 'fee_amount_not_null', 'column': 'fee_amount', 'check': 'not_null'},
+    {'name': 'fee_amount_non_negative', 'column': 'fee_amount', 'check': 'min_value', 'value': 0},
+    {'name': 'fee_within_gross_amount', 'column': 'fee_amount', 'check': 'at_most_column',
+     'value': 'total_quote_executed'},
+    {'name': 'provider_fee_non_negative', 'column': 'provider_fee', 'check': 'min_value', 'value': 0},
+]
+
+def _fails(result):
+    """Turn a nullable boolean Series of failures into a NumPy mask; null comparisons pass."""
+    return result.fillna(False).to_numpy(dtype=bool)
+
+CHECKS = {
+    'not_null': lambda series, value, df: series.isna().to_numpy(),
+    'min_value': lambda series, value, df: _fails(series < value),
+    'greater_than': lambda series, value, df: _fails(series <= value),
+    'accepted_values': lambda series, value, df: _fails(~series.isin(value) & series.notna()),
+    'not_in_future': lambda series, value, df: _fails(series > pd.Timestamp.now()),
+    'at_least_column': lambda series, value, df: _fails(series < df[value]),
+    'at_most_column': lambda series, value, df: _fails(series > df[value]),
+}
+
+def _applies(rule, df):
+    columns = [rule['column']] + list(rule.get('when', {}))
+    if rule['check'] in ('at_least_column', 'at_most_column'):
+        columns.append(rule['value'])
+    return all(column in df.columns for column in columns)
+
+def _evaluate(rule, df):
+    """Return the rule's failure mask over the batch."""
+    if rule['check'] not in CHECKS:
+        raise ValueError(f"Unknown validation check '{rule['check']}' in rule {rule['name']}. "
+                         f"Use one of: {', '.join(CHECKS)}")
+    fails = CHECKS[rule['check']](df[rule['column']], rule.get('value'), df)
+    for column, values in rule.get('when', {}).items():
+        fails &= df[column].isin(values).to_numpy(dtype=bool)
+    return fails
+
+def _changed_at(rows):
+    """Return each row's version: its latest modification or soft deletion, else its creation."""
+    changes = [column for column in ('modification_timestamp', 'deletion_timestamp') if column in rows.columns]
+    changed = rows[changes].max(axis=1) if changes else pd.Series(pd.NaT, index=rows.index)
+    return pd.to_datetime(changed).fillna(pd.to_datetime(rows['creation_timestamp']))
+
+def _quarantine_frame(df, failed, matrix, names, run_key):
+    """Build the quarantine rows: keys, row version, the failed rule names and the row itself as JSON."""
+    rows = df[failed]
+    reasons = [';'.join(names[row]) for row in matrix[failed]]
+    records = rows.astype(object).where(rows.notna(), None).to_dict('records')
+    return pd.DataFrame({
+        'record_id': rows['record_id'].to_numpy(),
+        'creation_timestamp': rows['creation_timestamp'].to_numpy(),
+        # With record_id, identifies the quarantined version: a change pass reading it again adds nothing
+        'changed_at': _changed_at(rows).to_numpy(),
+        'failed_rules': reasons,
+        'row_json': [json.dumps(record, default=str) for record in records],
+        'run_key_ref': run_key,
+        'quarantined_at': datetime.utcnow()
+    })
+
+def validate_batch(df, rules=None, run_key=None):
+    """
+    Check a batch against the rules and split off the rows that fail an error rule.
+
+    Args:
+        df (pandas.DataFrame): Extracted batch
+        rules (list): Rule dicts. Defaults to RULES
+        run_key (str): Stamped on the quarantined rows (see load.get_run_key)
+
+    Returns:
+        tuple: (passing rows, quarantined rows as written to the quarantine table,
+               stats dict with rows, passed, quarantined, warned and failures per rule)
+
+    Raises:
+        ValueError: If a rule names an unknown check
+    """
+    rules = [rule for rule in (RULES if rules is None else rules) if _applies(rule, df)]
+    stats = {'rows': len(df), 'passed': len(df), 'quarantined': 0, 'warned': 0, 'failures': {}}
+    if df.empty or not rules:
+        return df, None, stats
+
+    # One row per batch row, one column per rule
+    matrix = np.column_stack([_evaluate(rule, df) for rule in rules])
+    names = np.array([rule['name'] for rule in rules], dtype=object)
+    errors = np.array([rule.get('severity', 'error') == 'error' for rule in rules])
+    counts = matrix.sum(axis=0)
+    stats['failures'] = {name: int(count) for name, count in zip(names, counts) if count}
+
+    failed = matrix[:, errors].any(axis=1)
+    stats['warned'] = int((matrix[:, ~errors].any(axis=1) & ~failed).sum())
+    stats['quarantined'] = int(failed.sum())
+    stats['passed'] = len(df) - stats['quarantined']
+    record_validation(stats)
+    if not failed.any():
+        return df, None, stats
+
+    quarantined = _quarantine_frame(df, failed, matrix, names, run_key)
+    LOGGER.warning("Quarantined %d of %d rows: %s", stats['quarantined'], len(df), stats['failures'])
+    passed = df[~failed].copy()
+    passed.attrs = df.attrs
+    return passed, quarantined, stats
@@ -0,0 +1,66 @@
+"""
+Window planning module for fin_trade pipeline.
+Splits an explicit [start, end) backfill range into per-day or per-hour partitions.
+"""
+
+from datetime import date, datetime, time, timedelta
+
+# Partition grain -> window length
+GRAINS = {
+    'day': timedelta(days=1),
+    'hour': timedelta(hours=1)
+}
+
+def parse_bound(value):
+    """
+    Parse a window bound.
+
+    Args:
+        value (str|date|datetime): ISO date ('2024-03-01') or datetime ('2024-03-01T06:00:00')
+
+    Returns:
+        datetime: The bound; dates mean midnight
+    """
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime.combine(value, time.min)
+    return datetime.fromisoformat(str(value))
+
+def _floor(moment, grain):
+    """Truncate a datetime to the start of its day or hour."""
+    if grain == 'day':
+        return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+def plan_windows(start, end, grain='day'):
+    """
+    Split [start, end) into consecutive windows aligned to day or hour boundaries.
+
+    Only the first and last window can be shorter than the grain, when start or
+    end is not on a boundary. Together the windows cover [start, end) exactly once.
+
+    Args:
+        start (str|date|datetime): Inclusive lower bound
+        end (str|date|datetime): Exclusive upper bound
+        grain (str): One of GRAINS
+
+    Returns:
+        list: (start, end) datetime pairs in order
+
+    Raises:
+        ValueError: If the grain is unknown or the range is empty
+    """
+    if grain not in GRAINS:
+        raise ValueError(f"Unknown partition grain '{grain}'. Use one of: {', '.join(GRAINS)}")
+    start, end = parse_bound(start), parse_bound(end)
+    if end <= start:
+        raise ValueError(f"Window end {end} must be after its start {start}")
+
+    step = GRAINS[grain]
+    windows = []
+    lower, upper = start, _floor(start, grain) + step
+    while lower < end:
+        windows.append((lower, min(upper, end)))
+        lower, upper = upper, upper + step
+    return windows
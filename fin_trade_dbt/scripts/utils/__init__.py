@@ -1,8 +1,13 @@
 """
 Utility package for fin_trade pipeline.
-Contains logging functionality.
+Contains logging functionality, the shared database engine registry, pipeline metrics and opt-in profiling.
 """
 
-from .logger import Logger, LOGGER
+from .logger import Logger, LOGGER, flush_logs
+from .engine_registry import get_engine, get_pool_stats, dispose_all
+from .metrics import instrument, stage_timer, observe_stage, record_watermark, export_metrics
+from .profiling import profiling_session, profiled, profile_stage, profile_batch
 
-__all__ = ['Logger', 'LOGGER'] 
\ No newline at end of file
+__all__ = ['Logger', 'LOGGER', 'flush_logs', 'get_engine', 'get_pool_stats', 'dispose_all', 'instrument', 'stage_timer',
+           'observe_stage', 'record_watermark', 'export_metrics', 'profiling_session', 'profiled', 'profile_stage',
+           'profile_batch'] 
\ No newline at end of file
@@ -0,0 +1,195 @@
+"""
+Engine registry for fin_trade pipeline.
+Provides process-wide cached SQLAlchemy engines so every stage reuses the same connection pools.
+
+Engines are keyed by name, URL and options, warmed up on first use and disposed
+at interpreter exit. Each pool records checkout, hit/miss and checkout-wait
+statistics that callers can read with get_pool_stats().
+"""
+
+import atexit
+import json
+import threading
+import time
+import sqlalchemy
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+from .logger import LOGGER
+
+_ENGINES = {}
+_STATS = {}
+_LOCK = threading.Lock()
+
+def _new_stats():
+    return {
+        'checkouts': 0,
+        'hits': 0,
+        'misses': 0,
+        'connect_retries': 0,
+        'checkout_wait_total': 0.0,
+        'checkout_wait_max': 0.0
+    }
+
+class TimedQueuePool(QueuePool):
+    """
+    QueuePool that records how long each checkout waited for a free connection.
+
+    Waits are added to the _STATS entry of stats_key, the registry name of the
+    pool; create_engine passes stats_key through to the pool.
+    """
+
+    def __init__(self, creator, stats_key=None, **kwargs):
+        super().__init__(creator, **kwargs)
+        self.stats_key = stats_key
+
+    def recreate(self):
+        # Engine.dispose() replaces the pool with a copy made here; keep its statistics key
+        pool = super().recreate()
+        pool.stats_key = self.stats_key
+        return pool
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = time.perf_counter() - started
+            stats = _STATS.get(self.stats_key)
+            if stats is not None:
+                with _LOCK:
+                    stats['checkout_wait_total'] += waited
+                    stats['checkout_wait_max'] = max(stats['checkout_wait_max'], waited)
+
+def _attach_listeners(engine, name, retries, retry_backoff, command_timeout):
+    """Register retry, timeout and hit/miss accounting hooks on an engine."""
+    stats = _STATS[name]
+
+    @event.listens_for(engine, 'do_connect')
+    def connect_with_retries(dialect, conn_rec, cargs, cparams):
+        dbapi = getattr(dialect, 'loaded_dbapi', None) or dialect.dbapi
+        for attempt in range(retries + 1):
+            try:
+                return dialect.connect(*cargs, **cparams)
+            except dbapi.Error as e:
+                if attempt == retries:
+                    raise
+                delay = retry_backoff * (2 ** attempt)
+                with _LOCK:
+                    stats['connect_retries'] += 1
+                LOGGER.warning("Connection to %s failed (attempt %d/%d), retrying in %.1fs: %s",
+                               name, attempt + 1, retries + 1, delay, e)
+                time.sleep(delay)
+
+    @event.listens_for(engine, 'connect')
+    def on_connect(dbapi_connection, connection_record):
+        connection_record.info['fresh'] = True
+        # pyodbc applies Connection.timeout to every statement on the connection
+        if command_timeout and engine.dialect.name == 'mssql':
+            dbapi_connection.timeout = command_timeout
+
+    @event.listens_for(engine, 'checkout')
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        fresh = connection_record.info.pop('fresh', False)
+        with _LOCK:
+            stats['checkouts'] += 1
+            stats['misses' if fresh else 'hits'] += 1
+
+def _warm_up(engine, name, connections):
+    """Open and return a number of connections so the first real checkouts hit the pool."""
+    opened = []
+    try:
+        for _ in range(connections):
+            opened.append(engine.connect())
+    except Exception as e:
+        LOGGER.warning("Warm-up of %s pool stopped after %d connection(s): %s", name, len(opened), e)
+    finally:
+        for connection in opened:
+            connection.close()
+
+def get_engine(name, url, pool_size=5, max_overflow=10, pool_timeout=30, pool_recycle=1800,
+               pool_pre_ping=True, warmup=1, retries=0, retry_backoff=1.0, command_timeout=None,
+               **engine_kwargs):
+    """
+    Return the cached engine for a name, URL and option set, creating it on first use.
+
+    Args:
+        name (str): Pool name used for statistics and pool logging
+        url (str): SQLAlchemy connection URL
+        pool_size (int): Connections kept open in the pool
+        max_overflow (int): Extra connections allowed beyond pool_size
+        pool_timeout (int): Seconds to wait for a free connection before failing
+        pool_recycle (int): Seconds after which a pooled connection is replaced
+        pool_pre_ping (bool): Test connections on checkout and replace dead ones
+        warmup (int): Connections to open eagerly when the engine is created
+        retries (int): Extra attempts for failed connection attempts, with exponential backoff
+        retry_backoff (float): Delay in seconds before the first retry
+        command_timeout (int): Per-statement timeout in seconds (applied for SQL Server)
+        **engine_kwargs: Passed through to sqlalchemy.create_engine
+
+    Returns:
+        sqlalchemy.engine.Engine: Shared engine instance
+    """
+    options = dict(
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=pool_timeout,
+        pool_recycle=pool_recycle,
+        pool_pre_ping=pool_pre_ping,
+        **engine_kwargs
+    )
+    key = (name, str(url), json.dumps(
+        dict(options, retries=retries, command_timeout=command_timeout), sort_keys=True, default=str
+    ))
+
+    with _LOCK:
+        engine = _ENGINES.get(key)
+        if engine is not None:
+            return engine
+        _STATS.setdefault(name, _new_stats())
+
+    engine = sqlalchemy.create_engine(url, poolclass=TimedQueuePool, pool_logging_name=name, stats_key=name,
+                                      **options)
+    _attach_listeners(engine, name, retries, retry_backoff, command_timeout)
+
+    with _LOCK:
+        existing = _ENGINES.setdefault(key, engine)
+    if existing is not engine:
+        # Another thread registered the same engine first
+        engine.dispose()
+        return existing
+
+    LOGGER.info("Created %s engine (pool_size=%d, max_overflow=%d, pool_recycle=%ds)",
+                name, pool_size, max_overflow, pool_recycle)
+    _warm_up(engine, name, min(warmup, pool_size))
+    return engine
+
+def get_pool_stats(name=None):
+    """
+    Return pool statistics for one pool name, or for every registered pool.
+
+    Returns:
+        dict: checkouts, hits, misses, connect_retries, checkout_wait_total,
+              checkout_wait_max, and the live checked_out/overflow/size of each pool
+    """
+    with _LOCK:
+        engines = list(_ENGINES.items())
+        snapshot = {pool_name: dict(stats) for pool_name, stats in _STATS.items()}
+
+    for (pool_name, _, _), engine in engines:
+        pool = engine.pool
+        snapshot[pool_name].update({
+            'checked_out': pool.checkedout(),
+            'overflow': pool.overflow(),
+            'size': pool.size()
+        })
+    return snapshot.get(name, _new_stats()) if name is not None else snapshot
+
+def dispose_all():
+    """Dispose every registered engine and forget it; called automatically at exit."""
+    with _LOCK:
+        engines = list(_ENGINES.values())
+        _ENGINES.clear()
+    for engine in engines:
+        engine.dispose()
+
+atexit.register(dispose_all)
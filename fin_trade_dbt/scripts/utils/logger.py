@@ -1,15 +1,26 @@
 """
 Logging utility for fin_trade pipeline.
 Provides centralized logging configuration and utility functions.
+
+Records are put on an in-memory queue by the calling thread and written to the
+rotating log file (as JSON) and the console by a single background listener,
+so extract and load worker threads never wait on log I/O. Messages use lazy
+%-style arguments, which are only formatted if the record is emitted.
 """
 
+import atexit
 import logging
 import logging.handlers
 import os
-from datetime import datetime
-import pandas as pd
+import queue
+import threading
 from pathlib import Path
 
+try:
+    from pythonjsonlogger.json import JsonFormatter
+except ImportError:  # python-json-logger < 3
+    from pythonjsonlogger.jsonlogger import JsonFormatter
+
 # Base directory of the project
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
@@ -17,60 +28,140 @@ BASE_DIR = Path(__file__).resolve().parent.parent.parent
 LOGGER_CONFIG = {
     'LOG_DIR': os.path.join(BASE_DIR, 'logs'),
     'LOG_FILE': 'fin_trade_pipeline.log',
+    'LOGGER_NAME': 'fin_trade_pipeline',
     'MAX_BYTES': 10485760,  # 10MB
     'BACKUP_COUNT': 5,
     'LOG_FORMAT': '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    'DEFAULT_LEVEL': 'DEBUG'
+    # Fields written to each JSON line of the log file, plus any `extra` passed by the caller
+    'JSON_FORMAT': '%(asctime)s %(name)s %(levelname)s %(threadName)s %(module)s %(funcName)s %(message)s',
+    'FILE_JSON': os.environ.get('LOG_FILE_JSON', 'true').lower() == 'true',
+    'DEFAULT_LEVEL': os.environ.get('LOG_LEVEL', 'INFO').upper()
 }
 
-class Logger:
-    def __init__(self, log_file="logs/fin_trade_pipeline.log", log_level=logging.DEBUG):
+_LISTENER = None
+_LOCK = threading.Lock()
+
+class _ThreadQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler for a listener in the same process.
+
+    The stock prepare() formats every record on the calling thread so it can be
+    pickled; records never leave the process here, so formatting is left to
+    the listener thread.
+    """
+
+    def prepare(self, record):
+        return record
+
+def _stop_listener():
+    global _LISTENER
+    with _LOCK:
+        listener, _LISTENER = _LISTENER, None
+    if listener is not None:
+        # Drains the queue before returning, so nothing logged before exit is lost
+        listener.stop()
+
+def flush_logs():
+    """
+    Write out every queued record and stop the listener.
+
+    For processes whose last stdout line is their result: call it just before
+    printing, so no log line can be written after the result.
+    """
+    _stop_listener()
+
+def _configure(log_file, log_level):
+    """
+    Attach the queue handler and start the listener, once per process.
+
+    Later calls only adjust the level, so creating several Logger instances
+    never duplicates handlers or output.
+    """
+    global _LISTENER
+    logger = logging.getLogger(LOGGER_CONFIG['LOGGER_NAME'])
+    logger.setLevel(log_level)
+
+    with _LOCK:
+        if _LISTENER is not None:
+            return logger
+
         # Create logs directory if it doesn't exist
         log_dir = os.path.dirname(log_file)
-        if log_dir and not os.path.exists(log_dir):
-            os.makedirs(log_dir)
-
-        self.logger = logging.getLogger("fin_trade_pipeline")
-        self.logger.setLevel(log_level)
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
 
         # Rotating File handler
         file_handler = logging.handlers.RotatingFileHandler(
             log_file,
-            maxBytes=10485760,  # 10MB
-            backupCount=5
+            maxBytes=LOGGER_CONFIG['MAX_BYTES'],
+            backupCount=LOGGER_CONFIG['BACKUP_COUNT']
         )
-        file_handler.setLevel(log_level)
-        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        file_handler.setFormatter(formatter)
-        
+        if LOGGER_CONFIG['FILE_JSON']:
+            file_handler.setFormatter(JsonFormatter(LOGGER_CONFIG['JSON_FORMAT']))
+        else:
+            file_handler.setFormatter(logging.Formatter(LOGGER_CONFIG['LOG_FORMAT']))
+
         # Console handler
         console_handler = logging.StreamHandler()
-        console_handler.setLevel(log_level)
-        console_handler.setFormatter(formatter)
-        
-        # Add handlers
-        self.logger.addHandler(file_handler)
-        self.logger.addHandler(console_handler)
-
-    def debug(self, message):
+        console_handler.setFormatter(logging.Formatter(LOGGER_CONFIG['LOG_FORMAT']))
+
+        # Unbounded queue: put() never blocks the logging thread
+        log_queue = queue.SimpleQueue()
+        for handler in [h for h in logger.handlers if isinstance(h, _ThreadQueueHandler)]:
+            logger.removeHandler(handler)
+        logger.addHandler(_ThreadQueueHandler(log_queue))
+
+        _LISTENER = logging.handlers.QueueListener(
+            log_queue, file_handler, console_handler, respect_handler_level=True
+        )
+        _LISTENER.start()
+        atexit.register(_stop_listener)
+    return logger
+
+class Logger:
+    def __init__(self, log_file=None, log_level=None):
+        """
+        Args:
+            log_file (str): Log file path, defaults to LOG_DIR/LOG_FILE. Only the
+                            first Logger created in a process opens the file
+            log_level (int|str): Level, defaults to LOGGER_CONFIG['DEFAULT_LEVEL'] (LOG_LEVEL)
+        """
+        log_file = log_file or os.path.join(LOGGER_CONFIG['LOG_DIR'], LOGGER_CONFIG['LOG_FILE'])
+        self.logger = _configure(log_file, log_level or LOGGER_CONFIG['DEFAULT_LEVEL'])
+
+    def is_enabled_for(self, level):
+        """Whether a level is emitted; guard expensive log arguments with this."""
+        return self.logger.isEnabledFor(level)
+
+    def debug(self, message, *args, **kwargs):
         """Log debug level messages for detailed debugging information."""
-        self.logger.debug(message)
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger._log(logging.DEBUG, message, args, stacklevel=2, **kwargs)
 
-    def info(self, message):
+    def info(self, message, *args, **kwargs):
         """Log info level messages for general process information."""
-        self.logger.info(message)
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger._log(logging.INFO, message, args, stacklevel=2, **kwargs)
 
-    def warning(self, message):
+    def warning(self, message, *args, **kwargs):
         """Log warning level messages for concerning but non-critical issues."""
-        self.logger.warning(message)
+        if self.logger.isEnabledFor(logging.WARNING):
+            self.logger._log(logging.WARNING, message, args, stacklevel=2, **kwargs)
 
-    def error(self, message):
+    def error(self, message, *args, **kwargs):
         """Log error level messages for issues that prevent normal operation."""
-        self.logger.error(message)
-        
-    def critical(self, message):
+        if self.logger.isEnabledFor(logging.ERROR):
+            self.logger._log(logging.ERROR, message, args, stacklevel=2, **kwargs)
+
+    def exception(self, message, *args, **kwargs):
+        """Log error level messages with the current exception's traceback."""
+        if self.logger.isEnabledFor(logging.ERROR):
+            self.logger._log(logging.ERROR, message, args, exc_info=True, stacklevel=2, **kwargs)
+
+    def critical(self, message, *args, **kwargs):
         """Log critical level messages for severe errors that require immediate attention."""
-        self.logger.critical(message)
+        if self.logger.isEnabledFor(logging.CRITICAL):
+            self.logger._log(logging.CRITICAL, message, args, stacklevel=2, **kwargs)
 
-# Create default logger instance with DEBUG level
-LOGGER = Logger() 
\ No newline at end of file
+# Create default logger instance (INFO unless LOG_LEVEL says otherwise)
+LOGGER = Logger()
\ No newline at end of file
@@ -0,0 +1,223 @@
+"""
+Metrics utility for fin_trade pipeline.
+Records per-stage Prometheus metrics and exports them through the textfile collector or a Pushgateway.
+
+Metrics live in a registry of their own, so only pipeline metrics are exported.
+Recording a stage costs a few counter/histogram updates; nothing is exported
+until export_metrics() is called at the end of a run or task.
+"""
+
+import functools
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+import pandas as pd
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram
+from prometheus_client import push_to_gateway, write_to_textfile
+from .engine_registry import get_pool_stats
+from .logger import LOGGER
+from .profiling import profile_stage
+
+# Metrics configuration
+METRICS_CONFIG = {
+    'ENABLED': os.environ.get('METRICS_ENABLED', 'true').lower() == 'true',
+    'TEXTFILE_DIR': os.environ.get('METRICS_TEXTFILE_DIR', ''),  # node_exporter textfile collector directory
+    'PUSHGATEWAY_URL': os.environ.get('METRICS_PUSHGATEWAY_URL', ''),  # e.g. http://pushgateway:9091
+    'JOB': os.environ.get('METRICS_JOB', 'fin_trade_pipeline')
+}
+
+REGISTRY = CollectorRegistry()
+
+STAGE_DURATION = Histogram(
+    'fin_trade_stage_duration_seconds', 'Wall time of a pipeline stage call',
+    ['stage'], registry=REGISTRY,
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+)
+STAGE_ROWS = Counter('fin_trade_stage_rows_total', 'Rows handled by a pipeline stage', ['stage'], registry=REGISTRY)
+STAGE_BYTES = Counter('fin_trade_stage_bytes_total', 'In-memory bytes of the DataFrames handled by a stage',
+                      ['stage'], registry=REGISTRY)
+STAGE_ERRORS = Counter('fin_trade_stage_errors_total', 'Failed pipeline stage calls', ['stage'], registry=REGISTRY)
+STAGE_ROWS_PER_SEC = Gauge('fin_trade_stage_rows_per_second', 'Throughput of the last call of a stage',
+                           ['stage'], registry=REGISTRY)
+BATCH_ROWS = Histogram(
+    'fin_trade_batch_rows', 'Rows per batch handled by a stage',
+    ['stage'], registry=REGISTRY,
+    buckets=(100, 1000, 5000, 10000, 25000, 50000, 100000, 250000, 500000, 1000000)
+)
+POOL_CHECKOUT_WAIT = Gauge('fin_trade_pool_checkout_wait_seconds', 'Time spent waiting for a pooled connection',
+                           ['pool', 'stat'], registry=REGISTRY)
+POOL_CONNECTIONS = Gauge('fin_trade_pool_connections', 'Connection pool usage counters',
+                         ['pool', 'stat'], registry=REGISTRY)
+WATERMARK_TIMESTAMP = Gauge('fin_trade_watermark_timestamp_seconds', 'Creation time of the last loaded record',
+                            registry=REGISTRY)
+WATERMARK_LAG = Gauge('fin_trade_watermark_lag_seconds', 'Age of the last loaded record when it was recorded',
+                      registry=REGISTRY)
+TUNED_SETTING = Gauge('fin_trade_autotune_setting', 'Current value of an autotuned EL setting',
+                      ['setting'], registry=REGISTRY)
+VALIDATION_ROWS = Counter('fin_trade_validation_rows_total', 'Rows checked by the pre-load validation',
+                          ['outcome'], registry=REGISTRY)
+VALIDATION_FAILURES = Counter('fin_trade_validation_failures_total', 'Rows failing a validation rule',
+                              ['rule'], registry=REGISTRY)
+LAST_EXPORT = Gauge('fin_trade_last_export_timestamp_seconds', 'When metrics were last exported',
+                    ['job'], registry=REGISTRY)
+
+def observe_stage(stage, seconds, df=None, failed=False):
+    """
+    Record one call of a stage.
+
+    Args:
+        stage (str): Stage name, e.g. extract, load, dbt_build
+        seconds (float): Wall time of the call
+        df (pandas.DataFrame): Data the stage returned or received, for row and byte counts
+        failed (bool): Whether the call raised
+    """
+    if not METRICS_CONFIG['ENABLED']:
+        return
+    STAGE_DURATION.labels(stage).observe(seconds)
+    if failed:
+        STAGE_ERRORS.labels(stage).inc()
+    if isinstance(df, pd.DataFrame):
+        rows = len(df)
+        STAGE_ROWS.labels(stage).inc(rows)
+        BATCH_ROWS.labels(stage).observe(rows)
+        # Shallow memory usage: deep=True walks every Python string and costs more than the metric is worth
+        STAGE_BYTES.labels(stage).inc(int(df.memory_usage(index=False).sum()))
+        if seconds > 0:
+            STAGE_ROWS_PER_SEC.labels(stage).set(rows / seconds)
+
+@contextmanager
+def stage_timer(stage):
+    """
+    Time a block as one call of a stage.
+
+    Yields a dict; set its 'df' entry to the block's DataFrame to also record rows and bytes.
+    The block is also profiled as the stage when a profiling session is open.
+    """
+    record = {}
+    started = time.perf_counter()
+    try:
+        with profile_stage(stage):
+            yield record
+    except BaseException:
+        observe_stage(stage, time.perf_counter() - started, record.get('df'), failed=True)
+        raise
+    observe_stage(stage, time.perf_counter() - started, record.get('df'))
+
+def instrument(stage, df_arg=None):
+    """
+    Decorator recording a function's duration, and rows/bytes of the DataFrame it returns.
+    Calls are also profiled as the stage when a profiling session is open.
+
+    Args:
+        stage (str): Stage name
+        df_arg (int): Position of a DataFrame argument to measure instead of the return value
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            df = args[df_arg] if df_arg is not None and len(args) > df_arg else None
+            try:
+                with profile_stage(stage):
+                    result = func(*args, **kwargs)
+            except BaseException:
+                observe_stage(stage, time.perf_counter() - started, df, failed=True)
+                raise
+            observe_stage(stage, time.perf_counter() - started, df if df_arg is not None else result)
+            return result
+        return wrapper
+    return decorator
+
+def instrument_batches(stage, batches):
+    """
+    Wrap a batch iterator, recording the time spent producing each batch.
+
+    The generator is closed with the wrapper, so an extractor can release its cursor.
+    """
+    iterator = iter(batches)
+    try:
+        while True:
+            started = time.perf_counter()
+            try:
+                with profile_stage(stage):
+                    df = next(iterator)
+            except StopIteration:
+                return
+            except BaseException:
+                observe_stage(stage, time.perf_counter() - started, failed=True)
+                raise
+            observe_stage(stage, time.perf_counter() - started, df)
+            yield df
+    finally:
+        if hasattr(iterator, 'close'):
+            iterator.close()
+
+def record_watermark(last_ts):
+    """Record the committed watermark and how far it trails the current time."""
+    if not METRICS_CONFIG['ENABLED'] or pd.isna(last_ts):
+        return
+    watermark = pd.Timestamp(last_ts)
+    if watermark.tzinfo is not None:
+        watermark = watermark.tz_convert(None)
+    WATERMARK_TIMESTAMP.set(watermark.timestamp())
+    WATERMARK_LAG.set(max((pd.Timestamp(datetime.utcnow()) - watermark).total_seconds(), 0.0))
+
+def record_tuned_setting(setting, value):
+    """Record the current value of an autotuned setting (see scripts/elt/autotune.py)."""
+    if METRICS_CONFIG['ENABLED']:
+        TUNED_SETTING.labels(setting).set(value)
+
+def record_validation(stats):
+    """Count a validated batch's passed, quarantined and warned rows and its failures per rule."""
+    if not METRICS_CONFIG['ENABLED']:
+        return
+    for outcome in ('passed', 'quarantined', 'warned'):
+        VALIDATION_ROWS.labels(outcome).inc(stats[outcome])
+    for rule, count in stats['failures'].items():
+        VALIDATION_FAILURES.labels(rule).inc(count)
+
+def record_pool_stats():
+    """Copy the engine registry's pool statistics into gauges."""
+    for pool, stats in get_pool_stats().items():
+        POOL_CHECKOUT_WAIT.labels(pool, 'total').set(stats['checkout_wait_total'])
+        POOL_CHECKOUT_WAIT.labels(pool, 'max').set(stats['checkout_wait_max'])
+        for stat in ('checkouts', 'hits', 'misses', 'connect_retries', 'checked_out', 'overflow', 'size'):
+            if stat in stats:
+                POOL_CONNECTIONS.labels(pool, stat).set(stats[stat])
+
+def export_metrics(job=None, grouping_key=None):
+    """
+    Export the registry to the textfile collector directory and/or the Pushgateway.
+
+    Export failures are logged and swallowed; metrics must never fail a run.
+
+    Args:
+        job (str): Job name; also names the .prom file. Defaults to METRICS_CONFIG['JOB']
+        grouping_key (dict): Extra Pushgateway grouping labels, e.g. {'task': 'dbt_build'}
+
+    Returns:
+        bool: True if the metrics were written somewhere
+    """
+    if not METRICS_CONFIG['ENABLED']:
+        return False
+    job = job or METRICS_CONFIG['JOB']
+    record_pool_stats()
+    LAST_EXPORT.labels(job).set_to_current_time()
+
+    exported = False
+    if METRICS_CONFIG['TEXTFILE_DIR']:
+        try:
+            os.makedirs(METRICS_CONFIG['TEXTFILE_DIR'], exist_ok=True)
+            write_to_textfile(os.path.join(METRICS_CONFIG['TEXTFILE_DIR'], f"{job}.prom"), REGISTRY)
+            exported = True
+        except Exception as e:
+            LOGGER.warning("Could not write metrics textfile: %s", e)
+    if METRICS_CONFIG['PUSHGATEWAY_URL']:
+        try:
+            push_to_gateway(METRICS_CONFIG['PUSHGATEWAY_URL'], job=job, registry=REGISTRY,
+                            grouping_key=grouping_key)
+            exported = True
+        except Exception as e:
+            LOGGER.warning("Could not push metrics to %s: %s", METRICS_CONFIG['PUSHGATEWAY_URL'], e)
+    return exported
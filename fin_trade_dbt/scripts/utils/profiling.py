@@ -0,0 +1,390 @@
+"""
+Profiling utility for fin_trade pipeline.
+Opt-in CPU, allocation and per-statement profiling of an EL run, written out as a self-contained report.
+
+While a profiling session is open:
+- every metrics stage (extract, load, merge, ...) is profiled with cProfile in
+  the thread that runs it, and a sampler thread records each thread's stack,
+  rooted at the stage it is in, at a fixed interval (wall clock, so time spent
+  waiting on the network or a lock shows up too)
+- tracemalloc tracks the peak and the allocation sites of each loaded batch
+- SQLAlchemy cursor events time every statement and count its rows; pymysql's
+  default cursor reads and decodes the whole result inside execute, so a
+  SELECT's time includes transferring and decoding its rows
+
+The report directory holds one <stage>.pstats file per stage (for pstats or
+snakeviz), stacks.collapsed (flamegraph.pl / speedscope input) and report.json
+with stage timings, the top functions per stage, per-batch memory and the
+statements by total time.
+
+With profiling off, each hook costs a microsecond or two per stage call.
+"""
+
+import cProfile
+import functools
+import json
+import os
+import platform
+import pstats
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from .logger import LOGGER
+
+# Base directory of the project
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+# Profiling configuration
+PROFILE_CONFIG = {
+    'ENABLED': os.environ.get('EL_PROFILE', 'false').lower() == 'true',
+    'DIR': os.environ.get('EL_PROFILE_DIR') or os.path.join(BASE_DIR, 'profile_reports'),  # One subdirectory per run
+    'CPU': os.environ.get('EL_PROFILE_CPU', 'both').lower(),  # cprofile, sample, both or none
+    'SAMPLE_INTERVAL': float(os.environ.get('EL_PROFILE_SAMPLE_INTERVAL', '0.01')),  # Seconds between stack samples
+    'MEMORY': os.environ.get('EL_PROFILE_MEMORY', 'true').lower() == 'true',  # tracemalloc per batch
+    'SQL': os.environ.get('EL_PROFILE_SQL', 'true').lower() == 'true',  # Statement timings
+    'TOP': int(os.environ.get('EL_PROFILE_TOP', '15'))  # Functions, allocation sites and statements reported
+}
+
+CPU_MODES = ('cprofile', 'sample', 'both', 'none')
+
+# Stage recorded for samples of threads that are not inside any stage
+UNSTAGED = 'unstaged'
+
+# Statements are grouped by their text, whitespace collapsed and cut to this length
+STATEMENT_LENGTH = 300
+
+_SESSION = None
+
+class ProfileSession:
+    """Collects the profiles of one run; see profiling_session()."""
+
+    def __init__(self, label, config):
+        if config['CPU'] not in CPU_MODES:
+            raise ValueError(f"Unknown EL_PROFILE_CPU '{config['CPU']}'. Use one of: {', '.join(CPU_MODES)}")
+        self.label = label
+        self.config = config
+        self.cprofile = config['CPU'] in ('cprofile', 'both')
+        self.sample = config['CPU'] in ('sample', 'both')
+        self.started_at = datetime.utcnow()
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+        # Thread ident -> stack of (stage, cProfile.Profile or None) the thread is in
+        self._active = {}
+        # (stage, thread ident) -> profiler; a profiler only ever runs in its own thread
+        self._profilers = {}
+        self._cprofile_skipped = 0
+        self.stages = defaultdict(lambda: {'calls': 0, 'failed': 0, 'seconds': 0.0})
+        self.samples = Counter()
+        self.batches = []
+        self.queries = {}
+        self._sampler = None
+        self._stop = threading.Event()
+
+    def _profiler(self, stage):
+        key = (stage, threading.get_ident())
+        with self._lock:
+            profiler = self._profilers.get(key)
+            if profiler is None:
+                profiler = self._profilers[key] = cProfile.Profile()
+        return profiler
+
+    def _enable(self, profiler):
+        try:
+            profiler.enable()
+            return profiler
+        except ValueError:
+            # Another profiler is active (sys.monitoring allows one per process on Python 3.12+)
+            with self._lock:
+                self._cprofile_skipped += 1
+            return None
+
+    def enter(self, stage):
+        """Start attributing the calling thread's time to a stage; pauses the stage it was in."""
+        stack = self._active.setdefault(threading.get_ident(), [])
+        profiler = None
+        if self.cprofile:
+            if stack and stack[-1][1] is not None:
+                stack[-1][1].disable()
+            profiler = self._enable(self._profiler(stage))
+        stack.append((stage, profiler))
+        return time.perf_counter()
+
+    def exit(self, stage, started, failed=False):
+        """Stop attributing the calling thread's time to a stage and resume the one it paused."""
+        seconds = time.perf_counter() - started
+        stack = self._active.get(threading.get_ident())
+        if stack:
+            _, profiler = stack.pop()
+            if profiler is not None:
+                profiler.disable()
+            if stack and stack[-1][1] is not None:
+                stack[-1] = (stack[-1][0], self._enable(stack[-1][1]))
+        with self._lock:
+            record = self.stages[stage]
+            record['calls'] += 1
+            record['failed'] += int(failed)
+            record['seconds'] += seconds
+
+    def current_stage(self, ident=None):
+        stack = self._active.get(threading.get_ident() if ident is None else ident)
+        return stack[-1][0] if stack else UNSTAGED
+
+    def _sample_loop(self):
+        own = threading.get_ident()
+        interval = self.config['SAMPLE_INTERVAL']
+        while not self._stop.wait(interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                frames = []
+                while frame is not None:
+                    code = frame.f_code
+                    frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                frames.append(self.current_stage(ident))
+                # Collapsed stacks list frames root first, separated by ';'
+                self.samples[';'.join(reversed(frames))] += 1
+
+    def begin_batch(self):
+        if not tracemalloc.is_tracing():
+            return None
+        tracemalloc.reset_peak()
+        return tracemalloc.take_snapshot()
+
+    def end_batch(self, stage, rows, seconds, before):
+        record = {'stage': stage, 'rows': rows, 'seconds': round(seconds, 4),
+                  'thread': threading.current_thread().name}
+        if before is not None:
+            current, peak = tracemalloc.get_traced_memory()
+            after = tracemalloc.take_snapshot()
+            differences = [difference for difference in after.compare_to(before, 'lineno') if difference.size_diff > 0]
+            record.update(current_bytes=current, peak_bytes=peak, allocations=[
+                {'site': str(difference.traceback), 'bytes': difference.size_diff, 'blocks': difference.count_diff}
+                for difference in differences[:self.config['TOP']]
+            ])
+        with self._lock:
+            record['batch'] = len(self.batches)
+            self.batches.append(record)
+
+    def record_statement(self, statement, seconds, rows, executemany, failed=False):
+        text = re.sub(r'\s+', ' ', statement).strip()[:STATEMENT_LENGTH]
+        key = (self.current_stage(), text)
+        with self._lock:
+            record = self.queries.get(key)
+            if record is None:
+                record = self.queries[key] = {'stage': key[0], 'statement': text, 'executions': 0, 'failed': 0,
+                                              'seconds': 0.0, 'max_seconds': 0.0, 'rows': 0, 'executemany': executemany}
+            record['executions'] += 1
+            record['failed'] += int(failed)
+            record['seconds'] += seconds
+            record['max_seconds'] = max(record['max_seconds'], seconds)
+            record['rows'] += max(rows, 0)
+
+    def start(self):
+        if self.config['MEMORY'] and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if self.config['SQL']:
+            _listen_statements(True)
+        if self.sample:
+            self._sampler = threading.Thread(target=self._sample_loop, name='el-profile-sampler', daemon=True)
+            self._sampler.start()
+
+    def stop(self):
+        if self._sampler is not None:
+            self._stop.set()
+            self._sampler.join()
+        if self.config['SQL']:
+            _listen_statements(False)
+        peak = None
+        if tracemalloc.is_tracing():
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        return peak
+
+    def _stage_stats(self):
+        """Merge each stage's per-thread profiles into one pstats.Stats."""
+        merged = {}
+        for (stage, _), profiler in self._profilers.items():
+            profiler.create_stats()
+            if not profiler.stats:
+                continue
+            if stage in merged:
+                merged[stage].add(profiler)
+            else:
+                merged[stage] = pstats.Stats(profiler)
+        return merged
+
+    def _top_functions(self, stats):
+        functions = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)
+        return [
+            {'function': f"{name} ({filename}:{line})", 'calls': calls, 'own_seconds': round(own, 4),
+             'cumulative_seconds': round(cumulative, 4)}
+            for (filename, line, name), (_, calls, own, cumulative, _) in functions[:self.config['TOP']]
+        ]
+
+    def write_report(self, peak_bytes=None):
+        """Write the pstats files, collapsed stacks and report.json; returns the report directory."""
+        stamp = self.started_at.strftime('%Y%m%dT%H%M%S')
+        directory = os.path.join(self.config['DIR'], f"{self.label}-{stamp}-{os.getpid()}")
+        os.makedirs(directory, exist_ok=True)
+
+        stage_stats = self._stage_stats()
+        for stage, stats in stage_stats.items():
+            stats.dump_stats(os.path.join(directory, f"{stage}.pstats"))
+        if self.sample:
+            with open(os.path.join(directory, 'stacks.collapsed'), 'w') as handle:
+                for stack, count in sorted(self.samples.items()):
+                    handle.write(f"{stack} {count}\n")
+
+        samples_per_stage = Counter()
+        for stack, count in self.samples.items():
+            samples_per_stage[stack.split(';', 1)[0]] += count
+        stages = {}
+        for stage in sorted(set(self.stages) | set(samples_per_stage)):
+            record = dict(self.stages.get(stage, {'calls': 0, 'failed': 0, 'seconds': 0.0}))
+            record['seconds'] = round(record['seconds'], 4)
+            record['samples'] = samples_per_stage.get(stage, 0)
+            if stage in stage_stats:
+                record['top_functions'] = self._top_functions(stage_stats[stage])
+            stages[stage] = record
+
+        queries = sorted(self.queries.values(), key=lambda record: record['seconds'], reverse=True)
+        for record in queries:
+            record['seconds'] = round(record['seconds'], 4)
+            record['max_seconds'] = round(record['max_seconds'], 4)
+        report = {
+            'label': self.label,
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'seconds': round(time.perf_counter() - self._started, 3),
+            'python': platform.python_version(),
+            'settings': {key.lower(): value for key, value in self.config.items()},
+            'cprofile_skipped_calls': self._cprofile_skipped,
+            'peak_traced_bytes': peak_bytes,
+            'stages': stages,
+            'batches': self.batches,
+            'statements': queries
+        }
+        with open(os.path.join(directory, 'report.json'), 'w') as handle:
+            json.dump(report, handle, indent=2, default=str)
+        return directory
+
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    if _SESSION is None:
+        return
+    conn.info.setdefault('profile_started', []).append(time.perf_counter())
+
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    session = _SESSION
+    started = conn.info.get('profile_started')
+    if session is None or not started:
+        return
+    seconds = time.perf_counter() - started.pop()
+    rows = cursor.rowcount if cursor.rowcount is not None else -1
+    if rows < 0 and executemany:
+        rows = len(parameters)
+    session.record_statement(statement, seconds, rows, executemany)
+
+def _statement_failed(exception_context):
+    session = _SESSION
+    connection = exception_context.connection
+    started = connection.info.get('profile_started') if connection is not None else None
+    if session is None or not started or exception_context.statement is None:
+        return
+    session.record_statement(exception_context.statement, time.perf_counter() - started.pop(), 0,
+                             False, failed=True)
+
+def _listen_statements(on):
+    """Add or remove the statement timing listeners on every SQLAlchemy engine."""
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    for name, listener in (('before_cursor_execute', _before_execute), ('after_cursor_execute', _after_execute),
+                           ('handle_error', _statement_failed)):
+        if on:
+            event.listen(Engine, name, listener)
+        elif event.contains(Engine, name, listener):
+            event.remove(Engine, name, listener)
+
+def record_statement(statement, seconds, rows=-1, executemany=False):
+    """Record a statement run on a raw DBAPI cursor, which the SQLAlchemy events do not see."""
+    session = _SESSION
+    if session is not None and session.config['SQL']:
+        session.record_statement(statement, seconds, rows, executemany)
+
+@contextmanager
+def profiling_session(label, enabled=None):
+    """
+    Profile everything the block runs and write the report when it ends, failed or not.
+
+    A session opened inside another one is a no-op, so the outer run's report covers both.
+
+    Args:
+        label (str): Names the report directory, e.g. el_pipeline
+        enabled (bool): Overrides PROFILE_CONFIG['ENABLED']
+
+    Yields:
+        ProfileSession: The open session, or None when profiling is off
+    """
+    global _SESSION
+    if not (PROFILE_CONFIG['ENABLED'] if enabled is None else enabled) or _SESSION is not None:
+        yield None
+        return
+    session = ProfileSession(label, dict(PROFILE_CONFIG))
+    session.start()
+    _SESSION = session
+    try:
+        yield session
+    finally:
+        _SESSION = None
+        peak_bytes = session.stop()
+        try:
+            directory = session.write_report(peak_bytes)
+            LOGGER.info("Profiling report written to %s", directory)
+        except Exception as e:
+            # A report must never fail the run
+            LOGGER.warning("Could not write the profiling report: %s", e)
+
+def profiled(label):
+    """Decorator running a function inside a profiling session named `label` (see profiling_session)."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with profiling_session(label):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+@contextmanager
+def profile_stage(stage):
+    """Attribute the block's CPU time, samples and statements to a stage, if a session is open."""
+    session = _SESSION
+    if session is None:
+        yield
+        return
+    started = session.enter(stage)
+    try:
+        yield
+    except BaseException:
+        session.exit(stage, started, failed=True)
+        raise
+    session.exit(stage, started)
+
+@contextmanager
+def profile_batch(stage, rows):
+    """Record a batch's duration, tracemalloc peak and the allocation sites it grew, if a session is open."""
+    session = _SESSION
+    if session is None:
+        yield
+        return
+    before = session.begin_batch()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        session.end_batch(stage, rows, time.perf_counter() - started, before)
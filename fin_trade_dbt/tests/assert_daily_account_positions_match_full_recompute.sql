@@ -0,0 +1,46 @@
+{{ config(
+    tags=['reconciliation'],
+    enabled=var('reconcile_positions', false)
+) }}
+
+-- The incrementally maintained running totals of daily_account_positions must equal a full
+-- recompute of the window sums over the whole order history. This scans all of orders, so it
+-- only runs when enabled: dbt test --select tag:reconciliation --vars '{reconcile_positions: true}'
+-- Rows returned are days that are missing on either side or whose totals differ.
+
+with daily_balances as (
+    {{ account_daily_balances() }}
+),
+
+full_recompute as (
+    select 
+        account_key,
+        balance_date,
+        sum(daily_inbound) over (partition by account_key order by balance_date) as total_inbound,
+        sum(daily_outbound) over (partition by account_key order by balance_date) as total_outbound,
+        sum(daily_fees) over (partition by account_key order by balance_date) as total_fees,
+        sum(daily_transactions) over (partition by account_key order by balance_date) as total_transactions
+    from daily_balances
+)
+
+select 
+    coalesce(f.account_key, p.account_key) as account_key,
+    coalesce(f.balance_date, p.balance_date) as balance_date,
+    f.total_inbound as expected_total_inbound,
+    p.total_inbound as actual_total_inbound,
+    f.total_outbound as expected_total_outbound,
+    p.total_outbound as actual_total_outbound,
+    f.total_fees as expected_total_fees,
+    p.total_fees as actual_total_fees,
+    f.total_transactions as expected_total_transactions,
+    p.total_transactions as actual_total_transactions
+from full_recompute f
+full outer join {{ ref('daily_account_positions') }} p
+    on p.account_key = f.account_key
+    and p.balance_date = f.balance_date
+where f.account_key is null
+    or p.account_key is null
+    or abs(f.total_inbound - p.total_inbound) > 0.000001
+    or abs(f.total_outbound - p.total_outbound) > 0.000001
+    or abs(f.total_fees - p.total_fees) > 0.000001
+    or f.total_transactions <> p.total_transactions
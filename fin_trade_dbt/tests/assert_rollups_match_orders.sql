@@ -0,0 +1,106 @@
+{{ config(
+    tags=['reconciliation'],
+    enabled=var('reconcile_rollups', false)
+) }}
+
+-- The daily rollups the EL step maintains (scripts/elt/rollups.py) must add up to the same
+-- per account and per product daily totals as orders, which the reports read without them.
+-- This scans all of orders, so it only runs when enabled:
+-- dbt test --select tag:reconciliation --vars '{reconcile_rollups: true}'
+-- Rows returned are accounts or products and days missing on either side or whose totals differ.
+
+with rollup_accounts as (
+    select 
+        account_key,
+        activity_date,
+        sum(order_count) as order_count,
+        sum(base_amount_sum) as base_amount,
+        sum(fee_amount_sum) as fee_amount
+    from ({{ account_rollup_rows() }}) r
+    group by 
+        account_key,
+        activity_date
+),
+
+order_accounts as (
+    select 
+        o.account_key,
+        cast(o.create_date as date) as activity_date,
+        count(*) as order_count,
+        sum(o.base_amount) as base_amount,
+        sum(o.fee_amount) as fee_amount
+    from {{ ref('orders') }} o
+    group by 
+        o.account_key,
+        cast(o.create_date as date)
+),
+
+rollup_products as (
+    select 
+        base_currency as product_type,
+        activity_date,
+        sum(order_count) as order_count,
+        sum(base_amount_sum) as base_amount,
+        sum(fee_amount_sum) as fee_amount
+    from {{ source('financial_data', 'rollup_product_daily') }}
+    group by 
+        base_currency,
+        activity_date
+),
+
+order_products as (
+    select 
+        pc.product_type,
+        cast(o.create_date as date) as activity_date,
+        count(*) as order_count,
+        sum(o.base_amount) as base_amount,
+        sum(o.fee_amount) as fee_amount
+    from {{ ref('orders') }} o
+    inner join {{ ref('prd_category') }} pc 
+        on o.category_key = pc.category_key
+    group by 
+        pc.product_type,
+        cast(o.create_date as date)
+)
+
+select 
+    'account' as rollup,
+    cast(coalesce(o.account_key, r.account_key) as varchar(64)) as rollup_key,
+    coalesce(o.activity_date, r.activity_date) as activity_date,
+    o.order_count as expected_order_count,
+    r.order_count as actual_order_count,
+    o.base_amount as expected_base_amount,
+    r.base_amount as actual_base_amount,
+    o.fee_amount as expected_fee_amount,
+    r.fee_amount as actual_fee_amount
+from order_accounts o
+full outer join rollup_accounts r
+    on r.account_key = o.account_key
+    and r.activity_date = o.activity_date
+where o.account_key is null
+    or r.account_key is null
+    or o.order_count <> r.order_count
+    or abs(o.base_amount - r.base_amount) > 0.000001
+    or abs(o.fee_amount - r.fee_amount) > 0.000001
+
+union all
+
+select 
+    'product' as rollup,
+    cast(coalesce(o.product_type, r.product_type) as varchar(64)) as rollup_key,
+    coalesce(o.activity_date, r.activity_date) as activity_date,
+    o.order_count as expected_order_count,
+    r.order_count as actual_order_count,
+    o.base_amount as expected_base_amount,
+    r.base_amount as actual_base_amount,
+    o.fee_amount as expected_fee_amount,
+    r.fee_amount as actual_fee_amount
+from order_products o
+full outer join rollup_products r
+    on r.product_type = o.product_type
+    and r.activity_date = o.activity_date
+where o.product_type is null
+    or r.product_type is null
+    or o.order_count <> r.order_count
+    or abs(o.base_amount - r.base_amount) > 0.000001
+    or abs(o.fee_amount - r.fee_amount) > 0.000001
@@ -0,0 +1,41 @@
+import os
+import sys
+from types import SimpleNamespace
+import pytest
+
+# The pipeline code is imported as the `scripts` package of the dbt project
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'fin_trade_dbt'))
+
+
+@pytest.fixture
+def standins(tmp_path, monkeypatch):
+    """
+    Point the pipeline at SQLite stand-ins of the source and target (see scripts/bench/standins.py).
+
+    Returns a factory: standins(rows, batch_size=...) builds the databases and
+    returns their paths. Per-process caches keyed by schema are reset, so each
+    test starts from an empty target.
+    """
+    from scripts.bench.standins import create_source, create_target
+    from scripts.config.database import DB_CONFIG
+    from scripts.elt import dim_keys, load, rollups
+    from scripts.utils.engine_registry import dispose_all
+
+    def build(rows=2000, batch_size=500):
+        source = str(tmp_path / 'source.db')
+        target = str(tmp_path / 'target.db')
+        monkeypatch.setitem(DB_CONFIG['MYSQL_CONFIG'], 'url', create_source(source, rows, payload_bytes=64))
+        monkeypatch.setitem(DB_CONFIG['MYSQL_CONFIG'], 'database', 'financial_events_standin')
+        monkeypatch.setitem(DB_CONFIG['MYSQL_CONFIG'], 'extract_batch_size', batch_size)
+        monkeypatch.setitem(DB_CONFIG['MYSQL_CONFIG'], 'extract_partitions', 1)
+        monkeypatch.setitem(DB_CONFIG['SQLSERVER_CONFIG'], 'url', create_target(target, rows))
+        monkeypatch.setitem(DB_CONFIG['DBT_CONFIG'], 'target_schema', 'main')
+        monkeypatch.setitem(DB_CONFIG['PIPELINE_CONFIG'], 'dim_schema', 'main')
+        monkeypatch.setitem(DB_CONFIG['PIPELINE_CONFIG'], 'spool_dir', str(tmp_path / 'spool'))
+        return SimpleNamespace(source=source, target=target, spool_dir=str(tmp_path / 'spool'))
+
+    monkeypatch.setattr(load, '_STAGING_READY', set())
+    monkeypatch.setattr(rollups, '_TABLES_READY', set())
+    monkeypatch.setattr(dim_keys, '_INDEXES', {})
+    yield build
+    dispose_all()
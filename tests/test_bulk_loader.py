@@ -0,0 +1,31 @@
+from decimal import Decimal
+import pandas as pd
+import pyarrow as pa
+from scripts.elt.bulk_loader import BCP_FIELD_TERMINATOR, _read_staged_file, _write_staged_file
+from scripts.elt.schema import AMOUNT_DTYPE
+
+
+def test_staged_file_writes_decimals_in_fixed_point(tmp_path):
+    df = pd.DataFrame({
+        'record_id': [1, 2, 3],
+        'fee_amount': pd.array([Decimal('0'), Decimal('0.000000000000000001'), Decimal('12.5')], dtype=AMOUNT_DTYPE),
+    })
+    path = tmp_path / 'batch.bcp'
+    _write_staged_file(df, str(path))
+
+    rows = _read_staged_file(str(path))
+    fees = [row[1] for row in rows]
+    assert fees == ['0.000000000000000000', '0.000000000000000001', '12.500000000000000000']
+    assert not any('E' in fee for fee in fees)
+    assert BCP_FIELD_TERMINATOR not in ''.join(fees)
+
+
+def test_staged_file_writes_null_decimals_as_empty_fields(tmp_path):
+    df = pd.DataFrame({
+        'record_id': [1, 2],
+        'fee_amount': pd.array([None, Decimal('0')], dtype=pd.ArrowDtype(pa.decimal128(38, 18))),
+    })
+    path = tmp_path / 'batch.bcp'
+    _write_staged_file(df, str(path))
+
+    assert _read_staged_file(str(path)) == [('1', None), ('2', '0.000000000000000000')]
@@ -0,0 +1,58 @@
+import sqlite3
+from datetime import datetime
+import pytest
+import sqlalchemy
+from scripts.config.database import DB_CONFIG
+from scripts.elt import load
+from scripts.elt.checkpoint import advance_watermark, ensure_watermark_table, get_watermark_table, read_watermark
+from scripts.elt.el_pipeline import run_pipeline
+from scripts.elt.load import get_last_processed_data
+
+
+def test_watermark_only_moves_forward():
+    engine = sqlalchemy.create_engine('sqlite://')
+    table = get_watermark_table('etl_watermark_test')
+    with engine.begin() as connection:
+        ensure_watermark_table(connection, table)
+        advance_watermark(connection, table, 'events', datetime(2024, 1, 2), 10, 10)
+        # An older batch, e.g. replayed from the spool, and the same key again
+        advance_watermark(connection, table, 'events', datetime(2024, 1, 1), 99, 5)
+        advance_watermark(connection, table, 'events', datetime(2024, 1, 2), 10, 5)
+        assert read_watermark(connection, table, 'events') == (datetime(2024, 1, 2), 10)
+
+        # A later id on the same timestamp is a later key
+        advance_watermark(connection, table, 'events', datetime(2024, 1, 2), 11, 1)
+        assert read_watermark(connection, table, 'events') == (datetime(2024, 1, 2), 11)
+        assert read_watermark(connection, table, 'other') is None
+
+
+def test_run_resumes_after_the_last_committed_batch(standins, monkeypatch):
+    db = standins(rows=2000, batch_size=300)
+    monkeypatch.setitem(DB_CONFIG['PIPELINE_CONFIG'], 'spool_enabled', False)
+    bulk_load = load.bulk_load
+    calls = []
+
+    def failing_third_load(*args, **kwargs):
+        calls.append(True)
+        if len(calls) == 3:
+            raise RuntimeError("connection reset")
+        return bulk_load(*args, **kwargs)
+
+    monkeypatch.setattr(load, 'bulk_load', failing_third_load)
+    with pytest.raises(RuntimeError, match="connection reset"):
+        run_pipeline()
+    assert get_last_processed_data()[1] == 600
+
+    run_pipeline()
+
+    with sqlite3.connect(db.target) as connection:
+        staged = connection.execute("SELECT count(*), count(DISTINCT record_id) FROM staging_financial_orders").fetchone()
+    assert staged == (2000, 2000)
+    assert get_last_processed_data()[1] == 2000
+
+
+def test_unreadable_checkpoint_fails_instead_of_starting_over(tmp_path, monkeypatch):
+    monkeypatch.setitem(DB_CONFIG['SQLSERVER_CONFIG'], 'url', f"sqlite:///{tmp_path / 'missing' / 'target.db'}")
+
+    with pytest.raises(sqlalchemy.exc.OperationalError):
+        get_last_processed_data()
@@ -0,0 +1,34 @@
+import sqlite3
+from datetime import datetime
+from scripts.elt import el_pipeline
+from scripts.elt.el_pipeline import run_window
+
+
+def _staged_ids(path):
+    with sqlite3.connect(path) as connection:
+        return [row[0] for row in connection.execute("SELECT record_id FROM staging_financial_orders ORDER BY record_id")]
+
+
+def test_window_at_or_after_the_watermark_is_not_loaded(standins, monkeypatch, caplog):
+    standins(rows=2000)
+
+    def extract(*args, **kwargs):
+        raise AssertionError("a window past the watermark must not be extracted")
+
+    monkeypatch.setattr(el_pipeline, 'extract_batches', extract)
+    watermark = datetime(2024, 1, 1, 0, 3)
+    # Clamping first would turn these into empty or inverted windows ending at the watermark
+    assert run_window('2024-01-01 00:03:00', '2024-01-01 00:05:00', watermark=watermark) == 0
+    assert run_window('2024-01-01 00:04:00', '2024-01-01 00:05:00', watermark=watermark) == 0
+    assert 'starts at or after the watermark' in caplog.text
+    assert 'stopping at' not in caplog.text
+
+
+def test_window_is_cut_at_the_watermark(standins):
+    db = standins(rows=2000)
+
+    # Records are created two per second from 2024-01-01 00:00:00, record n at n // 2 seconds
+    rows = run_window('2024-01-01 00:01:00', '2024-01-01 00:05:00', watermark=datetime(2024, 1, 1, 0, 3))
+
+    assert rows == 240
+    assert _staged_ids(db.target) == list(range(120, 360))
@@ -0,0 +1,24 @@
+import threading
+import time
+from scripts.utils.engine_registry import get_engine, get_pool_stats
+
+
+def test_checkout_waits_are_counted_under_the_registry_name(tmp_path):
+    engine = get_engine('wait_stats_test', f"sqlite:///{tmp_path / 'pool.db'}", pool_size=1, max_overflow=0,
+                        warmup=0)
+    # Disposing replaces the pool; the replacement must report to the same entry
+    engine.dispose()
+    held = engine.connect()
+
+    def checkout():
+        with engine.connect():
+            pass
+
+    waiter = threading.Thread(target=checkout)
+    waiter.start()
+    time.sleep(0.2)
+    held.close()
+    waiter.join()
+
+    assert engine.pool.stats_key == 'wait_stats_test'
+    assert get_pool_stats('wait_stats_test')['checkout_wait_max'] >= 0.1
@@ -0,0 +1,114 @@
+import os
+import queue
+import re
+import sqlite3
+import threading
+import pandas as pd
+import pytest
+from scripts.config.database import BASE_DIR, DB_CONFIG
+from scripts.elt.el_pipeline import run_pipeline
+from scripts.elt.extract import (
+    PROJECTIONS, _fill_partition, extract_batches, extract_partitioned, get_mysql_engine, plan_partitions
+)
+from scripts.elt.schema import LOAD_METADATA_COLUMNS, RESOLVED_KEY_COLUMNS
+
+
+def _rows(path, sql):
+    with sqlite3.connect(path) as connection:
+        return connection.execute(sql).fetchall()
+
+
+def _record_ids(batches):
+    return [int(record_id) for df in batches for record_id in df['record_id']]
+
+
+def test_batches_split_created_at_ties_without_skipping_or_repeating_rows(standins):
+    standins(rows=200)
+    # Stand-in records come two per created_at second; odd pages end in the middle of a tie
+    batches = list(extract_batches(batch_size=7))
+
+    assert [len(df) for df in batches[:-1]] == [7] * (len(batches) - 1)
+    assert _record_ids(batches) == list(range(1, 201))
+
+
+def test_batches_resume_after_a_key_in_the_middle_of_a_tie(standins):
+    db = standins(rows=200)
+    (created_at,) = _rows(db.source, "SELECT created_at FROM financial_events WHERE id = 4")[0]
+    assert _rows(db.source, f"SELECT id FROM financial_events WHERE created_at = '{created_at}'") == [(4,), (5,)]
+
+    assert _record_ids(extract_batches(created_at, 4, batch_size=7)) == list(range(5, 201))
+
+
+def test_partitions_cover_the_keyspace_once_when_cuts_fall_on_ties(standins):
+    db = standins(rows=2000)
+    with get_mysql_engine(DB_CONFIG['MYSQL_CONFIG']).connect() as connection:
+        plan = plan_partitions(connection, "2000-01-01T00:00:00", 0, 4)
+    cuts = [str(pd.Timestamp(upper)) for _, upper in plan[:-1]]
+    tied = _rows(db.source, "SELECT created_at FROM financial_events GROUP BY created_at HAVING count(*) > 1")
+    assert len(plan) == 4 and set(cuts) <= {created_at for (created_at,) in tied}
+
+    batches = list(extract_partitioned(partitions=4, workers=2, batch_size=90))
+    assert _record_ids(batches) == list(range(1, 2001))
+
+
+def test_partitions_start_after_a_key_in_the_middle_of_a_tie(standins):
+    db = standins(rows=2000)
+    (created_at,) = _rows(db.source, "SELECT created_at FROM financial_events WHERE id = 500")[0]
+
+    batches = extract_partitioned(created_at, 500, partitions=3, workers=3, batch_size=90)
+    assert _record_ids(batches) == list(range(501, 2001))
+
+
+def test_partition_worker_hands_over_its_pages_then_the_error():
+    def partition():
+        yield pd.DataFrame({'record_id': [1, 2]})
+        raise RuntimeError("connection lost")
+
+    pages = queue.Queue()
+    _fill_partition(partition(), pages, threading.Event())
+
+    assert list(pages.get()['record_id']) == [1, 2]
+    with pytest.raises(RuntimeError, match="connection lost"):
+        raise pages.get()
+    assert pages.empty()
+
+
+def test_partition_worker_stops_without_a_done_marker_once_the_consumer_stopped():
+    stop = threading.Event()
+    stop.set()
+    pages = queue.Queue(maxsize=1)
+    pages.put('full')
+    closed = []
+
+    def partition():
+        try:
+            yield pd.DataFrame({'record_id': [1]})
+            yield pd.DataFrame({'record_id': [2]})
+        finally:
+            closed.append(True)
+
+    _fill_partition(partition(), pages, stop)
+
+    assert pages.get_nowait() == 'full' and pages.empty()
+    assert closed == [True]
+
+
+def test_fact_projection_carries_soft_deletes_into_deleted_at(standins, monkeypatch):
+    db = standins(rows=2000)
+    monkeypatch.setitem(DB_CONFIG['MYSQL_CONFIG'], 'extract_projection', 'fact')
+
+    run_pipeline()
+
+    deleted = _rows(db.source, "SELECT record_id FROM financial_events WHERE deletion_timestamp IS NOT NULL "
+                               "ORDER BY record_id")
+    assert deleted
+    staged = _rows(db.target, "SELECT record_id FROM staging_financial_orders WHERE deletion_timestamp IS NOT NULL "
+                              "ORDER BY record_id")
+    assert staged == deleted
+
+    # Every staging column fct.orders reads must be extracted, or it stays null under the DAG's projection
+    with open(os.path.join(BASE_DIR, 'models', 'fct', 'orders.sql')) as model:
+        sql = model.read()
+    read = set(re.findall(r'\bf\.\[?(\w+)\]?', sql))
+    assert read <= set(PROJECTIONS['fact'] + RESOLVED_KEY_COLUMNS + LOAD_METADATA_COLUMNS)
+    assert re.search(r'f\.\[deletion_timestamp\] as deleted_at', sql)
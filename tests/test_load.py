@@ -0,0 +1,36 @@
+import sqlite3
+from decimal import Decimal
+from scripts.config.database import DB_CONFIG
+from scripts.elt.el_pipeline import run_changes, run_pipeline
+
+
+def _execute(path, sql, params=()):
+    with sqlite3.connect(path) as connection:
+        return connection.execute(sql, params).fetchall()
+
+
+def test_change_pass_merges_updates_and_soft_deletes_into_staged_rows(standins, monkeypatch):
+    db = standins(rows=200)
+    pipeline_config = DB_CONFIG['PIPELINE_CONFIG']
+    monkeypatch.setitem(pipeline_config, 'rollups', True)
+    run_pipeline()
+
+    # Stand-in rows were all modified on 2024-01-01; only these two change after the change watermark's start
+    monkeypatch.setitem(pipeline_config, 'cdc_start', '2024-12-31')
+    _execute(db.source, "UPDATE financial_events SET modification_timestamp = '2025-01-01 00:00:00', "
+                        "base_amount = 42.5 WHERE id = 10")
+    _execute(db.source, "UPDATE financial_events SET deletion_timestamp = '2025-01-02 00:00:00' WHERE id = 20")
+
+    assert run_changes() == 2
+
+    assert _execute(db.target, "SELECT count(*), count(DISTINCT record_id) FROM staging_financial_orders") == [(200, 200)]
+    updated = _execute(db.target, "SELECT modification_timestamp, base_amount FROM staging_financial_orders "
+                                  "WHERE record_id = 10")
+    assert updated[0][0].startswith('2025-01-01 00:00:00')
+    assert Decimal(str(updated[0][1])) == Decimal('42.5')
+    deleted = _execute(db.target, "SELECT deletion_timestamp FROM staging_financial_orders WHERE record_id = 20")
+    assert deleted[0][0].startswith('2025-01-02 00:00:00')
+
+    # Their day's rollups counted the earlier versions, so the day is marked for a recompute
+    assert [day[:10] for (day,) in _execute(db.target, "SELECT activity_date FROM rollup_dirty_days")] == ['2024-01-01']
+    assert run_changes() == 0
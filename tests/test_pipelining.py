@@ -0,0 +1,74 @@
+import random
+import sqlite3
+import threading
+import time
+import pandas as pd
+import pytest
+from scripts.config.database import DB_CONFIG
+from scripts.elt.el_pipeline import run_pipeline
+from scripts.elt.pipelining import run_pipelined
+
+
+def _batches(count, closed=None):
+    try:
+        for seq in range(count):
+            yield pd.DataFrame({'seq': [seq]})
+    finally:
+        if closed is not None:
+            closed.append(True)
+
+
+def test_ordered_commits_stop_at_a_failed_batch():
+    committed = []
+    closed = []
+    lock = threading.Lock()
+
+    def load(df, wait_turn):
+        seq = int(df['seq'].iloc[0])
+        # Later batches often finish loading first and must wait for their turn
+        time.sleep(random.uniform(0, 0.02))
+        if seq == 5:
+            raise RuntimeError("load failed")
+        wait_turn()
+        with lock:
+            committed.append(seq)
+
+    with pytest.raises(RuntimeError, match="load failed"):
+        run_pipelined(_batches(40, closed), load, queue_size=4, workers=4, ordered_commits=True)
+
+    # Batches still waiting for their turn when the failure stops the run are not committed either
+    assert committed == list(range(len(committed)))
+    assert len(committed) <= 5
+    assert closed == [True]
+
+
+def test_ordered_commits_follow_batch_order():
+    committed = []
+
+    def load(df, wait_turn):
+        time.sleep(random.uniform(0, 0.01))
+        wait_turn()
+        committed.append(int(df['seq'].iloc[0]))
+
+    assert run_pipelined(_batches(30), load, queue_size=2, workers=4, ordered_commits=True) == 30
+    assert committed == list(range(30))
+
+
+def test_autotuned_pipelined_run_loads_every_row_in_order(standins, tmp_path, monkeypatch):
+    db = standins(rows=12000, batch_size=1000)
+    pipeline_config = DB_CONFIG['PIPELINE_CONFIG']
+    monkeypatch.setitem(pipeline_config, 'mode', 'pipelined')
+    monkeypatch.setitem(pipeline_config, 'autotune', True)
+    monkeypatch.setitem(pipeline_config, 'autotune_state_file', str(tmp_path / 'autotune_state.json'))
+    monkeypatch.setitem(pipeline_config, 'autotune_max_workers', 4)
+    monkeypatch.setitem(pipeline_config, 'autotune_extract_batch_min', 1000)
+    monkeypatch.setitem(pipeline_config, 'autotune_extract_batch_max', 1000)
+
+    run_pipeline()
+
+    with sqlite3.connect(db.target) as connection:
+        staged = connection.execute("SELECT count(*), count(DISTINCT record_id) FROM staging_financial_orders").fetchone()
+        watermark = connection.execute("SELECT last_id FROM etl_watermark WHERE pipeline_name = ?",
+                                       (pipeline_config['pipeline_name'],)).fetchone()
+    assert staged == (12000, 12000)
+    assert watermark == (12000,)
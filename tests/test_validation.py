@@ -0,0 +1,29 @@
+import sqlite3
+from scripts.config.database import DB_CONFIG
+from scripts.elt.el_pipeline import run_changes, run_pipeline
+
+
+def _quarantined(path):
+    with sqlite3.connect(path) as connection:
+        return connection.execute(
+            "SELECT count(*), count(DISTINCT record_id) FROM staging_quarantined_events"
+        ).fetchone()
+
+
+def test_change_passes_quarantine_each_failing_version_once(standins, monkeypatch):
+    db = standins(rows=2000)
+    monkeypatch.setitem(DB_CONFIG['PIPELINE_CONFIG'], 'validate', True)
+    monkeypatch.setitem(DB_CONFIG['PIPELINE_CONFIG'], 'cdc_enabled', True)
+    # Every stand-in row is modified after creation, so the change pass reads the loaded rows again
+    monkeypatch.setitem(DB_CONFIG['PIPELINE_CONFIG'], 'cdc_start', '2000-01-01')
+
+    run_pipeline()
+    rows, records = _quarantined(db.target)
+    assert rows and rows == records
+
+    # Rewind the change watermark: a second pass over the same, unchanged rows
+    with sqlite3.connect(db.target) as connection:
+        connection.execute("DELETE FROM etl_watermark WHERE pipeline_name = ?",
+                           (DB_CONFIG['PIPELINE_CONFIG']['cdc_pipeline_name'],))
+    run_changes()
+    assert _quarantined(db.target) == (rows, records)